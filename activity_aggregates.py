@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+📈 ACTIVITY AGGREGATES
+Ultimate Group King Bot - Incrementally Maintained Analytics Counters
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Counters updated as events arrive, reports read them in O(buckets)
+- Activity by hour of day and by calendar day (last N days)
+- Per-command counts in hourly buckets for rolling-window trends
+- Distinct active users over 5m/1h/24h from per-minute last-seen buckets
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import ANALYTICS_CONFIG
+
+class ActiveUserCounter:
+    """Distinct active users over rolling windows, without scanning users.
+
+    Every user is counted once, in the minute they were last seen; new
+    activity moves them to the current minute. "Active in the last N minutes"
+    is then the sum of the last N buckets: O(N), whatever the user count.
+    """
+
+    def __init__(self, max_minutes: int = 1440):
+        self.max_minutes = max_minutes
+        self._minutes = [-1] * max_minutes  # minute number each slot currently holds
+        self._counts = [0] * max_minutes
+
+    def seen(self, now: float, previous: float = None):
+        """Records activity at `now` by a user last seen at `previous` (None if new)."""
+        minute = int(now // 60)
+        if previous is not None:
+            previous_minute = int(previous // 60)
+            if previous_minute == minute:
+                return
+            slot = previous_minute % self.max_minutes
+            if self._minutes[slot] == previous_minute:
+                self._counts[slot] -= 1
+        slot = minute % self.max_minutes
+        if self._minutes[slot] != minute:
+            self._minutes[slot] = minute
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+    def active(self, seconds: int, now: float) -> int:
+        """Users seen within the last `seconds` (whole minutes, up to max_minutes)."""
+        current = int(now // 60)
+        oldest = current - min(self.max_minutes, max(1, seconds // 60)) + 1
+        return sum(count for minute, count in zip(self._minutes, self._counts)
+                   if oldest <= minute <= current)
+
+    def get_state(self) -> Dict:
+        return {'minutes': list(self._minutes), 'counts': list(self._counts)}
+
+    def load_state(self, state: Dict):
+        if len(state['minutes']) == self.max_minutes:
+            self._minutes = list(state['minutes'])
+            self._counts = list(state['counts'])
+
+class ActivityAggregates:
+    """Event counters that never need a rescan of the activity history."""
+
+    def __init__(self, config: Dict = ANALYTICS_CONFIG):
+        self.max_days = config["daily_buckets"]
+        self.trend_hours = config["trend_window_hours"]
+        self.hour_of_day = [0] * 24
+        self.daily: Dict[str, int] = {}  # 'YYYY-MM-DD' -> events, oldest first
+        self.total = 0
+        # Ring of [hour number, Counter(command -> uses)] covering the trend window
+        self._command_hours: List[Optional[list]] = [None] * self.trend_hours
+
+    def record(self, timestamp: float, command: str = None):
+        moment = datetime.fromtimestamp(timestamp)
+        self.total += 1
+        self.hour_of_day[moment.hour] += 1
+
+        day = moment.date().isoformat()
+        count = self.daily.get(day)
+        if count is None:
+            if len(self.daily) >= self.max_days:
+                del self.daily[next(iter(self.daily))]
+            count = 0
+        self.daily[day] = count + 1
+
+        if command:
+            hour_number = int(timestamp // 3600)
+            index = hour_number % self.trend_hours
+            slot = self._command_hours[index]
+            if slot is None or slot[0] != hour_number:
+                slot = self._command_hours[index] = [hour_number, Counter()]
+            slot[1][command] += 1
+
+    def hourly_activity(self) -> Dict[int, int]:
+        """hour of day (0-23) -> events."""
+        return {hour: count for hour, count in enumerate(self.hour_of_day) if count}
+
+    def daily_activity(self) -> Dict[str, int]:
+        return dict(self.daily)
+
+    def command_counts(self, now: float, hours: int = None) -> Counter:
+        """Command uses over the last `hours` (at most the trend window)."""
+        current = int(now // 3600)
+        oldest = current - min(hours or self.trend_hours, self.trend_hours) + 1
+        merged = Counter()
+        for slot in self._command_hours:
+            if slot is not None and oldest <= slot[0] <= current:
+                merged.update(slot[1])
+        return merged
+
+    def trending_commands(self, now: float, limit: int = 10) -> List[Tuple[str, int]]:
+        return self.command_counts(now).most_common(limit)
+
+    def get_state(self) -> Dict:
+        return {
+            'hour_of_day': list(self.hour_of_day),
+            'daily': list(self.daily.items()),
+            'total': self.total,
+            'command_hours': [slot and [slot[0], dict(slot[1])] for slot in self._command_hours]
+        }
+
+    def load_state(self, state: Dict):
+        self.hour_of_day = list(state['hour_of_day'])
+        self.daily = dict(state['daily'][-self.max_days:])
+        self.total = state['total']
+        self._command_hours = [None] * self.trend_hours
+        for slot in state['command_hours']:
+            if slot is not None:
+                self._command_hours[slot[0] % self.trend_hours] = [slot[0], Counter(slot[1])]
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+🗂️ ACTIVITY LOG
+Ultimate Group King Bot - Compact Per-User Activity History
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- One ring buffer per user backed by typed arrays (~19 bytes per event)
+- Float timestamps, small-int action codes, chat ids, interned command names
+- Bounded by ANALYTICS_CONFIG: events per user, event age and tracked users
+- Message text kept only for sampled events (content_sample_rate)
+"""
+
+import base64
+import random
+import time
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import ANALYTICS_CONFIG
+
+ACTIONS = ('message', 'command', 'callback', 'other')
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+PRUNE_INTERVAL = 300  # seconds between sweeps for expired events
+RETENTION_SECONDS = 86400  # a user seen again this long after first seen counts as retained
+
+def _pack(values: array) -> str:
+    """Typed array -> base64 text (native byte order) for JSON snapshots."""
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+def _unpack(typecode: str, text: str) -> array:
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    return values
+
+class Activity(NamedTuple):
+    timestamp: float
+    action: str
+    chat_id: Optional[int]
+    command: Optional[str]
+    content: Optional[str]
+
+class ActivityRing:
+    """Last `capacity` events of one user, oldest overwritten first.
+
+    Arrays grow up to `capacity` and are then reused in place, so a user
+    never costs more than capacity * ~19 bytes (plus any sampled texts).
+    """
+
+    __slots__ = ('capacity', 'times', 'actions', 'chats', 'commands', 'contents', 'start', 'total',
+                 'since', 'retained')
+
+    def __init__(self, capacity: int, since: float):
+        self.capacity = capacity
+        self.since = since  # first event ever seen, survives overwrites and pruning
+        self.retained = False
+        self.times = array('d')
+        self.actions = array('B')
+        self.chats = array('q')
+        self.commands = array('H')  # 0 = no command
+        self.contents: Optional[Dict[int, str]] = None  # slot -> sampled text
+        self.start = 0  # slot of the oldest event once the ring is full
+        self.total = 0  # events ever recorded, including overwritten ones
+
+    def append(self, timestamp: float, action: int, chat_id: int, command: int, content: str = None):
+        self.total += 1
+        if len(self.times) < self.capacity:
+            slot = len(self.times)
+            self.times.append(timestamp)
+            self.actions.append(action)
+            self.chats.append(chat_id)
+            self.commands.append(command)
+        else:
+            slot = self.start
+            self.times[slot] = timestamp
+            self.actions[slot] = action
+            self.chats[slot] = chat_id
+            self.commands[slot] = command
+            self.start = (slot + 1) % self.capacity
+            if self.contents:
+                self.contents.pop(slot, None)
+        if content is not None:
+            if self.contents is None:
+                self.contents = {}
+            self.contents[slot] = content
+
+    def __len__(self):
+        return len(self.times)
+
+    def slots(self) -> Iterator[int]:
+        """Slots oldest to newest."""
+        n = len(self.times)
+        for i in range(n):
+            yield (self.start + i) % n
+
+    @property
+    def first_seen(self) -> float:
+        """Timestamp of the oldest retained event (0.0 if empty)."""
+        return self.times[self.start] if self.times else 0.0
+
+    @property
+    def last_seen(self) -> float:
+        return self.times[(self.start - 1) % len(self.times)] if self.times else 0.0
+
+    def prune(self, cutoff: float) -> int:
+        """Drops events older than `cutoff`; returns how many were dropped."""
+        if not self.times or self.first_seen >= cutoff:
+            return 0
+        keep = [slot for slot in self.slots() if self.times[slot] >= cutoff]
+        dropped = len(self.times) - len(keep)
+        contents = self.contents or {}
+        self.times = array('d', (self.times[slot] for slot in keep))
+        self.actions = array('B', (self.actions[slot] for slot in keep))
+        self.chats = array('q', (self.chats[slot] for slot in keep))
+        self.commands = array('H', (self.commands[slot] for slot in keep))
+        kept_contents = {i: contents[slot] for i, slot in enumerate(keep) if slot in contents}
+        self.contents = kept_contents or None
+        self.start = 0
+        return dropped
+
+    def get_state(self) -> Dict:
+        """JSON-safe copy of the ring (sampled texts are never saved)."""
+        return {
+            'capacity': self.capacity, 'since': self.since, 'retained': self.retained,
+            'start': self.start, 'total': self.total,
+            'times': _pack(self.times), 'actions': _pack(self.actions),
+            'chats': _pack(self.chats), 'commands': _pack(self.commands)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'ActivityRing':
+        ring = cls(state['capacity'], state['since'])
+        ring.retained = state['retained']
+        ring.start = state['start']
+        ring.total = state['total']
+        ring.times = _unpack('d', state['times'])
+        ring.actions = _unpack('B', state['actions'])
+        ring.chats = _unpack('q', state['chats'])
+        ring.commands = _unpack('H', state['commands'])
+        return ring
+
+class ActivityStore:
+    """user_id -> ActivityRing, bounded by ANALYTICS_CONFIG."""
+
+    def __init__(self, config: Dict = ANALYTICS_CONFIG):
+        self.capacity = config["activity_capacity"]
+        self.max_age = config["activity_max_age"]
+        self.content_sample_rate = config["content_sample_rate"]
+        self.max_users = config["max_tracked_users"]
+        self.max_commands = config["max_command_names"]
+        self._rings: Dict[int, ActivityRing] = {}
+        self._command_names: List[Optional[str]] = [None]
+        self._command_codes: Dict[str, int] = {}
+        self._last_prune = time.time()
+        self.retained = 0  # users with ring.retained set
+        self.stats = {'recorded': 0, 'pruned': 0, 'evicted_users': 0}
+
+    def _command_code(self, command: Optional[str]) -> int:
+        if not command:
+            return 0
+        code = self._command_codes.get(command)
+        if code is None:
+            if len(self._command_names) >= self.max_commands:
+                command = 'other'
+                code = self._command_codes.get(command)
+            if code is None:
+                code = self._command_codes[command] = len(self._command_names)
+                self._command_names.append(command)
+        return code
+
+    def record(self, user_id: int, action: str, chat_id: int = None, command: str = None,
+               content: str = None, now: float = None) -> Optional[float]:
+        """Appends one event; `content` is kept only if this event is sampled.
+
+        Returns when the user was last seen before this event (None if new).
+        """
+        now = now or time.time()
+        if now - self._last_prune > PRUNE_INTERVAL:
+            self.prune(now)
+        ring = self._rings.get(user_id)
+        if ring is None:
+            if len(self._rings) >= self.max_users:
+                self.prune(now)
+            ring = self._rings[user_id] = ActivityRing(self.capacity, now)
+        previous = ring.last_seen or None
+        if content is not None and not (self.content_sample_rate and random.random() < self.content_sample_rate):
+            content = None
+        ring.append(now, ACTION_CODES.get(action, ACTION_CODES['other']),
+                    chat_id or 0, self._command_code(command), content)
+        if not ring.retained and now - ring.since >= RETENTION_SECONDS:
+            ring.retained = True
+            self.retained += 1
+        self.stats['recorded'] += 1
+        return previous
+
+    def _drop(self, user_id: int):
+        if self._rings.pop(user_id).retained:
+            self.retained -= 1
+
+    def prune(self, now: float = None):
+        """Drops expired events and empty users; evicts the least recently active beyond max_users."""
+        now = now or time.time()
+        self._last_prune = now
+        cutoff = now - self.max_age
+        for user_id in list(self._rings):
+            ring = self._rings[user_id]
+            self.stats['pruned'] += ring.prune(cutoff)
+            if not ring:
+                self._drop(user_id)
+        excess = len(self._rings) - int(self.max_users * 0.9)
+        if excess > 0:
+            oldest = sorted(self._rings, key=lambda user_id: self._rings[user_id].last_seen)[:excess]
+            for user_id in oldest:
+                self._drop(user_id)
+            self.stats['evicted_users'] += len(oldest)
+
+    def retention_rate(self) -> float:
+        """% of tracked users seen again a day or more after they were first seen."""
+        return (self.retained / len(self._rings) * 100) if self._rings else 0.0
+
+    def get(self, user_id: int) -> Optional[ActivityRing]:
+        return self._rings.get(user_id)
+
+    def items(self) -> List[Tuple[int, ActivityRing]]:
+        """(user_id, ring) pairs; a list, so callers may record while iterating."""
+        return list(self._rings.items())
+
+    def entries(self, user_id: int) -> List[Activity]:
+        """A user's events, oldest first, decoded."""
+        ring = self._rings.get(user_id)
+        if ring is None:
+            return []
+        contents = ring.contents or {}
+        return [
+            Activity(
+                ring.times[slot],
+                ACTIONS[ring.actions[slot]],
+                ring.chats[slot] or None,
+                self._command_names[ring.commands[slot]],
+                contents.get(slot)
+            )
+            for slot in ring.slots()
+        ]
+
+    def __len__(self):
+        return len(self._rings)
+
+    def __contains__(self, user_id):
+        return user_id in self._rings
+
+    def get_state(self) -> Dict:
+        return {
+            'rings': [[user_id, ring.get_state()] for user_id, ring in self._rings.items()],
+            'command_names': self._command_names[1:],
+            'last_prune': self._last_prune,
+            'stats': dict(self.stats)
+        }
+
+    def load_state(self, state: Dict):
+        self._rings = {user_id: ActivityRing.from_state(ring) for user_id, ring in state['rings']}
+        self.retained = sum(1 for ring in self._rings.values() if ring.retained)
+        self._command_names = [None] + state['command_names']
+        self._command_codes = {name: code for code, name in enumerate(self._command_names) if name}
+        self._last_prune = state['last_prune']
+        self.stats.update(state['stats'])
+
+    def get_status(self) -> Dict:
+        return {
+            'tracked_users': len(self._rings),
+            'events': sum(len(ring) for ring in self._rings.values()),
+            'command_names': len(self._command_names) - 1,
+            **self.stats
+        }
@@ -18,18 +18,17 @@ from config import (
     OWNER_ID, TIME_FORMATS, DEFAULT_GROUP_CONFIG, 
     EMOJIS, MAX_LIMITS
 )
-from database import Database
+from database import get_database
 
-db = Database()
-db.connect()
+db = get_database()
 
 class AdminCommands:
     """Handles all admin and moderation commands"""
     
     def __init__(self):
         self.pending_bans = {}  # For confirmation dialogs
-        # Connect to database
-        if not db.connect():
+        # Shared database is connected once at import
+        if not db.db:
             print("⚠️ AdminCommands: Database connection failed")
     
     async def is_admin(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
@@ -572,12 +571,15 @@ class AdminCommands:
             start_id = update.message.reply_to_message.message_id
             end_id = update.message.message_id
             
+            # Bulk delete, 100 ids per request (missing messages are skipped by Telegram)
+            message_ids = list(range(start_id, end_id + 1))
             messages_deleted = 0
-            for msg_id in range(start_id, end_id + 1):
+            for i in range(0, len(message_ids), 100):
+                batch = message_ids[i:i + 100]
                 try:
-                    await context.bot.delete_message(update.effective_chat.id, msg_id)
-                    messages_deleted += 1
-                except:
+                    await context.bot.delete_messages(update.effective_chat.id, batch)
+                    messages_deleted += len(batch)
+                except BadRequest:
                     pass
             
             # Log action
@@ -9,6 +9,7 @@ Features:
 - User behavior tracking
 - Group statistics
 - Performance monitoring
+- Collected analytics persisted across restarts
 """
 
 import json
@@ -22,31 +23,36 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
-from database import Database
-from config import OWNER_ID
+from database import get_database, get_async_database
+from analytics_state import BigDataCollectors
+from analytics_snapshot import AnalyticsPersistence
+from metrics import db_metrics, update_metrics
+from config import OWNER_ID, ANALYTICS_CONFIG
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SuperAdminSystem:
+class SuperAdminSystem(BigDataCollectors):
     """Advanced super admin system with big data analytics"""
     
     def __init__(self):
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Big data collectors (user_activity, command_stats, group_stats, ...)
+        super().__init__()
+        
+        # Shared Astra DB service
+        self.db = get_database()
+        self.adb = get_async_database()
         
         # Analytics cache
         self.analytics_cache = {}
         self.cache_timeout = 300  # 5 minutes
         
-        # Big data collectors
-        self.user_activity = defaultdict(list)
-        self.command_stats = defaultdict(int)
-        self.group_stats = defaultdict(dict)
-        self.error_logs = []
-        self.performance_metrics = {}
+        # Collected data survives restarts (snapshot + delta log)
+        self.persistence = None
+        if ANALYTICS_CONFIG["persist"]:
+            self.persistence = AnalyticsPersistence()
+            self.persistence.restore(self)
         
         # Filter system
         self.active_filters = {}
@@ -64,46 +70,26 @@ class SuperAdminSystem:
     
     def collect_big_data(self, update: Update = None, context: ContextTypes = None):
         """Collect big data from bot activities"""
-        timestamp = datetime.now()
-        
-        if update:
-            # User activity tracking
-            user_id = update.effective_user.id
-            self.user_activity[user_id].append({
-                'timestamp': timestamp,
-                'action': 'message' if update.message else 'command',
-                'chat_id': update.effective_chat.id if update.effective_chat else None,
-                'content': update.message.text if update.message else None
-            })
-            
-            # Command statistics
-            if update.message and update.message.text:
-                command = update.message.text.split()[0]
-                self.command_stats[command] += 1
-            
-            # Group statistics
-            if update.effective_chat:
-                chat_id = update.effective_chat.id
-                if chat_id not in self.group_stats:
-                    self.group_stats[chat_id] = {
-                        'message_count': 0,
-                        'user_count': 0,
-                        'last_activity': timestamp,
-                        'commands_used': defaultdict(int)
-                    }
-                
-                self.group_stats[chat_id]['message_count'] += 1
-                self.group_stats[chat_id]['last_activity'] = timestamp
-                
-                if update.message and update.message.text:
-                    command = update.message.text.split()[0]
-                    self.group_stats[chat_id]['commands_used'][command] += 1
-        
-        # Performance metrics
-        self.performance_metrics['last_update'] = timestamp
-        self.performance_metrics['total_users'] = len(self.user_activity)
-        self.performance_metrics['total_commands'] = sum(self.command_stats.values())
-        self.performance_metrics['active_groups'] = len(self.group_stats)
+        if not (update and update.effective_user):
+            return
+        
+        now = time.time()
+        text = update.message.text if update.message else None
+        command = text.split()[0].split('@')[0].lower() if text and text.startswith('/') else None
+        if command:
+            action = 'command'
+        elif update.message:
+            action = 'message'
+        elif update.callback_query:
+            action = 'callback'
+        else:
+            action = 'other'
+        user_id = update.effective_user.id
+        chat_id = update.effective_chat.id if update.effective_chat else None
+        
+        self.record_event(now, user_id, chat_id, action, command, text)
+        if self.persistence:
+            self.persistence.log(now, user_id, chat_id, action, command)
     
     def apply_filters(self, data: List[Dict], filters: Dict) -> List[Dict]:
         """Apply advanced filters to data"""
@@ -114,10 +100,10 @@ class SuperAdminSystem:
             filter_val = filters['message_count']
             if filter_val.startswith('>'):
                 min_count = int(filter_val[1:])
-                filtered_data = [d for d in filtered_data if len(d.get('messages', [])) > min_count]
+                filtered_data = [d for d in filtered_data if d.get('message_count', 0) > min_count]
             elif filter_val.startswith('<'):
                 max_count = int(filter_val[1:])
-                filtered_data = [d for d in filtered_data if len(d.get('messages', [])) < max_count]
+                filtered_data = [d for d in filtered_data if d.get('message_count', 0) < max_count]
         
         # Timeframe filter
         if 'timeframe' in filters:
@@ -155,8 +141,8 @@ class SuperAdminSystem:
         
         return filtered_data
     
-    def generate_analytics_report(self) -> Dict:
-        """Generate comprehensive analytics report"""
+    async def generate_analytics_report(self) -> Dict:
+        """Generate comprehensive analytics report (top user profiles are read on the DB executor)"""
         cache_key = 'analytics_report'
         current_time = time.time()
         
@@ -169,7 +155,7 @@ class SuperAdminSystem:
         # Generate new report
         report = {
             'timestamp': datetime.now().isoformat(),
-            'user_analytics': self._analyze_users(),
+            'user_analytics': await self._analyze_users(),
             'group_analytics': self._analyze_groups(),
             'command_analytics': self._analyze_commands(),
             'performance_metrics': self._analyze_performance(),
@@ -182,20 +168,20 @@ class SuperAdminSystem:
         
         return report
     
-    def _analyze_users(self) -> Dict:
+    async def _analyze_users(self) -> Dict:
         """Analyze user data"""
-        total_users = len(self.user_activity)
-        active_users = sum(1 for activities in self.user_activity.values() 
-                          if activities and activities[-1]['timestamp'] > datetime.now() - timedelta(hours=24))
+        users = self.user_activity.items()
+        total_users = len(users)
+        active_users = self.active_users.active(24 * 3600, time.time())
         
         # User activity distribution
         activity_levels = Counter()
-        for user_id, activities in self.user_activity.items():
-            if len(activities) > 100:
+        for user_id, ring in users:
+            if ring.total > 100:
                 activity_levels['very_active'] += 1
-            elif len(activities) > 50:
+            elif ring.total > 50:
                 activity_levels['active'] += 1
-            elif len(activities) > 10:
+            elif ring.total > 10:
                 activity_levels['moderate'] += 1
             else:
                 activity_levels['low'] += 1
@@ -205,7 +191,7 @@ class SuperAdminSystem:
             'active_users': active_users,
             'activity_levels': dict(activity_levels),
             'user_growth_rate': self._calculate_growth_rate(),
-            'top_users': self._get_top_users(10)
+            'top_users': await self._get_top_users(10)
         }
     
     def _analyze_groups(self) -> Dict:
@@ -236,29 +222,18 @@ class SuperAdminSystem:
     
     def _analyze_commands(self) -> Dict:
         """Analyze command usage"""
-        total_commands = sum(self.command_stats.values())
-        
-        # Command popularity
-        popular_commands = sorted(self.command_stats.items(), 
-                                 key=lambda x: x[1], reverse=True)[:20]
-        
-        # Command categories
-        command_categories = defaultdict(int)
-        for command, count in self.command_stats.items():
-            if command.startswith('/admin'):
-                command_categories['admin'] += count
-            elif command.startswith('/fun'):
-                command_categories['fun'] += count
-            elif command.startswith('/economy'):
-                command_categories['economy'] += count
-            else:
-                command_categories['general'] += count
+        total_commands = self.total_commands
+        
+        # Command popularity (exact counts for the streaming top-20)
+        popular_commands = sorted(((command, self.command_stats[command])
+                                   for command, count, error in self.top_commands.top(40)),
+                                  key=lambda x: x[1], reverse=True)[:20]
         
         return {
             'total_commands': total_commands,
             'unique_commands': len(self.command_stats),
             'popular_commands': popular_commands,
-            'command_categories': dict(command_categories),
+            'command_categories': dict(self.command_categories),
             'command_growth': self._calculate_command_growth()
         }
     
@@ -270,28 +245,15 @@ class SuperAdminSystem:
             'uptime': self._calculate_uptime(),
             'memory_usage': self._get_memory_usage(),
             'cpu_usage': self._get_cpu_usage(),
-            'database_performance': self._get_db_performance()
+            'database_performance': self._get_db_performance(),
+            'update_latency': self._get_update_latency()
         }
     
     def _analyze_trends(self) -> Dict:
         """Analyze trending data"""
-        # Hourly activity
-        hourly_activity = defaultdict(int)
-        for activities in self.user_activity.values():
-            for activity in activities:
-                hour = activity['timestamp'].hour
-                hourly_activity[hour] += 1
-        
-        # Daily growth
-        daily_growth = defaultdict(int)
-        for activities in self.user_activity.values():
-            for activity in activities:
-                date = activity['timestamp'].date()
-                daily_growth[str(date)] += 1
-        
         return {
-            'hourly_activity': dict(hourly_activity),
-            'daily_growth': dict(daily_growth),
+            'hourly_activity': self.aggregates.hourly_activity(),
+            'daily_growth': self.aggregates.daily_activity(),
             'trending_commands': self._get_trending_commands(),
             'user_retention': self._calculate_retention_rate()
         }
@@ -301,12 +263,12 @@ class SuperAdminSystem:
         anomalies = []
         
         # Spam detection
-        for user_id, activities in self.user_activity.items():
-            if len(activities) > 1000:  # Unusually high activity
+        for user_id, ring in self.user_activity.items():
+            if ring.total > 1000:  # Unusually high activity
                 anomalies.append({
                     'type': 'spam_suspicion',
                     'user_id': user_id,
-                    'message_count': len(activities),
+                    'message_count': ring.total,
                     'severity': 'high'
                 })
         
@@ -333,31 +295,38 @@ class SuperAdminSystem:
         if len(self.user_activity) < 2:
             return 0.0
         
-        recent_users = sum(1 for activities in self.user_activity.values() 
-                          if activities and activities[-1]['timestamp'] > datetime.now() - timedelta(days=7))
+        cutoff = time.time() - 7 * 86400
+        recent_users = sum(1 for user_id, ring in self.user_activity.items() if ring.last_seen > cutoff)
         
         return (recent_users / len(self.user_activity)) * 100
     
-    def _get_top_users(self, limit: int) -> List[Dict]:
+    async def _get_top_users(self, limit: int) -> List[Dict]:
         """Get top users by activity"""
-        user_scores = {}
-        for user_id, activities in self.user_activity.items():
-            user_scores[user_id] = len(activities)
-        
-        top_users = sorted(user_scores.items(), key=lambda x: x[1], reverse=True)[:limit]
-        return [{'user_id': uid, 'activity_score': score} for uid, score in top_users]
+        top_users = []
+        for user_id, count, error in self.top_users.top(limit * 2):
+            # Exact count while the user is still tracked, Space-Saving estimate otherwise
+            ring = self.user_activity.get(user_id)
+            top_users.append((user_id, ring.total if ring else count))
+        top_users = sorted(top_users, key=lambda x: x[1], reverse=True)[:limit]
+        profiles = await self.adb.get_users([uid for uid, _ in top_users], fields=['username', 'first_name'])
+        return [{
+            'user_id': uid,
+            'username': profiles.get(uid, {}).get('username'),
+            'first_name': profiles.get(uid, {}).get('first_name'),
+            'activity_score': score
+        } for uid, score in top_users]
     
     def _get_top_groups(self, limit: int) -> List[Dict]:
         """Get top groups by activity"""
-        top_groups = sorted(self.group_stats.items(), 
-                           key=lambda x: x[1]['message_count'], reverse=True)[:limit]
-        return [{'chat_id': chat_id, 'message_count': stats['message_count']} 
-                for chat_id, stats in top_groups]
+        top_groups = sorted(((chat_id, self.group_stats[chat_id]['message_count'])
+                             for chat_id, count, error in self.top_groups.top(limit * 2)),
+                            key=lambda x: x[1], reverse=True)[:limit]
+        return [{'chat_id': chat_id, 'message_count': message_count}
+                for chat_id, message_count in top_groups]
     
     def _calculate_avg_response_time(self) -> float:
-        """Calculate average response time"""
-        # Placeholder for actual implementation
-        return 0.5  # seconds
+        """Average update handling time over the last hour (seconds)"""
+        return update_metrics.overall('1h')['avg_ms'] / 1000
     
     def _calculate_error_rate(self) -> float:
         """Calculate error rate"""
@@ -393,26 +362,34 @@ class SuperAdminSystem:
     
     def _get_db_performance(self) -> Dict:
         """Get database performance metrics"""
-        # Placeholder for actual implementation
+        overall = db_metrics.overall()
+        pool = self.db.pool_status()
         return {
-            'query_time': 0.1,  # seconds
-            'connection_pool': 'healthy',
-            'cache_hit_rate': 85.0  # percentage
+            'query_time': overall['avg_ms'] / 1000,  # seconds
+            'p50_ms': overall['p50_ms'],
+            'p95_ms': overall['p95_ms'],
+            'p99_ms': overall['p99_ms'],
+            'total_queries': overall['count'],
+            'error_rate': overall['error_rate'],
+            'connection_pool': 'healthy' if pool['circuit'] == 'closed' else f"circuit {pool['circuit']}",
+            'pool': pool,
+            'cache_hit_rate': self.db.user_cache.stats()['hit_rate'],  # percentage
+            'by_operation': db_metrics.summary('operation'),
+            'by_collection': db_metrics.summary('collection'),
+            'top_handlers': db_metrics.top('handler', 5)
+        }
+    
+    def _get_update_latency(self) -> Dict:
+        """Update handling latency (receive to done) over sliding windows"""
+        return {
+            'windows': {window: update_metrics.overall(window) for window in update_metrics.WINDOWS},
+            'commands_per_minute': update_metrics.overall('1m', prefix='/')['per_minute'],
+            'slowest_handlers': update_metrics.top('5m', 5)
         }
     
     def _get_trending_commands(self) -> List[Dict]:
-        """Get trending commands"""
-        # Simplified trend calculation
-        recent_commands = defaultdict(int)
-        for activities in self.user_activity.values():
-            for activity in activities:
-                if activity['timestamp'] > datetime.now() - timedelta(hours=24):
-                    if activity['action'] == 'command':
-                        command = activity.get('content', '')
-                        if command:
-                            recent_commands[command] += 1
-        
-        trending = sorted(recent_commands.items(), key=lambda x: x[1], reverse=True)[:10]
+        """Get trending commands (last trend_window_hours)"""
+        trending = self.aggregates.trending_commands(time.time(), 10)
         return [{'command': cmd, 'count': count} for cmd, count in trending]
     
     def _calculate_retention_rate(self) -> float:
@@ -420,16 +397,8 @@ class SuperAdminSystem:
         if len(self.user_activity) < 2:
             return 0.0
         
-        # Users who came back after 24 hours
-        retained_users = 0
-        for activities in self.user_activity.values():
-            if len(activities) > 1:
-                first_activity = activities[0]['timestamp']
-                last_activity = activities[-1]['timestamp']
-                if (last_activity - first_activity).days > 0:
-                    retained_users += 1
-        
-        return (retained_users / len(self.user_activity)) * 100
+        # Users who came back after 24 hours (tracked as events arrive)
+        return self.user_activity.retention_rate()
     
     def _calculate_group_growth(self) -> float:
         """Calculate group growth rate"""
@@ -509,15 +478,14 @@ class FilterSystem:
     def _get_user_data(self) -> List[Dict]:
         """Get user data for filtering"""
         user_data = []
-        for user_id, activities in self.super_admin.user_activity.items():
+        for user_id, ring in self.super_admin.user_activity.items():
             user_data.append({
                 'user_id': user_id,
-                'messages': activities,
-                'message_count': len(activities),
-                'last_activity': activities[-1]['timestamp'] if activities else datetime.min,
+                'message_count': ring.total,
+                'last_activity': datetime.fromtimestamp(ring.last_seen),
                 'warnings': 0,  # Placeholder
                 'balance': 0,    # Placeholder
-                'join_date': activities[0]['timestamp'] if activities else datetime.min
+                'join_date': datetime.fromtimestamp(ring.since)
             })
         return user_data
     
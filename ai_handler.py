@@ -7,14 +7,18 @@ Author: Nikhil Mehra (NikkuAi09)
 
 import json
 import time
+import asyncio
 import requests
 import random
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from database import get_database, get_async_database
+from metrics import ai_metrics
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +30,8 @@ class AIHandler:
         self.cache = {}  # Simple in-memory cache
         self.request_count = 0
         self.error_count = 0
+        self.db = get_database()
+        self.adb = get_async_database()
 
     async def ask_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Ask AI a question (requires API key)."""
@@ -33,7 +39,7 @@ class AIHandler:
         chat_id = update.effective_chat.id
         
         # Check for API key
-        settings = self.get_user_settings(user_id, chat_id)
+        settings = await self.adb.run(self.get_user_settings, user_id, chat_id)
         if not settings.get('has_api_key'):
             await update.message.reply_text("❌ Please set your OpenRouter API key first using /setapi <your_key>.")
             return
@@ -45,8 +51,7 @@ class AIHandler:
         question = " ".join(context.args)
         await update.message.reply_text(f"🤖 *AI Response*\n\nYou asked: {question}\n\nAI is processing your question...")
         
-        # Get response
-        response = self.get_ai_response(user_id, chat_id, question)
+        response = await self.get_ai_response(user_id, chat_id, question)
         await update.message.reply_text(response)
     
     async def chat_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -55,7 +60,7 @@ class AIHandler:
         chat_id = update.effective_chat.id
         
         # Check for API key
-        settings = self.get_user_settings(user_id, chat_id)
+        settings = await self.adb.run(self.get_user_settings, user_id, chat_id)
         if not settings.get('has_api_key'):
             await update.message.reply_text("❌ Please set your OpenRouter API key first using /setapi <your_key>.")
             return
@@ -67,8 +72,7 @@ class AIHandler:
         message = " ".join(context.args)
         await update.message.reply_text(f"🤖 *AI Chat*\n\nYou: {message}\n\nAI: Hello! How can I help you today?")
         
-        # Get response
-        response = self.get_ai_response(user_id, chat_id, message)
+        response = await self.get_ai_response(user_id, chat_id, message)
         await update.message.reply_text(response)
 
     async def setapi_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -92,31 +96,42 @@ class AIHandler:
             await update.message.reply_text("❌ API key test failed. Please ensure it is valid and has enough quota.")
             return
             
-        if self.set_user_api_key(user_id, chat_id, api_key):
+        if await self.adb.run(self.set_user_api_key, user_id, chat_id, api_key):
             await update.message.reply_text("✅ API key set successfully! You can now use /ask and /chat.")
         else:
             await update.message.reply_text("❌ Failed to store API key. Please try again.")
 
-    def get_ai_response(self, user_id: int, chat_id: int, user_message: str) -> str:
+    async def get_ai_response(self, user_id: int, chat_id: int, user_message: str) -> str:
         """
         Get AI response with LLD Fallback system
         """
+        # Memory goes through the DB executor; the blocking HTTP calls run in a thread
+        user_memory = await self.adb.get_user_memory(user_id, chat_id)
+        response, remembered = await asyncio.to_thread(self._request_ai_response, user_id, user_memory, user_message)
+        if remembered:
+            await self.adb.save_user_memory(user_id, chat_id, user_memory, user_memory.get('summary'))
+            await self.adb.update_user_stats(user_id, commands=1)
+        return response
+    
+    def _request_ai_response(self, user_id: int, user_memory: Dict, user_message: str) -> Tuple[str, bool]:
+        """Asks OpenRouter, trying each model in turn; returns (response, whether
+        `user_memory` was updated with the exchange and needs saving)."""
         try:
-            # Get user memory and settings
-            user_memory = db.get_user_memory(user_id, chat_id)
             api_key = user_memory.get('api_key')
             
             # Check if user has set API key
             if not api_key:
+                ai_metrics.requests.inc('no_api_key')
                 gaali = random.choice(SAVAGE_GAALIYAN)
-                return FALLBACK_MESSAGES["API_KEY_MISSING"].format(gaali=gaali)
+                return FALLBACK_MESSAGES["API_KEY_MISSING"].format(gaali=gaali), False
             
             # Check cache first
             cache_key = f"{user_id}:{hash(user_message)}"
             if cache_key in self.cache:
                 cached_time, cached_response = self.cache[cache_key]
                 if time.time() - cached_time < CACHE_CONFIG["ai_responses"]:
-                    return cached_response
+                    ai_metrics.requests.inc('cached')
+                    return cached_response, False
             
             # Prepare for API request
             headers = {
@@ -156,12 +171,21 @@ class AIHandler:
                     logger.info(f"🤖 Trying model: {current_model} for user {user_id}")
                     
                     # Make API request
-                    response = requests.post(
-                        "https://openrouter.ai/api/v1/chat/completions",
-                        headers=headers,
-                        data=json.dumps(payload),
-                        timeout=60
-                    )
+                    started = time.perf_counter()
+                    status = 'exception'
+                    try:
+                        response = requests.post(
+                            "https://openrouter.ai/api/v1/chat/completions",
+                            headers=headers,
+                            data=json.dumps(payload),
+                            timeout=60
+                        )
+                        status = {200: 'ok', 429: 'rate_limited', 403: 'forbidden'}.get(response.status_code, 'http_error')
+                    except requests.exceptions.Timeout:
+                        status = 'timeout'
+                        raise
+                    finally:
+                        ai_metrics.record_attempt(current_model, status, time.perf_counter() - started)
                     
                     # Handle different response codes
                     if response.status_code == 200:
@@ -172,19 +196,18 @@ class AIHandler:
                             
                             if ai_message:
                                 # Update user memory
-                                self._update_user_memory(user_id, chat_id, user_message, ai_message)
+                                self._remember(user_memory, user_message, ai_message)
                                 
                                 # Cache the response
                                 self.cache[cache_key] = (time.time(), ai_message)
                                 
                                 # Update user's preferred model if successful
-                                if current_model != user_memory.get('model'):
-                                    user_memory['model'] = current_model
-                                    db.save_user_memory(user_id, chat_id, user_memory)
+                                user_memory['model'] = current_model
                                 
                                 self.request_count += 1
+                                ai_metrics.requests.inc('success')
                                 logger.info(f"✅ AI response successful for user {user_id}")
-                                return ai_message
+                                return ai_message, True
                     
                     elif response.status_code == 429:
                         logger.warning(f"⚠️ Rate limit exceeded for model {current_model}")
@@ -212,20 +235,20 @@ class AIHandler:
             
             # All models failed
             self.error_count += 1
+            ai_metrics.requests.inc('failed')
             gaali = random.choice(SAVAGE_GAALIYAN)
-            return FALLBACK_MESSAGES["API_FAILED"].format(gaali=gaali)
+            return FALLBACK_MESSAGES["API_FAILED"].format(gaali=gaali), False
         
         except Exception as e:
             logger.error(f"❌ Critical error in AI handler: {e}")
             self.error_count += 1
+            ai_metrics.requests.inc('error')
             gaali = random.choice(SAVAGE_GAALIYAN)
-            return FALLBACK_MESSAGES["GENERAL_ERROR"].format(gaali=gaali)
+            return FALLBACK_MESSAGES["GENERAL_ERROR"].format(gaali=gaali), False
     
-    def _update_user_memory(self, user_id: int, chat_id: int, user_message: str, ai_response: str):
-        """Update user conversation memory"""
+    def _remember(self, user_memory: Dict, user_message: str, ai_response: str):
+        """Add an exchange to the user's conversation memory (saved by the caller)"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
-            
             # Add messages to history
             history = user_memory.get('history', [])
             history.append({"role": "user", "content": user_message})
@@ -243,12 +266,6 @@ class AIHandler:
                 recent_messages = history[-4:]
                 user_memory['summary'] = f"Recent chat about: {recent_messages[-2]['content'][:100]}..."
             
-            # Save to database
-            db.save_user_memory(user_id, chat_id, user_memory, user_memory.get('summary'))
-            
-            # Update user stats
-            db.update_user_stats(user_id, commands=1)
-            
         except Exception as e:
             logger.error(f"❌ Failed to update user memory: {e}")
     
@@ -259,9 +276,9 @@ class AIHandler:
             if not api_key.startswith('sk-or-v1-'):
                 return False
             
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             user_memory['api_key'] = api_key
-            db.save_user_memory(user_id, chat_id, user_memory)
+            self.db.save_user_memory(user_id, chat_id, user_memory)
             
             logger.info(f"✅ API key set for user {user_id}")
             return True
@@ -276,9 +293,9 @@ class AIHandler:
             if model not in AVAILABLE_MODELS:
                 return False
             
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             user_memory['model'] = model
-            db.save_user_memory(user_id, chat_id, user_memory)
+            self.db.save_user_memory(user_id, chat_id, user_memory)
             
             logger.info(f"✅ Model set to {model} for user {user_id}")
             return True
@@ -290,7 +307,7 @@ class AIHandler:
     def set_ai_settings(self, user_id: int, chat_id: int, **settings) -> bool:
         """Set AI settings for user"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             
             # Update allowed settings
             allowed_settings = ['ai_system_prompt', 'ai_temp', 'ai_max_tokens']
@@ -298,7 +315,7 @@ class AIHandler:
                 if key in allowed_settings:
                     user_memory[key] = value
             
-            db.save_user_memory(user_id, chat_id, user_memory)
+            self.db.save_user_memory(user_id, chat_id, user_memory)
             
             logger.info(f"✅ AI settings updated for user {user_id}")
             return True
@@ -310,7 +327,7 @@ class AIHandler:
     def get_user_settings(self, user_id: int, chat_id: int) -> Dict[str, Any]:
         """Get user's AI settings"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             
             return {
                 'api_key': bool(user_memory.get('api_key')),
@@ -328,10 +345,10 @@ class AIHandler:
     def clear_user_memory(self, user_id: int, chat_id: int) -> bool:
         """Clear user's conversation memory"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             user_memory['history'] = []
             user_memory['summary'] = "New conversation"
-            db.save_user_memory(user_id, chat_id, user_memory)
+            self.db.save_user_memory(user_id, chat_id, user_memory)
             
             logger.info(f"✅ Memory cleared for user {user_id}")
             return True
@@ -437,7 +454,7 @@ class AIHandler:
     def roast_user(self, user_id: int, chat_id: int, target_message: str = None) -> str:
         """Generate a savage roast"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             api_key = user_memory.get('api_key')
             
             if not api_key:
@@ -502,7 +519,7 @@ class AIHandler:
     def translate_text(self, user_id: int, chat_id: int, text: str, target_lang: str = "Hinglish") -> str:
         """Translate text to target language"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             api_key = user_memory.get('api_key')
             
             if not api_key:
@@ -548,7 +565,7 @@ class AIHandler:
     def summarize_text(self, user_id: int, chat_id: int, text: str) -> str:
         """Summarize long text"""
         try:
-            user_memory = db.get_user_memory(user_id, chat_id)
+            user_memory = self.db.get_user_memory(user_id, chat_id)
             api_key = user_memory.get('api_key')
             
             if not api_key:
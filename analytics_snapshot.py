@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+💾 ANALYTICS SNAPSHOT
+Ultimate Group King Bot - Persistent Analytics State
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Every activity event appended to a compact binary delta log
+- Log writes buffered in memory and done by a background thread
+- Periodic compaction: snapshot + closed log segments -> new snapshot, off the event loop
+- Startup recovery: one sequential read of the snapshot, then the newer segments
+- Message text is never written to disk
+- Snapshots are zlib-compressed JSON: loading one never runs code
+"""
+
+import atexit
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from activity_log import ACTIONS, ACTION_CODES
+from analytics_state import BigDataCollectors
+from config import ANALYTICS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'UGKA'
+SNAPSHOT_VERSION = 2  # v1 snapshots were pickles and are never loaded
+SNAPSHOT_HEADER = struct.Struct('<4sHI')  # magic, version, first log segment not folded in
+EVENT = struct.Struct('<dqqBB')  # timestamp, user_id, chat_id (0 = none), action code, command length
+SEGMENT_PREFIX = 'deltas-'
+SEGMENT_SUFFIX = '.log'
+
+def encode_event(now: float, user_id: int, chat_id: Optional[int], action: str, command: Optional[str]) -> bytes:
+    name = (command or '').encode('utf-8')[:255]
+    return EVENT.pack(now, user_id, chat_id or 0, ACTION_CODES.get(action, ACTION_CODES['other']), len(name)) + name
+
+def iter_events(data: bytes) -> Iterator[Tuple]:
+    """(now, user_id, chat_id, action, command) per record; a torn last record is skipped."""
+    offset = 0
+    end = len(data)
+    while offset + EVENT.size <= end:
+        now, user_id, chat_id, action, length = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        if offset + length > end:
+            break
+        command = data[offset:offset + length].decode('utf-8', errors='ignore') or None
+        offset += length
+        yield now, user_id, chat_id or None, ACTIONS[action], command
+
+class AnalyticsPersistence:
+    """Snapshot + delta log for BigDataCollectors.
+
+    The event loop only appends packed records to a buffer. A background
+    thread writes the buffer to the current log segment every flush_interval
+    and, every snapshot_interval (or once the segment grows past
+    max_log_bytes), starts a new segment and folds the closed ones into a new
+    snapshot. Compaction rebuilds the state from files in a fresh
+    BigDataCollectors instead of serialising the live one, so it never holds
+    up handlers; it briefly needs memory for a second copy of the state.
+    """
+
+    def __init__(self, config: Dict = ANALYTICS_CONFIG):
+        self.directory = config["data_dir"]
+        self.flush_interval = config["flush_interval"]
+        self.snapshot_interval = config["snapshot_interval"]
+        self.max_log_bytes = config["max_log_bytes"]
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._io_lock = threading.RLock()
+        self._segment = 0
+        self._segment_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_snapshot_at = time.time()
+        self.stats = {'logged': 0, 'flushes': 0, 'snapshots': 0, 'restored_events': 0, 'errors': 0}
+
+    # --- Files ---
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, 'snapshot.bin')
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}")
+
+    def _segments(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(numbers)
+
+    def _read_snapshot(self) -> Tuple[Optional[Dict], int]:
+        """(state dict or None, first segment not folded into it)."""
+        if not os.path.exists(self.snapshot_path):
+            return None, 0
+        with open(self.snapshot_path, 'rb') as f:
+            data = f.read()
+        magic, version, next_segment = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not an analytics snapshot ({magic!r})")
+        if version != SNAPSHOT_VERSION:
+            logger.warning(f"⚠️ Ignoring analytics snapshot v{version} (expected v{SNAPSHOT_VERSION}); "
+                           f"it is replaced at the next compaction")
+            return None, next_segment
+        return json.loads(zlib.decompress(data[SNAPSHOT_HEADER.size:])), next_segment
+
+    def _write_snapshot(self, state: Dict, next_segment: int):
+        payload = zlib.compress(json.dumps(state, separators=(',', ':'), default=str).encode('utf-8'), 1)
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, next_segment))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+    def _replay(self, state: BigDataCollectors, segments: List[int]) -> int:
+        replayed = 0
+        for number in segments:
+            with open(self._segment_path(number), 'rb') as f:
+                data = f.read()
+            for event in iter_events(data):
+                state.record_event(*event)
+                replayed += 1
+        return replayed
+
+    # --- Lifecycle ---
+
+    def restore(self, state: BigDataCollectors) -> int:
+        """Loads the snapshot and newer log segments into `state`, then starts logging."""
+        os.makedirs(self.directory, exist_ok=True)
+        started = time.perf_counter()
+        next_segment = 0
+        try:
+            snapshot, next_segment = self._read_snapshot()
+            if snapshot:
+                state.load_state(snapshot)
+            self.stats['restored_events'] = self._replay(
+                state, [number for number in self._segments() if number >= next_segment])
+            logger.info(f"💾 Analytics restored ({self.stats['restored_events']} logged events replayed) "
+                        f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Could not restore analytics state: {e}")
+        # Never append to a segment that may end in a torn record
+        self._segment = max(self._segments(), default=next_segment - 1) + 1
+        self._start()
+        return self.stats['restored_events']
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="analytics-snapshot", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if (time.time() - self.last_snapshot_at >= self.snapshot_interval
+                        or self._segment_bytes >= self.max_log_bytes):
+                    self.compact()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Analytics persistence failed: {e}")
+
+    def close(self):
+        """Stops the background thread and writes out buffered events."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=30)
+        self.flush()
+
+    # --- Logging & compaction ---
+
+    def log(self, now: float, user_id: int, chat_id: Optional[int], action: str, command: Optional[str]):
+        """Queues one event for the delta log (no I/O; safe on the event loop)."""
+        record = encode_event(now, user_id, chat_id, action, command)
+        with self._lock:
+            self._buffer += record
+        self.stats['logged'] += 1
+
+    def flush(self):
+        with self._lock:
+            data, self._buffer = self._buffer, bytearray()
+        if not data:
+            return
+        with self._io_lock:
+            with open(self._segment_path(self._segment), 'ab') as f:
+                f.write(data)
+            self._segment_bytes += len(data)
+        self.stats['flushes'] += 1
+
+    def compact(self):
+        """Folds closed log segments into a new snapshot (background thread)."""
+        with self._io_lock:
+            self.flush()
+            closed = self._segment
+            self._segment += 1
+            self._segment_bytes = 0
+        self.last_snapshot_at = time.time()
+
+        snapshot, next_segment = self._read_snapshot()
+        segments = [number for number in self._segments() if next_segment <= number <= closed]
+        if not segments:
+            return
+        state = BigDataCollectors()
+        if snapshot:
+            state.load_state(snapshot)
+        replayed = self._replay(state, segments)
+        self._write_snapshot(state.get_state(), closed + 1)
+        for number in segments:
+            os.remove(self._segment_path(number))
+        self.stats['snapshots'] += 1
+        logger.info(f"💾 Analytics snapshot written ({replayed} events folded in)")
+
+    def get_status(self) -> Dict:
+        return {
+            'segment': self._segment,
+            'segment_bytes': self._segment_bytes,
+            'buffered_bytes': len(self._buffer),
+            **self.stats
+        }
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+🧮 ANALYTICS STATE
+Ultimate Group King Bot - Big Data Collectors
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- All in-memory analytics collectors in one place
+- One entry point (record_event) for live updates and log replay alike
+- State exported/imported as a JSON-safe dict for snapshots
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict
+
+from activity_log import ActivityStore
+from activity_aggregates import ActivityAggregates, ActiveUserCounter
+from heavy_hitters import SpaceSaving
+from config import ANALYTICS_CONFIG
+
+# Collectors with their own get_state()/load_state() (everything else record_event touches is below)
+STATE_COLLECTORS = ('user_activity', 'aggregates', 'active_users', 'top_commands', 'top_users', 'top_groups')
+
+def _command_category(command: str) -> str:
+    if command.startswith('/admin'):
+        return 'admin'
+    if command.startswith('/fun'):
+        return 'fun'
+    if command.startswith('/economy'):
+        return 'economy'
+    return 'general'
+
+class BigDataCollectors:
+    """Analytics collectors fed one event at a time.
+
+    Nothing here depends on Telegram objects or wall-clock time: an event
+    carries its own timestamp, so replaying a log rebuilds the same state.
+    """
+
+    def __init__(self):
+        self.user_activity = ActivityStore()  # bounded per-user ring buffers
+        self.aggregates = ActivityAggregates()  # hourly/daily/trend counters, updated per event
+        self.active_users = ActiveUserCounter(ANALYTICS_CONFIG["active_window_minutes"])
+        self.command_stats = defaultdict(int)
+        self.command_categories = defaultdict(int)
+        self.total_commands = 0
+        # Streaming leaderboards (bounded, O(1) per event)
+        self.top_commands = SpaceSaving(ANALYTICS_CONFIG["top_k_capacity"])
+        self.top_users = SpaceSaving(ANALYTICS_CONFIG["top_k_capacity"])
+        self.top_groups = SpaceSaving(ANALYTICS_CONFIG["top_k_capacity"])
+        self.group_stats = defaultdict(dict)
+        self.error_logs = []
+        self.performance_metrics = {}
+
+    def record_event(self, now: float, user_id: int, chat_id: int = None, action: str = 'message',
+                     command: str = None, text: str = None):
+        """Applies one activity event to every collector."""
+        timestamp = datetime.fromtimestamp(now)
+
+        # User activity tracking (text is kept only for sampled events)
+        previous = self.user_activity.record(user_id, action, chat_id, command, text, now=now)
+        self.aggregates.record(now, command)
+        self.active_users.seen(now, previous)
+        self.top_users.add(user_id)
+
+        # Command statistics
+        if command:
+            self.command_stats[command] += 1
+            self.command_categories[_command_category(command)] += 1
+            self.total_commands += 1
+            self.top_commands.add(command)
+
+        # Group statistics
+        if chat_id is not None:
+            if chat_id not in self.group_stats:
+                self.group_stats[chat_id] = {
+                    'message_count': 0,
+                    'user_count': 0,
+                    'last_activity': timestamp,
+                    'commands_used': defaultdict(int)
+                }
+
+            self.group_stats[chat_id]['message_count'] += 1
+            self.top_groups.add(chat_id)
+            self.group_stats[chat_id]['last_activity'] = timestamp
+
+            if command:
+                self.group_stats[chat_id]['commands_used'][command] += 1
+
+        # Performance metrics
+        self.performance_metrics['last_update'] = timestamp
+        self.performance_metrics['total_users'] = len(self.user_activity)
+        self.performance_metrics['total_commands'] = self.total_commands
+        self.performance_metrics['active_groups'] = len(self.group_stats)
+
+    def get_state(self) -> Dict:
+        """Everything record_event touches, as plain JSON types (no pickling needed)."""
+        state = {name: getattr(self, name).get_state() for name in STATE_COLLECTORS}
+        state.update({
+            'command_stats': dict(self.command_stats),
+            'command_categories': dict(self.command_categories),
+            'total_commands': self.total_commands,
+            'group_stats': [
+                [chat_id, {**stats, 'last_activity': stats['last_activity'].isoformat(),
+                           'commands_used': dict(stats['commands_used'])}]
+                for chat_id, stats in self.group_stats.items()
+            ],
+            'error_logs': list(self.error_logs),
+            'performance_metrics': {
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in self.performance_metrics.items()
+            }
+        })
+        return state
+
+    def load_state(self, state: Dict):
+        for name in STATE_COLLECTORS:
+            getattr(self, name).load_state(state[name])
+        self.command_stats = defaultdict(int, state['command_stats'])
+        self.command_categories = defaultdict(int, state['command_categories'])
+        self.total_commands = state['total_commands']
+        self.group_stats = defaultdict(dict)
+        for chat_id, stats in state['group_stats']:
+            self.group_stats[chat_id] = {
+                **stats,
+                'last_activity': datetime.fromisoformat(stats['last_activity']),
+                'commands_used': defaultdict(int, stats['commands_used'])
+            }
+        self.error_logs = list(state['error_logs'])
+        self.performance_metrics = dict(state['performance_metrics'])
+        if 'last_update' in self.performance_metrics:
+            self.performance_metrics['last_update'] = datetime.fromisoformat(self.performance_metrics['last_update'])
@@ -9,6 +9,7 @@ import os
 import sys
 import asyncio
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -23,83 +24,244 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Import all modules
-from database import Database
-from working_commands import WorkingCommands
-from magical_features import MagicalFeatures
+from plugin_loader import LazyPlugin, boot_report
+
+# Core imports (feature modules are loaded lazily below)
+with boot_report.phase("core imports"):
+    from database import bootstrap_database, wait_for_async_database, close_database
+    from metrics import current_handler, describe_update, loop_lag
+    from update_processor import ChatOrderedUpdateProcessor
+    from send_scheduler import send_scheduler
+    from rate_limiter import rate_limit_middleware
+    from callback_router import CallbackRouter
+    from keyword_matcher import KeywordMatcher
+    from response_templates import ResponseTemplate, build_keyboard
+    from config import CONCURRENCY_CONFIG, WEBHOOK_CONFIG, METRICS_CONFIG
+
+    # Telegram imports
+    from telegram import Update
+    from telegram.ext import (
+        Application, CommandHandler, MessageHandler,
+        CallbackQueryHandler, TypeHandler, filters, ContextTypes
+    )
+
+# Feature modules: registered as stubs, imported and initialised on first use
+# (only the listed handlers exist before then)
+commands = LazyPlugin('working_commands', 'WorkingCommands', handlers=(
+    'about_command', 'ai_command', 'calc_command', 'coin_command', 'dare_command', 'dice_command',
+    'fact_command', 'games_command', 'handle_callback_query', 'joke_command', 'ping_command',
+    'play_command', 'roulette_command', 'slots_command', 'stats_command', 'time_command',
+    'truth_command'
+))
+magical = LazyPlugin('magical_features', 'MagicalFeatures', handlers=(
+    'add_magical_effects', 'ban_request_command', 'call_command', 'creative_announce',
+    'handle_magical_callback', 'magic_spell_command', 'tagall_command'
+))
 
 # Advanced Commands
-from ai_handler import AIHandler
-from admin_commands import AdminCommands
-from owner_commands import OwnerCommands
-from custom_commands import CustomCommands
+ai_handler = LazyPlugin('ai_handler', 'AIHandler', handlers=('ask_command', 'chat_command', 'setapi_command'))
+admin = LazyPlugin('admin_commands', 'AdminCommands', handlers=(
+    'ban_command', 'kick_command', 'mute_command', 'unmute_command'
+))
+owner = LazyPlugin('owner_commands', 'OwnerCommands')
+custom = LazyPlugin('custom_commands', 'CustomCommands', handlers=(
+    'add_command', 'create_command', 'custom_command', 'delete_command', 'execute_command',
+    'list_commands'
+))
 
 # Games & Fun
-from fun_commands import FunCommands
-from payment_system import PaymentSystem
-from escrow_system import EscrowSystem
-from store_system import StoreSystem
-from task_system import TaskSystem
-from social_system import SocialSystem
-from identity_system import IdentitySystem
-from politics_system import PoliticsSystem
+fun = LazyPlugin('fun_commands', 'FunCommands', handlers=('handle_game_callback',))
+payment = LazyPlugin('payment_system', 'PaymentSystem')
+escrow = LazyPlugin('escrow_system', 'EscrowSystem')
+store = LazyPlugin('store_system', 'StoreSystem', handlers=('store_command',))
+tasks = LazyPlugin('task_system', 'TaskSystem')
+social = LazyPlugin('social_system', 'SocialSystem', handlers=('handle_social_callback',))
+identity = LazyPlugin('identity_system', 'IdentitySystem')
+politics = LazyPlugin('politics_system', 'PoliticsSystem')
+real_games = LazyPlugin('real_games', 'real_games', handlers=(
+    'coin_start', 'dice_start', 'games_menu', 'handle_game_response', 'math_quiz_start',
+    'number_guess_start', 'riddle_start', 'rps_start', 'show_stats', 'trivia_start',
+    'truth_dare_start', 'word_scramble_start', 'would_rather_start'
+))
 
 # Management
-from group_management import GroupManagement
+group = LazyPlugin('group_management', 'GroupManagement')
 
 # Utilities
-from error_handler import ErrorHandler
-from smart_detection import SmartDetection
-from utility_commands import UtilityCommands
-from economy_commands import EconomyCommands
-from real_games import real_games
-
-# Big Data Analytics
-from admin_data import super_admin_system
-from data_filters import advanced_filter_system
-from data_commands import big_data_commands
-
-# Telegram imports
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import (
-    Application, CommandHandler, MessageHandler,
-    CallbackQueryHandler, filters, ContextTypes
+error = LazyPlugin('error_handler', 'ErrorHandler', handlers=('error_handler',))
+detection = LazyPlugin('smart_detection', 'SmartDetection', handlers=(
+    'detect_command', 'handle_detection_callback', 'scan_command'
+))
+utility = LazyPlugin('utility_commands', 'UtilityCommands')
+economy = LazyPlugin('economy_commands', 'EconomyCommands', handlers=(
+    'balance_command', 'deposit_command', 'transfer_command', 'wallet_command', 'withdraw_command'
+))
+
+# Big Data Analytics (pulls in numpy/psutil only when first used)
+big_data = LazyPlugin('data_commands', 'big_data_commands', handlers=(
+    'advanced_filter_command', 'analytics_command', 'big_data_monitor_command',
+    'export_data_command', 'filter_command', 'filter_stats_command', 'handle_analytics_callback',
+    'handle_export_filter_callback', 'handle_monitor_callback', 'preset_filters_command'
+))
+analytics = LazyPlugin('admin_data', 'super_admin_system', name='analytics')
+
+# --- Prerendered Responses (compiled and validated once at import) ---
+
+START_KEYBOARD = build_keyboard([
+    [("🎮 Games", "menu_games"), ("🤖 AI Chat", "menu_ai")],
+    [("🌟 Magical", "menu_magical"), ("👑 Admin", "menu_admin")],
+    [("🏪 Store", "menu_store"), ("📊 Stats", "menu_stats")]
+])
+
+START_NEW_TEMPLATE = ResponseTemplate(
+    "🎉 **Welcome to ULTIMATE KING BOT!** 🎉\n\n"
+    "👋 Hello {first_name}!\n"
+    "🆕 New account created!\n"
+    "🎮 **600+ Commands Available!**\n"
+    "🔥 **24/7 Online Service**\n"
+    "⚡ **Lightning Fast Response**\n\n"
+    "📋 **Quick Start:**\n"
+    "• /help - View all commands\n"
+    "• /ai - Chat with AI\n"
+    "• /games - Play games\n"
+    "• /magic - Cast magical spells\n"
+    "• /poll - Create polls\n"
+    "• /contest - Start contests\n\n"
+    "🌟 **Special Features:**\n"
+    "• /tagall - Tag all members\n"
+    "• /call - Emergency call\n"
+    "• /banrequest - Democratic ban\n"
+    "• /superadmin - Admin panel\n\n"
+    "👑 **Created by: @nikhilmehra099**",
+    keyboard=START_KEYBOARD
+)
+
+START_BACK_TEMPLATE = ResponseTemplate(
+    "🚀 **Welcome Back!** 🚀\n\n"
+    "👋 Hello {first_name}!\n"
+    "📊 **Your Stats:**\n"
+    "• Level: {level}\n"
+    "• Points: {points}\n"
+    "• Games: {games_played}\n"
+    "• Wins: {wins}\n\n"
+    "🎮 **Ready to play?**\n"
+    "• /games - Browse 162 games\n"
+    "• /ai - Chat with AI\n"
+    "• /help - All commands\n\n"
+    "👑 **Created by: @nikhilmehra099**",
+    keyboard=START_KEYBOARD
 )
 
-# Initialize Database and Commands
-db = Database()
-commands = WorkingCommands()
-magical = MagicalFeatures()
-
-# Connect to database AFTER all modules are imported
-try:
-    db.connect()
-    print("✅ Database connected successfully!")
-except Exception as e:
-    print(f"⚠️ Database connection failed: {e}")
-    print("🚀 Bot will continue without database...")
-
-# Initialize all modules (without database connection for now)
-ai_handler = AIHandler()
-admin = AdminCommands()
-owner = OwnerCommands()
-custom = CustomCommands()
-fun = FunCommands()
-payment = PaymentSystem()
-escrow = EscrowSystem()
-store = StoreSystem()
-tasks = TaskSystem()
-social = SocialSystem()
-identity = IdentitySystem()
-politics = PoliticsSystem()
-group = GroupManagement()
-error = ErrorHandler()
-detection = SmartDetection()
-utility = UtilityCommands()
-economy = EconomyCommands()
-
-# Initialize Big Data Analytics (without database for now)
-big_data = big_data_commands
+HELP_KEYBOARD = build_keyboard([
+    [("🎮 Games", "help_games"), ("🌟 Magical", "help_magical")],
+    [("👑 Admin", "help_admin"), ("📊 Analytics", "help_data")],
+    [("🤖 AI", "help_ai"), ("🏪 Store", "help_store")],
+    [("🗳️ Politics", "help_politics"), ("👤 Identity", "help_identity")]
+])
+
+HELP_TEMPLATE = ResponseTemplate(
+    "🚀 **ULTIMATE KING BOT - HELP** 🚀\n\n"
+    "🌟 **Complete Feature List!** 🌟\n\n"
+    "📋 **MAIN CATEGORIES:**\n\n"
+    "🎮 **Games & Entertainment:**\n"
+    "• /games - Browse 20 real games\n"
+    "• /play - Play random game\n"
+    "• /roulette - Casino roulette\n"
+    "• /slots - Slot machine\n"
+    "• /coin - Flip coin\n"
+    "• /dice - Roll dice\n"
+    "• /joke - Random jokes\n"
+    "• /truth - Truth or dare\n"
+    "• /dare - Get a dare\n"
+    "• /fact - Random facts\n\n"
+    "🌟 **Magical Features:**\n"
+    "• /tagall [msg] - Tag all members\n"
+    "• /call [msg] - Emergency call\n"
+    "• /magic [spell] - Cast spells\n"
+    "• /thunder - Lightning strike\n"
+    "• /fire - Fire storm\n"
+    "• /ice - Ice freeze\n"
+    "• /shadow - Shadow bind\n"
+    "• /heal - Healing light\n"
+    "• /teleport - Teleport\n"
+    "• /poison - Poison dart\n"
+    "• /earthquake - Earthquake\n"
+    "• /tsunami - Tsunami waves\n"
+    "• /tornado - Tornado vortex\n"
+    "• /effects - Random effects\n"
+    "• /announce [msg] - Announcement\n\n"
+    "🤖 **AI Commands:**\n"
+    "• /ai [message] - Chat with AI\n"
+    "• /ask [question] - Ask AI\n"
+    "• /chat - AI conversation\n"
+    "• /image [prompt] - Generate images\n\n"
+    "🏪 **Store & Economy:**\n"
+    "• /createstore - Open your store\n"
+    "• /viewstore [@user] - View stores\n"
+    "• /additem [name] [price] - Add products\n"
+    "• /wallet - Check balance\n"
+    "• /deposit [amount] - Add funds\n"
+    "• /withdraw [amount] - Withdraw\n"
+    "• /transfer [amount] @user - Send money\n"
+    "• /balance - Check balance\n\n"
+    "🗳️ **Politics System:**\n"
+    "• /election [title] - Start election\n"
+    "• /nominate [manifesto] - Run for office\n"
+    "• /vote [candidate_id] - Cast vote\n"
+    "• /results - Election results\n"
+    "• /endelection - End election\n\n"
+    "👤 **Identity & Business:**\n"
+    "• /setid [@handle] - Set custom ID\n"
+    "• /setbio [text] - Set your bio\n"
+    "• /setbusiness [name] - Set business\n"
+    "• /identity - View identity card\n\n"
+    "👑 **Admin Tools:**\n"
+    "• /ban [@user] [reason] - Ban user\n"
+    "• /kick [@user] [reason] - Kick user\n"
+    "• /mute [@user] [time] - Mute user\n"
+    "• /unmute [@user] - Unmute user\n"
+    "• /promote [@user] - Promote admin\n"
+    "• /demote [@user] - Demote admin\n"
+    "• /pin - Pin message (reply)\n"
+    "• /unpin - Unpin message\n"
+    "• /delete - Delete message (reply)\n"
+    "• /purge - Delete multiple messages\n\n"
+    "� **Utilities:**\n"
+    "• /calc [expression] - Calculator\n"
+    "• /time - Current time\n"
+    "• /ping - Bot speed\n"
+    "• /stats - Your statistics\n"
+    "• /about - About bot\n\n"
+    "⚙️ **Custom Commands:**\n"
+    "• /createcmd - Create custom command\n"
+    "• /deletecmd - Delete command\n"
+    "• /listcmds - List commands\n"
+    "• /runcmd - Execute command\n\n"
+    "📊 **Big Data Analytics:**\n"
+    "• /analytics - View dashboard\n"
+    "• /filter - Filter data\n"
+    "• /advanced_filter - Advanced filters\n"
+    "• /export - Export data\n\n"
+    "👑 **Created by: @nikhilmehra099**\n"
+    "🚀 **Status: ALL SYSTEMS ACTIVE!**",
+    keyboard=HELP_KEYBOARD
+)
+
+HELP_BACK_KEYBOARD = build_keyboard([[("🔙 Back to Help", "help_back")]])
+
+HELP_SECTIONS = {
+    name: ResponseTemplate(text, keyboard=HELP_BACK_KEYBOARD)
+    for name, text in {
+        "games": "🎮 **GAMES COMMANDS** 🎮\n\n• /games - Browse 20 real games\n• /play - Play random game\n• /roulette - Casino\n• /slots - Slots\n• /coin - Coin flip\n• /dice - Roll dice\n• /joke - Jokes\n• /truth - Truth or dare\n• /dare - Get a dare\n• /fact - Random facts",
+        "magical": "🌟 **MAGICAL COMMANDS** 🌟\n\n• /tagall [msg] - Tag all\n• /call [msg] - Emergency call\n• /ban [@user] - Ban with effects\n• /kick [@user] - Kick with effects\n• /banrequest [@user] - Democratic ban\n• /magic [spell] - Cast spells\n• /thunder - Lightning\n• /fire - Fire storm\n• /ice - Ice freeze\n• /shadow - Shadow bind\n• /heal - Healing\n• /teleport - Teleport\n• /effects - Random effects",
+        "admin": "👑 **ADMIN COMMANDS** 👑\n\n• /ban [@user] - Ban user\n• /kick [@user] - Kick user\n• /mute [@user] - Mute user\n• /unmute [@user] - Unmute user\n• /promote [@user] - Promote\n• /demote [@user] - Demote\n• /pin - Pin message\n• /unpin - Unpin\n• /delete - Delete message\n• /purge - Delete multiple",
+        "data": "📊 **BIG DATA ANALYTICS** 📊\n\n• /analytics - Dashboard\n• /filter - Filter data\n• /advanced_filter - Advanced filters\n• /export - Export data\n• /filter_stats - Statistics",
+        "ai": "🤖 **AI COMMANDS** 🤖\n\n• /ai [message] - Chat with AI\n• /ask [question] - Ask AI\n• /chat - AI conversation\n• /image [prompt] - Generate images",
+        "store": "🏪 **STORE COMMANDS** 🏪\n\n• /createstore - Create store\n• /viewstore [@user] - View stores\n• /additem [name] [price] - Add item\n• /buyitem [id] - Buy item\n• /wallet - Check balance\n• /deposit [amount] - Add funds\n• /withdraw [amount] - Withdraw\n• /transfer [amount] @user - Send money",
+        "politics": "🗳️ **POLITICS COMMANDS** 🗳️\n\n• /election [title] - Start election\n• /nominate [manifesto] - Run for office\n• /vote [candidate_id] - Cast vote\n• /results - View results\n• /endelection - End election\n\n**Democratic system for group governance!**",
+        "identity": "👤 **IDENTITY COMMANDS** 👤\n\n• /setid [@handle] - Set custom ID\n• /setbio [text] - Set your bio\n• /setbusiness [name] - Set business name\n• /identity - View identity card\n\n**Create your unique identity!**"
+    }.items()
+}
 
 # --- Command Handlers ---
 
@@ -110,7 +272,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # Get or create user in Astra DB
-        user_data = db.get_user(user.id)
+        adb = await wait_for_async_database()
+        user_data = await adb.get_user(user.id)
         
         if not user_data:
             # Create new user
@@ -129,62 +292,21 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 'level': 1,
                 'exp': 0
             }
-            db.update_user(user.id, user_data)
-            welcome_msg = f"🎉 **Welcome to ULTIMATE KING BOT!** 🎉\n\n"
-            welcome_msg += f"👋 Hello {user.first_name}!\n"
-            welcome_msg += f"🆕 New account created!\n"
-            welcome_msg += f"🎮 **600+ Commands Available!**\n"
-            welcome_msg += f"🔥 **24/7 Online Service**\n"
-            welcome_msg += f"⚡ **Lightning Fast Response**\n\n"
-            welcome_msg += f"📋 **Quick Start:**\n"
-            welcome_msg += f"• /help - View all commands\n"
-            welcome_msg += f"• /ai - Chat with AI\n"
-            welcome_msg += f"• /games - Play games\n"
-            welcome_msg += f"• /magic - Cast magical spells\n"
-            welcome_msg += f"• /poll - Create polls\n"
-            welcome_msg += f"• /contest - Start contests\n\n"
-            welcome_msg += f"🌟 **Special Features:**\n"
-            welcome_msg += f"• /tagall - Tag all members\n"
-            welcome_msg += f"• /call - Emergency call\n"
-            welcome_msg += f"• /banrequest - Democratic ban\n"
-            welcome_msg += f"• /superadmin - Admin panel\n\n"
-            welcome_msg += f"👑 **Created by: @nikhilmehra099**"
+            await adb.update_user(user.id, user_data)
+            await START_NEW_TEMPLATE.reply(update.message, first_name=user.first_name)
         else:
-            # Update last active
+            # Update last active (only the changed field; writes are coalesced)
             user_data['last_active'] = datetime.now().isoformat()
-            db.update_user(user.id, user_data)
+            await adb.update_user(user.id, {'last_active': user_data['last_active']})
             
-            welcome_msg = f"🚀 **Welcome Back!** 🚀\n\n"
-            welcome_msg += f"👋 Hello {user.first_name}!\n"
-            welcome_msg += f"📊 **Your Stats:**\n"
-            welcome_msg += f"• Level: {user_data.get('level', 1)}\n"
-            welcome_msg += f"• Points: {user_data.get('points', 0)}\n"
-            welcome_msg += f"• Games: {user_data.get('games_played', 0)}\n"
-            welcome_msg += f"• Wins: {user_data.get('wins', 0)}\n\n"
-            welcome_msg += f"🎮 **Ready to play?**\n"
-            welcome_msg += f"• /games - Browse 162 games\n"
-            welcome_msg += f"• /ai - Chat with AI\n"
-            welcome_msg += f"• /help - All commands\n\n"
-            welcome_msg += f"👑 **Created by: @nikhilmehra099**"
-
-        # Create welcome keyboard
-        keyboard = [
-            [
-                InlineKeyboardButton("🎮 Games", callback_data="menu_games"),
-                InlineKeyboardButton("🤖 AI Chat", callback_data="menu_ai")
-            ],
-            [
-                InlineKeyboardButton("🌟 Magical", callback_data="menu_magical"),
-                InlineKeyboardButton("👑 Admin", callback_data="menu_admin")
-            ],
-            [
-                InlineKeyboardButton("🏪 Store", callback_data="menu_store"),
-                InlineKeyboardButton("📊 Stats", callback_data="menu_stats")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
-        await update.message.reply_text(welcome_msg, reply_markup=reply_markup, parse_mode='Markdown')
+            await START_BACK_TEMPLATE.reply(
+                update.message,
+                first_name=user.first_name,
+                level=user_data.get('level', 1),
+                points=user_data.get('points', 0),
+                games_played=user_data.get('games_played', 0),
+                wins=user_data.get('wins', 0)
+            )
         
     except Exception as e:
         logger.error(f"Start command error: {e}")
@@ -194,115 +316,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Comprehensive help menu with all features."""
-    help_text = (
-        "🚀 **ULTIMATE KING BOT - HELP** 🚀\n\n"
-        "🌟 **Complete Feature List!** 🌟\n\n"
-        "📋 **MAIN CATEGORIES:**\n\n"
-        "🎮 **Games & Entertainment:**\n"
-        "• /games - Browse 20 real games\n"
-        "• /play - Play random game\n"
-        "• /roulette - Casino roulette\n"
-        "• /slots - Slot machine\n"
-        "• /coin - Flip coin\n"
-        "• /dice - Roll dice\n"
-        "• /joke - Random jokes\n"
-        "• /truth - Truth or dare\n"
-        "• /dare - Get a dare\n"
-        "• /fact - Random facts\n\n"
-        "🌟 **Magical Features:**\n"
-        "• /tagall [msg] - Tag all members\n"
-        "• /call [msg] - Emergency call\n"
-        "• /magic [spell] - Cast spells\n"
-        "• /thunder - Lightning strike\n"
-        "• /fire - Fire storm\n"
-        "• /ice - Ice freeze\n"
-        "• /shadow - Shadow bind\n"
-        "• /heal - Healing light\n"
-        "• /teleport - Teleport\n"
-        "• /poison - Poison dart\n"
-        "• /earthquake - Earthquake\n"
-        "• /tsunami - Tsunami waves\n"
-        "• /tornado - Tornado vortex\n"
-        "• /effects - Random effects\n"
-        "• /announce [msg] - Announcement\n\n"
-        "🤖 **AI Commands:**\n"
-        "• /ai [message] - Chat with AI\n"
-        "• /ask [question] - Ask AI\n"
-        "• /chat - AI conversation\n"
-        "• /image [prompt] - Generate images\n\n"
-        "🏪 **Store & Economy:**\n"
-        "• /createstore - Open your store\n"
-        "• /viewstore [@user] - View stores\n"
-        "• /additem [name] [price] - Add products\n"
-        "• /wallet - Check balance\n"
-        "• /deposit [amount] - Add funds\n"
-        "• /withdraw [amount] - Withdraw\n"
-        "• /transfer [amount] @user - Send money\n"
-        "• /balance - Check balance\n\n"
-        "🗳️ **Politics System:**\n"
-        "• /election [title] - Start election\n"
-        "• /nominate [manifesto] - Run for office\n"
-        "• /vote [candidate_id] - Cast vote\n"
-        "• /results - Election results\n"
-        "• /endelection - End election\n\n"
-        "👤 **Identity & Business:**\n"
-        "• /setid [@handle] - Set custom ID\n"
-        "• /setbio [text] - Set your bio\n"
-        "• /setbusiness [name] - Set business\n"
-        "• /identity - View identity card\n\n"
-        "👑 **Admin Tools:**\n"
-        "• /ban [@user] [reason] - Ban user\n"
-        "• /kick [@user] [reason] - Kick user\n"
-        "• /mute [@user] [time] - Mute user\n"
-        "• /unmute [@user] - Unmute user\n"
-        "• /promote [@user] - Promote admin\n"
-        "• /demote [@user] - Demote admin\n"
-        "• /pin - Pin message (reply)\n"
-        "• /unpin - Unpin message\n"
-        "• /delete - Delete message (reply)\n"
-        "• /purge - Delete multiple messages\n\n"
-        "� **Utilities:**\n"
-        "• /calc [expression] - Calculator\n"
-        "• /time - Current time\n"
-        "• /ping - Bot speed\n"
-        "• /stats - Your statistics\n"
-        "• /about - About bot\n\n"
-        "⚙️ **Custom Commands:**\n"
-        "• /createcmd - Create custom command\n"
-        "• /deletecmd - Delete command\n"
-        "• /listcmds - List commands\n"
-        "• /runcmd - Execute command\n\n"
-        "📊 **Big Data Analytics:**\n"
-        "• /analytics - View dashboard\n"
-        "• /filter - Filter data\n"
-        "• /advanced_filter - Advanced filters\n"
-        "• /export - Export data\n\n"
-        "👑 **Created by: @nikhilmehra099**\n"
-        "🚀 **Status: ALL SYSTEMS ACTIVE!**"
-    )
-    
-    # Create help menu keyboard
-    keyboard = [
-        [
-            InlineKeyboardButton("🎮 Games", callback_data="help_games"),
-            InlineKeyboardButton("🌟 Magical", callback_data="help_magical")
-        ],
-        [
-            InlineKeyboardButton("👑 Admin", callback_data="help_admin"),
-            InlineKeyboardButton("📊 Analytics", callback_data="help_data")
-        ],
-        [
-            InlineKeyboardButton("🤖 AI", callback_data="help_ai"),
-            InlineKeyboardButton("🏪 Store", callback_data="help_store")
-        ],
-        [
-            InlineKeyboardButton("🗳️ Politics", callback_data="help_politics"),
-            InlineKeyboardButton("👤 Identity", callback_data="help_identity")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await update.message.reply_text(help_text, reply_markup=reply_markup, parse_mode='Markdown')
+    await HELP_TEMPLATE.reply(update.message)
 
 async def menu_callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle main menu callbacks."""
@@ -331,85 +345,94 @@ async def help_callback_handler(update: Update, context: ContextTypes.DEFAULT_TY
     
     help_type = query.data.replace("help_", "")
     
-    help_texts = {
-        "games": "🎮 **GAMES COMMANDS** 🎮\n\n• /games - Browse 20 real games\n• /play - Play random game\n• /roulette - Casino\n• /slots - Slots\n• /coin - Coin flip\n• /dice - Roll dice\n• /joke - Jokes\n• /truth - Truth or dare\n• /dare - Get a dare\n• /fact - Random facts",
-        
-        "magical": "🌟 **MAGICAL COMMANDS** 🌟\n\n• /tagall [msg] - Tag all\n• /call [msg] - Emergency call\n• /ban [@user] - Ban with effects\n• /kick [@user] - Kick with effects\n• /banrequest [@user] - Democratic ban\n• /magic [spell] - Cast spells\n• /thunder - Lightning\n• /fire - Fire storm\n• /ice - Ice freeze\n• /shadow - Shadow bind\n• /heal - Healing\n• /teleport - Teleport\n• /effects - Random effects",
-        
-        "admin": "👑 **ADMIN COMMANDS** 👑\n\n• /ban [@user] - Ban user\n• /kick [@user] - Kick user\n• /mute [@user] - Mute user\n• /unmute [@user] - Unmute user\n• /promote [@user] - Promote\n• /demote [@user] - Demote\n• /pin - Pin message\n• /unpin - Unpin\n• /delete - Delete message\n• /purge - Delete multiple",
-        
-        "data": "📊 **BIG DATA ANALYTICS** 📊\n\n• /analytics - Dashboard\n• /filter - Filter data\n• /advanced_filter - Advanced filters\n• /export - Export data\n• /filter_stats - Statistics",
-        
-        "ai": "🤖 **AI COMMANDS** 🤖\n\n• /ai [message] - Chat with AI\n• /ask [question] - Ask AI\n• /chat - AI conversation\n• /image [prompt] - Generate images",
-        
-        "store": "🏪 **STORE COMMANDS** 🏪\n\n• /createstore - Create store\n• /viewstore [@user] - View stores\n• /additem [name] [price] - Add item\n• /buyitem [id] - Buy item\n• /wallet - Check balance\n• /deposit [amount] - Add funds\n• /withdraw [amount] - Withdraw\n• /transfer [amount] @user - Send money",
-        
-        "politics": "🗳️ **POLITICS COMMANDS** 🗳️\n\n• /election [title] - Start election\n• /nominate [manifesto] - Run for office\n• /vote [candidate_id] - Cast vote\n• /results - View results\n• /endelection - End election\n\n**Democratic system for group governance!**",
-        
-        "identity": "👤 **IDENTITY COMMANDS** 👤\n\n• /setid [@handle] - Set custom ID\n• /setbio [text] - Set your bio\n• /setbusiness [name] - Set business name\n• /identity - View identity card\n\n**Create your unique identity!**"
-    }
-    
-    text = help_texts.get(help_type, "❌ Category not found")
-    
-    # Back button
-    keyboard = [[InlineKeyboardButton("🔙 Back to Help", callback_data="help_back")]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(text=text, reply_markup=reply_markup, parse_mode='Markdown')
-
-async def callback_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Main callback query handler."""
-    query = update.callback_query
-    data = query.data
-    
-    if data.startswith("menu_"):
-        await menu_callback_handler(update, context)
-    elif data.startswith("help_"):
-        await help_callback_handler(update, context)
-    elif data.startswith("game_"):
-        # Real games callbacks
-        if data == "game_number_guess":
-            await real_games.number_guess_start(update, context)
-        elif data == "game_word_scramble":
-            await real_games.word_scramble_start(update, context)
-        elif data == "game_math_quiz":
-            await real_games.math_quiz_start(update, context)
-        elif data == "game_trivia":
-            await real_games.trivia_start(update, context)
-        elif data == "game_riddle":
-            await real_games.riddle_start(update, context)
-        elif data == "game_rps":
-            await real_games.rps_start(update, context)
-        elif data == "game_coin":
-            await real_games.coin_start(update, context)
-        elif data == "game_dice":
-            await real_games.dice_start(update, context)
-        elif data == "game_truth_dare":
-            await real_games.truth_dare_start(update, context)
-        elif data == "game_would_rather":
-            await real_games.would_rather_start(update, context)
-        elif data == "game_stats":
-            await real_games.show_stats(update, context)
-        else:
-            await commands.handle_callback_query(update, context)
-    elif data.startswith("magical_"):
-        await magical.handle_magical_callback(update, context)
-    elif data.startswith("super_"):
-        await big_data.filter_command(update, context)
-    elif data.startswith("data_"):
-        await big_data.filter_command(update, context)
-    elif data.startswith("detection_"):
-        await detection.handle_detection_callback(update, context)
+    if help_type == "back":
+        await HELP_TEMPLATE.edit(query)
+    elif help_type in HELP_SECTIONS:
+        await HELP_SECTIONS[help_type].edit(query)
     else:
-        await query.answer("Unknown callback")
+        await query.edit_message_text("❌ Category not found", reply_markup=HELP_BACK_KEYBOARD)
+
+# --- Callback Routing ---
+
+async def unknown_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Fallback for buttons without a registered route."""
+    await update.callback_query.answer("Unknown callback")
+
+callback_router = CallbackRouter(fallback=unknown_callback)
+
+# Prefix routes: the longest registered prefix of the callback data wins
+CALLBACK_PREFIX_ROUTES = {
+    "menu_": menu_callback_handler,
+    "help_": help_callback_handler,
+    "game_": commands.handle_callback_query,
+    "magical_": magical.handle_magical_callback,
+    "call_": magical.handle_magical_callback,
+    "ban_vote_": magical.handle_magical_callback,
+    "ban_votes_": magical.handle_magical_callback,
+    "super_": big_data.filter_command,
+    "data_": big_data.filter_command,
+    "analytics_": big_data.handle_analytics_callback,
+    "monitor_": big_data.handle_monitor_callback,
+    "export_filter_": big_data.handle_export_filter_callback,
+    "detection_": detection.handle_detection_callback,
+    "marry_": social.handle_social_callback,
+    "riddle_": fun.handle_game_callback,
+    "truth_": fun.handle_game_callback,
+    "dare_": fun.handle_game_callback,
+    "joke_": fun.handle_game_callback,
+    "dice_battle_": fun.handle_game_callback,
+}
+
+# Exact routes: real games started from the games menu, and the /joke rating
+# buttons (FunCommands' joke_ buttons carry a user id, these don't)
+CALLBACK_EXACT_ROUTES = {
+    "game_number_guess": real_games.number_guess_start,
+    "game_word_scramble": real_games.word_scramble_start,
+    "game_math_quiz": real_games.math_quiz_start,
+    "game_trivia": real_games.trivia_start,
+    "game_riddle": real_games.riddle_start,
+    "game_rps": real_games.rps_start,
+    "game_coin": real_games.coin_start,
+    "game_dice": real_games.dice_start,
+    "game_truth_dare": real_games.truth_dare_start,
+    "game_would_rather": real_games.would_rather_start,
+    "game_stats": real_games.show_stats,
+    "joke_funny": commands.handle_callback_query,
+    "joke_okay": commands.handle_callback_query,
+    "joke_boring": commands.handle_callback_query,
+}
+
+for prefix, handler in CALLBACK_PREFIX_ROUTES.items():
+    callback_router.add(prefix, handler)
+for data, handler in CALLBACK_EXACT_ROUTES.items():
+    callback_router.add(data, handler, exact=True)
+
+def update_label(update: Update) -> str:
+    """Latency label: the command, or the callback route that handles the button."""
+    if update.callback_query is not None:
+        route = callback_router.resolve(update.callback_query.data or '')
+        return f"callback:{route.name if route else 'unknown'}"
+    return describe_update(update)
+
+# Plain-text hints, compiled once (earlier intents win when several match).
+# Plain substrings, so "hiii" greets and "helpful" hints at /help
+HINT_MATCHER = KeywordMatcher([
+    ("greeting", ["hello", "hi", "hey", "namaste"]),
+    ("help", ["help"]),
+    ("game", ["game"]),
+    ("ai", ["ai"]),
+])
+HINT_REPLIES = {
+    "help": "📝 Use /help to see all available commands!",
+    "game": "🎮 Use /games to browse all available games!",
+    "ai": "🤖 Use /ai to chat with AI or /ask to ask questions!",
+}
 
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle regular messages with smart detection."""
     if not update.message or not update.message.text:
         return
     
-    message_text = update.message.text.lower()
-    
     # Check for active game responses first
     if await real_games.handle_game_response(update, context):
         return
@@ -419,18 +442,20 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     # Simple AI responses
-    greetings = ["hello", "hi", "hey", "namaste"]
-    if any(greet in message_text for greet in greetings):
+    hint = HINT_MATCHER.match(update.message.text)
+    if hint is None:
+        return
+    if hint.intent == "greeting":
         await update.message.reply_text(f"👋 Hello {update.effective_user.first_name}! Use /help to see all commands!")
-    
-    elif "help" in message_text:
-        await update.message.reply_text("📝 Use /help to see all available commands!")
-    
-    elif "game" in message_text:
-        await update.message.reply_text("🎮 Use /games to browse all available games!")
-    
-    elif "ai" in message_text:
-        await update.message.reply_text("🤖 Use /ai to chat with AI or /ask to ask questions!")
+    else:
+        await update.message.reply_text(HINT_REPLIES[hint.intent])
+
+async def track_handler_middleware(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Tags DB calls made while processing this update with its handler name
+    and feeds the update into the big data collectors once they are loaded."""
+    current_handler.set(describe_update(update))
+    if analytics.loaded:
+        analytics.collect_big_data(update, context)
 
 def main():
     """Main function to run the bot."""
@@ -440,8 +465,27 @@ def main():
         logger.error("❌ TELEGRAM_BOT_TOKEN not found in environment variables!")
         return
     
-    # Create the Application
-    application = Application.builder().token(bot_token).build()
+    # Connect the database in the background; handlers wait for it on first use
+    bootstrap_database()
+    
+    # Serve the web dashboard (and its /metrics endpoint) from this process
+    if METRICS_CONFIG["dashboard_in_bot"]:
+        from web_dashboard import start_dashboard
+        threading.Thread(target=start_dashboard, name="web-dashboard", daemon=True).start()
+    
+    # Create the Application (chats run in parallel, each chat stays in order,
+    # every outgoing request is paced by the send scheduler)
+    builder = (
+        Application.builder()
+        .token(bot_token)
+        .concurrent_updates(ChatOrderedUpdateProcessor(CONCURRENCY_CONFIG["max_concurrent_updates"], labeler=update_label))
+        .rate_limiter(send_scheduler)
+    )
+    if WEBHOOK_CONFIG["api_base_url"]:
+        api_base_url = WEBHOOK_CONFIG["api_base_url"].rstrip('/')
+        builder = builder.base_url(f"{api_base_url}/bot").base_file_url(f"{api_base_url}/file/bot")
+    application = builder.build()
+    boot_report.checkpoint("application build")
     
     # 🎯 SET BOT COMMANDS MENU
     async def post_init(app: Application) -> None:
@@ -523,9 +567,22 @@ def main():
         ]
         await app.bot.set_my_commands(commands_list)
         logger.info("✅ Bot commands menu set successfully!")
+        loop_lag.start(METRICS_CONFIG["loop_lag_interval"])
+        # Load the analytics collectors off the event loop (they wait for the database)
+        asyncio.get_running_loop().run_in_executor(None, analytics.load)
+        boot_report.mark_ready()
+        logger.info(boot_report.format())
+    
+    async def post_shutdown(app: Application) -> None:
+        """Stop background samplers"""
+        loop_lag.stop()
     
     application.post_init = post_init
+    application.post_shutdown = post_shutdown
 
+    # --- Middleware (runs before every other handler group) ---
+    application.add_handler(TypeHandler(Update, rate_limit_middleware), group=-2)
+    application.add_handler(TypeHandler(Update, track_handler_middleware), group=-1)
     
     # --- Basic Command Handlers ---
     application.add_handler(CommandHandler("start", start_command))
@@ -610,7 +667,7 @@ def main():
     application.add_error_handler(error.error_handler)
     
     # --- Callback Query Handler (including all feature callbacks) ---
-    application.add_handler(CallbackQueryHandler(callback_query_handler))
+    application.add_handler(CallbackQueryHandler(callback_router.dispatch))
     
     # --- Message Handler ---
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler))
@@ -618,10 +675,19 @@ def main():
     # --- New Chat Members Handler ---
     application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, start_command))
     
+    boot_report.checkpoint("handler registration")
     logger.info("🚀 BIG DATA KING BOT is up and running with advanced analytics! 📊")
     
     # Run the bot
-    application.run_polling(drop_pending_updates=True)
+    try:
+        if WEBHOOK_CONFIG["enabled"]:
+            from webhook_server import run_webhook
+            run_webhook(application)
+        else:
+            application.run_polling(drop_pending_updates=True)
+    finally:
+        # Push any buffered database writes before exiting
+        close_database()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+🧭 CALLBACK ROUTER
+Ultimate Group King Bot - Inline Button Dispatch
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Callback data routed by exact value or longest matching prefix
+- Prefix trie lookup, cost grows with the callback data, not the route count
+- Routes registered from a table or with a decorator
+- Per-route hit counts, errors and latency histograms
+"""
+
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+CallbackHandler = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable]
+
+_ROUTE = None  # trie node key holding the route that ends at this node
+
+class CallbackRoute:
+    """One registered handler plus its dispatch statistics."""
+
+    def __init__(self, name: str, handler: CallbackHandler):
+        self.name = name
+        self.handler = handler
+        self.hits = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict:
+        return {'hits': self.hits, 'errors': self.errors, **self.latency.snapshot()}
+
+class CallbackRouter:
+    """Maps callback data to handlers.
+
+    Exact routes are a dict lookup; prefix routes live in a character trie
+    walked once over the callback data, so the longest registered prefix wins
+    ("game_number_guess" beats "game_") no matter how many routes exist.
+    """
+
+    def __init__(self, fallback: Optional[CallbackHandler] = None):
+        self._exact: Dict[str, CallbackRoute] = {}
+        self._trie: Dict = {}
+        self.fallback = fallback
+        self.unmatched = 0
+
+    def add(self, pattern: str, handler: CallbackHandler, exact: bool = False, name: str = None):
+        """Registers `handler` for callback data equal to / starting with `pattern`."""
+        route = CallbackRoute(name or pattern, handler)
+        if exact:
+            if pattern in self._exact:
+                raise ValueError(f"Callback route '{pattern}' is already registered")
+            self._exact[pattern] = route
+            return route
+
+        node = self._trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        if _ROUTE in node:
+            raise ValueError(f"Callback prefix '{pattern}' is already registered")
+        node[_ROUTE] = route
+        return route
+
+    def route(self, pattern: str, exact: bool = False, name: str = None):
+        """Decorator form of add()."""
+        def decorator(handler: CallbackHandler) -> CallbackHandler:
+            self.add(pattern, handler, exact=exact, name=name)
+            return handler
+        return decorator
+
+    def resolve(self, data: str) -> Optional[CallbackRoute]:
+        route = self._exact.get(data)
+        if route is not None:
+            return route
+        node = self._trie
+        for char in data:
+            node = node.get(char)
+            if node is None:
+                break
+            route = node.get(_ROUTE, route)
+        return route
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """CallbackQueryHandler callback: runs the matching route."""
+        data = update.callback_query.data or ''
+        route = self.resolve(data)
+        if route is None:
+            self.unmatched += 1
+            logger.debug(f"🧭 No callback route for '{data}'")
+            if self.fallback:
+                await self.fallback(update, context)
+            return
+
+        started = time.perf_counter()
+        try:
+            await route.handler(update, context)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            route.hits += 1
+            route.latency.observe(time.perf_counter() - started)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-route statistics, busiest routes first."""
+        routes = list(self._exact.values())
+        stack = [self._trie]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key is _ROUTE:
+                    routes.append(child)
+                else:
+                    stack.append(child)
+        stats = {route.name: route.snapshot() for route in routes}
+        return dict(sorted(stats.items(), key=lambda item: item[1]['hits'], reverse=True))
@@ -45,14 +45,14 @@ def check_bot_status():
     if os.path.exists("database.py"):
         try:
             import database
-            # Test Astra DB connection
-            db_test = database.Database()
-            if db_test.connect():
+            # Test the configured backend (SQLite or Astra DB)
+            db_test = database.get_database()
+            if db_test.db:
                 status["database"] = True
-                status["bot_files"].append(f"✅ Astra DB connected")
+                status["bot_files"].append(f"✅ Database connected ({type(db_test).__name__})")
             else:
-                status["bot_files"].append(f"❌ Astra DB connection failed")
-                status["errors"].append("Astra DB connection failed")
+                status["bot_files"].append(f"❌ Database connection failed")
+                status["errors"].append("Database connection failed")
         except Exception as e:
             status["bot_files"].append(f"❌ Database error: {e}")
             status["errors"].append(f"Database error: {e}")
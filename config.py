@@ -30,7 +30,46 @@ OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')  # Users will set their
 OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY', '5417fa8bfe2191cccd6a57a0aac827fe')
 
 # === DATABASE ===
-DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///ultimate_bot.db')
+# Astra DB is used whenever its endpoint and token are set. The embedded
+# SQLite backend is the fallback without them, or an explicit opt-in with
+# DATABASE_BACKEND=sqlite; its file comes from DATABASE_URL=sqlite:///path.db
+ASTRA_DB_CONFIGURED = bool(os.getenv('ASTRA_DB_API_ENDPOINT') and os.getenv('ASTRA_DB_APPLICATION_TOKEN'))
+DATABASE_BACKEND = os.getenv('DATABASE_BACKEND', 'astra' if ASTRA_DB_CONFIGURED else 'sqlite').lower()
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+SQLITE_URL = DATABASE_URL if DATABASE_URL.startswith('sqlite:') else 'sqlite:///ultimate_bot.db'
+
+# Embedded SQLite backend settings
+SQLITE_CONFIG = {
+    "journal_mode": "WAL",     # Readers don't block the writer
+    "synchronous": "NORMAL",   # Safe with WAL, avoids an fsync per commit
+    "busy_timeout": 5000,      # Milliseconds to wait on a locked database
+    "cached_statements": 256   # Prepared statements kept per connection
+}
+
+# Shared database service (one client per process, reused by every module)
+DATABASE_POOL = {
+    "max_connections": int(os.getenv('DB_MAX_CONNECTIONS', '10')),  # Max in-flight DB calls
+    "acquire_timeout": 30  # Seconds to wait for a free connection slot
+}
+
+# Write-behind buffer for user updates (coalesces $set fields per user)
+WRITE_BEHIND_CONFIG = {
+    "enabled": True,
+    "max_pending": 500,    # Flush early once this many users have pending writes
+    "flush_interval": 2.0  # Seconds between background flushes
+}
+
+# Outage handling: fail fast once the backend looks down, park writes on disk
+RESILIENCE_CONFIG = {
+    "failure_threshold": 5,   # Consecutive connection failures before the circuit opens
+    "reset_timeout": 30,      # Seconds before a probe call is let through
+    "outbox_path": os.getenv('DB_OUTBOX_PATH', 'data/db_outbox.jsonl')
+}
+
+# Paged reads: documents fetched per round trip when streaming a collection
+CURSOR_CONFIG = {
+    "page_size": 500
+}
 
 # === AI MODELS (OpenRouter) ===
 AVAILABLE_MODELS = [
@@ -651,13 +690,68 @@ RATE_LIMITS = {
     "search_requests_per_hour": 50
 }
 
+# Commands charged to the AI / search budgets in RATE_LIMITS (besides commands_per_minute)
+RATE_LIMITED_COMMANDS = {
+    "ai_requests_per_hour": ["ai", "ask", "chat"],
+    "search_requests_per_hour": ["filter", "advanced_filter", "preset_filters", "export", "scan"]
+}
+
+# Outgoing Bot API requests (Telegram flood limits)
+SEND_LIMITS = {
+    "global_per_second": 30,     # Whole bot
+    "global_burst": 30,
+    "private_per_second": 1,     # Per private chat
+    "private_burst": 3,
+    "group_per_minute": 20,      # Per group/channel
+    "group_burst": 5,
+    "max_retries": 3,            # RetryAfter retries before the error reaches the handler
+    "max_tracked_chats": 10000   # Idle chat buckets are dropped beyond this
+}
+
+# === CONCURRENCY ===
+CONCURRENCY_CONFIG = {
+    "max_concurrent_updates": int(os.getenv('MAX_CONCURRENT_UPDATES', '64'))  # Updates in flight across all chats
+}
+
 # === WEBHOOK CONFIG ===
 WEBHOOK_CONFIG = {
-    "enabled": False,
-    "url": None,
-    "port": 8443,
-    "cert": None,
-    "key": None
+    "enabled": os.getenv('WEBHOOK_ENABLED', 'False').lower() == 'true',  # False = long polling
+    "url": os.getenv('WEBHOOK_URL'),           # Public base URL Telegram posts to
+    "path": "/telegram",                       # Appended to url and served locally
+    "listen": os.getenv('WEBHOOK_LISTEN', '0.0.0.0'),
+    "port": int(os.getenv('WEBHOOK_PORT', '8443')),
+    "secret_token": os.getenv('WEBHOOK_SECRET'),  # Random per start if unset
+    "health_path": "/healthz",
+    "api_base_url": os.getenv('TELEGRAM_API_BASE_URL'),  # e.g. a local fake Telegram server
+    "cert": os.getenv('WEBHOOK_CERT'),         # Self-signed certificate (PEM), uploaded to Telegram
+    "key": os.getenv('WEBHOOK_KEY')            # Its private key; without both, TLS ends at a proxy
+}
+
+# === METRICS EXPORT ===
+METRICS_CONFIG = {
+    "path": "/metrics",          # Prometheus scrape endpoint on the web dashboard (no login)
+    "prefix": "bot",             # Metric name prefix
+    "cache_seconds": 5,          # Rendered output is reused for this long
+    "dashboard_in_bot": os.getenv('METRICS_DASHBOARD', 'False').lower() == 'true',  # Serve the dashboard from the bot process
+    "loop_lag_interval": 1.0     # Seconds between event-loop lag samples
+}
+
+# === ANALYTICS (in-memory big data collectors) ===
+ANALYTICS_CONFIG = {
+    "activity_capacity": 256,         # Events kept per user (ring buffer, oldest overwritten)
+    "activity_max_age": 7 * 86400,    # Seconds; older events are dropped
+    "content_sample_rate": 0.0,       # Fraction of message texts kept (0 = never store text)
+    "max_tracked_users": 100000,      # Least recently active users are dropped beyond this
+    "max_command_names": 4096,        # Distinct command names interned by the activity log
+    "daily_buckets": 90,              # Days of per-day activity counts kept
+    "trend_window_hours": 24,         # Rolling window for trending commands
+    "active_window_minutes": 1440,    # Longest active-users window (per-minute buckets)
+    "top_k_capacity": 100,            # Items monitored per leaderboard (Space-Saving), >> shown top-K
+    "persist": os.getenv('ANALYTICS_PERSIST', 'True').lower() == 'true',  # Snapshot + delta log on disk
+    "data_dir": os.getenv('ANALYTICS_DATA_DIR', 'data/analytics'),
+    "flush_interval": 1.0,            # Seconds between delta log writes
+    "snapshot_interval": 600,         # Seconds between compactions into a new snapshot
+    "max_log_bytes": 16 * 1024 * 1024  # Compact early once the current log segment is this big
 }
 
 # === CACHE CONFIG ===
@@ -669,12 +763,24 @@ CACHE_CONFIG = {
     "search": 300          # 5 minutes
 }
 
+# Max entries kept per cache (least recently used entries are evicted)
+CACHE_LIMITS = {
+    "user_info": 10000
+}
+
 # === BACKUP CONFIG ===
 BACKUP_CONFIG = {
     "auto_backup": True,
     "backup_interval": 86400,  # 24 hours
     "max_backups": 7,
-    "backup_path": "backups/"
+    "backup_path": "backups/",
+    # Backup section -> collection it is streamed from
+    "collections": {
+        "users": "users",
+        "chats": "groups",
+        "commands": "command_logs",
+        "tasks": "user_tasks"
+    }
 }
 
 # === SECURITY CONFIG ===
@@ -711,7 +817,7 @@ FEATURE_FLAGS = {
 
 # === MIGRATION CONFIG ===
 MIGRATION_CONFIG = {
-    "version": "1.0.0",
+    "version": "1.1.0",  # Migrations up to this version are applied (see db_migrations.py)
     "auto_migrate": True,
     "backup_before_migrate": True
 }
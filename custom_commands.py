@@ -16,7 +16,7 @@ from telegram.error import TelegramError
 from telegram.constants import ParseMode
 
 from config import MAX_LIMITS
-from database import Database
+from database import get_database
 
 class CustomCommands:
     """Manages custom commands created by admins"""
@@ -26,9 +26,8 @@ class CustomCommands:
         self.media_cache = {}
         self.supported_types = ['text', 'photo', 'video', 'sticker', 'audio', 'document', 'voice', 'animation']
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     async def create_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Create a new custom command"""
@@ -12,9 +12,13 @@ Features:
 """
 
 import asyncio
+import csv
 import json
+import os
+import secrets
+import tempfile
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
@@ -22,6 +26,7 @@ from telegram.constants import ParseMode
 
 from admin_data import super_admin_system, filter_system
 from data_filters import advanced_filter_system, FilterCondition, FilterType, ComparisonOperator
+from response_templates import escape_markdown
 
 class BigDataCommands:
     """Big data analytics commands for super admin"""
@@ -29,6 +34,8 @@ class BigDataCommands:
     def __init__(self):
         self.report_cache = {}
         self.cache_timeout = 300  # 5 minutes
+        self.filter_exports = {}  # export id -> (data_source, conditions) behind "Export Results"
+        self.max_filter_exports = 100
     
     async def analytics_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show comprehensive analytics dashboard"""
@@ -43,32 +50,12 @@ class BigDataCommands:
         
         try:
             # Generate comprehensive report
-            report = super_admin_system.generate_analytics_report()
+            report = await super_admin_system.generate_analytics_report()
             
             # Format report
             report_text = self._format_analytics_report(report)
             
-            # Create inline keyboard for detailed views
-            keyboard = [
-                [
-                    InlineKeyboardButton("👥 User Analytics", callback_data="analytics_users"),
-                    InlineKeyboardButton("📱 Group Analytics", callback_data="analytics_groups")
-                ],
-                [
-                    InlineKeyboardButton("⚡ Command Stats", callback_data="analytics_commands"),
-                    InlineKeyboardButton("📈 Performance", callback_data="analytics_performance")
-                ],
-                [
-                    InlineKeyboardButton("🔍 Trending Data", callback_data="analytics_trends"),
-                    InlineKeyboardButton("⚠️ Anomalies", callback_data="analytics_anomalies")
-                ],
-                [
-                    InlineKeyboardButton("📥 Export Report", callback_data="analytics_export"),
-                    InlineKeyboardButton("🔄 Refresh", callback_data="analytics_refresh")
-                ]
-            ]
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = self._analytics_keyboard()
             
             await update.message.reply_text(
                 report_text,
@@ -164,10 +151,17 @@ class BigDataCommands:
             if result.filtered_records > 0:
                 results_text = self._format_filter_results(result)
                 
+                # Remember the filter so the export button can re-run it
+                # (callback data is capped at 64 bytes, too small for the filter itself)
+                export_id = secrets.token_hex(4)
+                self.filter_exports[export_id] = (data_source, [condition])
+                while len(self.filter_exports) > self.max_filter_exports:
+                    self.filter_exports.pop(next(iter(self.filter_exports)))
+                
                 # Create inline keyboard for actions
                 keyboard = [
                     [
-                        InlineKeyboardButton("📥 Export Results", callback_data=f"export_filter_{data_source}_{field}_{operator_str}_{value_str}"),
+                        InlineKeyboardButton("📥 Export Results", callback_data=f"export_filter_{export_id}"),
                         InlineKeyboardButton("🔍 Refine Filter", callback_data=f"refine_filter_{data_source}")
                     ],
                     [
@@ -278,33 +272,44 @@ class BigDataCommands:
             await update.message.reply_text("❌ Super Admin command only!")
             return
         
-        # Get real-time metrics
-        metrics = {
+        await update.message.reply_text(
+            self._build_monitor_text(self._collect_monitor_metrics()),
+            parse_mode=ParseMode.MARKDOWN,
+            reply_markup=self._monitor_keyboard()
+        )
+    
+    def _collect_monitor_metrics(self) -> Dict:
+        """Real-time metrics shown by /big_data_monitor"""
+        active_users = super_admin_system.active_users
+        now = time.time()
+        return {
             'timestamp': datetime.now().isoformat(),
             'total_users': len(super_admin_system.user_activity),
-            'active_users': sum(1 for activities in super_admin_system.user_activity.values() 
-                              if activities and activities[-1]['timestamp'] > datetime.now() - timedelta(hours=1)),
-            'total_commands': sum(super_admin_system.command_stats.values()),
+            'active_users': active_users.active(3600, now),
+            'active_users_24h': active_users.active(24 * 3600, now),
+            'total_commands': super_admin_system.total_commands,
             'active_groups': len(super_admin_system.group_stats),
-            'recent_activities': sum(1 for activities in super_admin_system.user_activity.values() 
-                                   if activities and activities[-1]['timestamp'] > datetime.now() - timedelta(minutes=5)),
-            'error_rate': len(super_admin_system.error_logs) / max(1, sum(super_admin_system.command_stats.values())) * 100,
-            'performance_metrics': super_admin_system.performance_metrics
+            'recent_activities': active_users.active(300, now),
+            'error_rate': len(super_admin_system.error_logs) / max(1, super_admin_system.total_commands) * 100,
+            'performance_metrics': super_admin_system.performance_metrics,
+            'update_latency': super_admin_system._get_update_latency()
         }
-        
-        # Format monitoring dashboard
-        monitor_text = f"""
+    
+    def _build_monitor_text(self, metrics: Dict) -> str:
+        """Format the monitoring dashboard"""
+        return f"""
 📊 **REAL-TIME BIG DATA MONITOR**
 🕐 Generated: {metrics['timestamp']}
 
 👥 **User Metrics:**
 • Total Users: {metrics['total_users']:,}
+• Active Users (24h): {metrics['active_users_24h']:,}
 • Active Users (1h): {metrics['active_users']:,}
 • Recent Activity (5m): {metrics['recent_activities']:,}
 
 ⚡ **Command Metrics:**
 • Total Commands: {metrics['total_commands']:,}
-• Commands/min: {metrics['total_commands'] / 60:.1f}
+• Commands/min: {metrics['update_latency']['commands_per_minute']:.1f}
 
 📱 **Group Metrics:**
 • Active Groups: {metrics['active_groups']:,}
@@ -315,10 +320,14 @@ class BigDataCommands:
 • Cache Hits: {super_admin_system.analytics_cache.get('cache_hits', 0):,}
 • Memory Usage: {super_admin_system._get_memory_usage()['percent']:.1f}%
 
+{self._format_update_latency(metrics['update_latency'])}
+{self._format_db_performance(super_admin_system._get_db_performance())}
+
 🔄 **Auto-refresh every 30 seconds**
         """.strip()
-        
-        # Create inline keyboard
+    
+    def _monitor_keyboard(self) -> InlineKeyboardMarkup:
+        """Monitoring dashboard buttons"""
         keyboard = [
             [
                 InlineKeyboardButton("🔄 Refresh", callback_data="monitor_refresh"),
@@ -329,15 +338,124 @@ class BigDataCommands:
                 InlineKeyboardButton("⚙️ Settings", callback_data="monitor_settings")
             ]
         ]
+        return InlineKeyboardMarkup(keyboard)
+    
+    def _analytics_keyboard(self) -> InlineKeyboardMarkup:
+        """Analytics dashboard buttons"""
+        keyboard = [
+            [
+                InlineKeyboardButton("👥 User Analytics", callback_data="analytics_users"),
+                InlineKeyboardButton("📱 Group Analytics", callback_data="analytics_groups")
+            ],
+            [
+                InlineKeyboardButton("⚡ Command Stats", callback_data="analytics_commands"),
+                InlineKeyboardButton("📈 Performance", callback_data="analytics_performance")
+            ],
+            [
+                InlineKeyboardButton("🔍 Trending Data", callback_data="analytics_trends"),
+                InlineKeyboardButton("⚠️ Anomalies", callback_data="analytics_anomalies")
+            ],
+            [
+                InlineKeyboardButton("📥 Export Report", callback_data="analytics_export"),
+                InlineKeyboardButton("🔄 Refresh", callback_data="analytics_refresh")
+            ]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+    
+    async def handle_analytics_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle analytics dashboard buttons"""
+        query = update.callback_query
+        if not await super_admin_system.is_super_admin(query.from_user.id):
+            await query.answer("❌ Super Admin only!", show_alert=True)
+            return
+        await query.answer()
         
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        section = query.data[len("analytics_"):]
+        if section == 'refresh':
+            super_admin_system.analytics_cache.pop('analytics_report', None)
+        report = await super_admin_system.generate_analytics_report()
         
-        await update.message.reply_text(
-            monitor_text,
+        if section == 'export':
+            await self._send_json_report(query.message, report, 'analytics_report')
+            return
+        
+        await query.edit_message_text(
+            self._format_analytics_section(report, section),
             parse_mode=ParseMode.MARKDOWN,
-            reply_markup=reply_markup
+            reply_markup=self._analytics_keyboard()
         )
     
+    async def handle_monitor_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle monitoring dashboard buttons"""
+        query = update.callback_query
+        if not await super_admin_system.is_super_admin(query.from_user.id):
+            await query.answer("❌ Super Admin only!", show_alert=True)
+            return
+        
+        action = query.data[len("monitor_"):]
+        metrics = self._collect_monitor_metrics()
+        if action == 'export':
+            await query.answer()
+            await self._send_json_report(query.message, metrics, 'monitor_snapshot')
+        elif action == 'settings':
+            await query.answer(
+                f"⚙️ Report cache: {super_admin_system.cache_timeout}s\n"
+                f"Filter cache: {advanced_filter_system.cache_timeout}s",
+                show_alert=True
+            )
+        else:
+            await query.answer("🔄 Refreshed")
+            await query.edit_message_text(
+                self._build_monitor_text(metrics),
+                parse_mode=ParseMode.MARKDOWN,
+                reply_markup=self._monitor_keyboard()
+            )
+    
+    async def handle_export_filter_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Export every record matching a /filter result"""
+        query = update.callback_query
+        if not await super_admin_system.is_super_admin(query.from_user.id):
+            await query.answer("❌ Super Admin only!", show_alert=True)
+            return
+        
+        pending = self.filter_exports.get(query.data[len("export_filter_"):])
+        if not pending:
+            await query.answer("⌛ Filter expired, run /filter again.", show_alert=True)
+            return
+        await query.answer("📥 Exporting...")
+        
+        data_source, conditions = pending
+        filename = f"{data_source}_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            record_count = await self._export_json(data_source, filename, conditions)
+            if not record_count:
+                await query.message.reply_text("📭 No data found to export.")
+                return
+            with open(filename, 'rb') as f:
+                await query.message.reply_document(
+                    f,
+                    caption=f"📊 **{data_source.title()} Filter Export**\n"
+                           f"📊 Records: {record_count:,}\n"
+                           f"🕐 Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                )
+        except Exception as e:
+            await query.message.reply_text(f"❌ Error exporting data: {e}")
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+    
+    async def _send_json_report(self, message, data: Dict, name: str):
+        """Send a dict as a JSON document reply"""
+        filename = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
+            with open(filename, 'rb') as f:
+                await message.reply_document(f, caption=f"📥 {name.replace('_', ' ').title()}")
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+    
     async def export_data_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Export filtered data"""
         user = update.effective_user
@@ -370,58 +488,76 @@ class BigDataCommands:
         await update.message.reply_text("📥 Exporting data...")
         
         try:
-            # Get data
-            data = await advanced_filter_system._get_data_source(data_source)
-            
-            if not data:
-                await update.message.reply_text("📭 No data found to export.")
-                return
-            
-            # Export based on format
+            # Export based on format (JSON/CSV stream records straight to disk)
+            filename = f"{data_source}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_type}"
             if format_type == 'json':
-                filename = f"{data_source}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                with open(filename, 'w') as f:
-                    json.dump(data, f, indent=2, default=str)
-                
-                await update.message.reply_document(
-                    open(filename, 'rb'),
-                    caption=f"📊 **{data_source.title()} Export**\n"
-                           f"📄 Format: JSON\n"
-                           f"📊 Records: {len(data):,}\n"
-                           f"🕐 Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                )
+                record_count = await self._export_json(data_source, filename)
+                format_label = "JSON"
                 
             elif format_type == 'csv':
-                import pandas as pd
-                filename = f"{data_source}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                df = pd.DataFrame(data)
-                df.to_csv(filename, index=False)
-                
-                await update.message.reply_document(
-                    open(filename, 'rb'),
-                    caption=f"📊 **{data_source.title()} Export**\n"
-                           f"📄 Format: CSV\n"
-                           f"📊 Records: {len(data):,}\n"
-                           f"🕐 Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                )
+                record_count = await self._export_csv(data_source, filename)
+                format_label = "CSV"
                 
             elif format_type == 'xlsx':
+                # Excel files are built in memory by pandas anyway
                 import pandas as pd
-                filename = f"{data_source}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                df = pd.DataFrame(data)
-                df.to_excel(filename, index=False)
-                
-                await update.message.reply_document(
-                    open(filename, 'rb'),
-                    caption=f"📊 **{data_source.title()} Export**\n"
-                           f"📄 Format: Excel\n"
-                           f"📊 Records: {len(data):,}\n"
-                           f"🕐 Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                )
+                data = await advanced_filter_system._get_data_source(data_source)
+                record_count = len(data)
+                if data:
+                    pd.DataFrame(data).to_excel(filename, index=False)
+                format_label = "Excel"
+            
+            if not record_count:
+                if os.path.exists(filename):
+                    os.remove(filename)
+                await update.message.reply_text("📭 No data found to export.")
+                return
+            
+            await update.message.reply_document(
+                open(filename, 'rb'),
+                caption=f"📊 **{data_source.title()} Export**\n"
+                       f"📄 Format: {format_label}\n"
+                       f"📊 Records: {record_count:,}\n"
+                       f"🕐 Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            )
             
         except Exception as e:
             await update.message.reply_text(f"❌ Error exporting data: {e}")
     
+    async def _export_json(self, data_source: str, filename: str,
+                           conditions: List[FilterCondition] = None) -> int:
+        """Write a JSON array record by record; returns the record count"""
+        count = 0
+        with open(filename, 'w') as f:
+            f.write('[')
+            async for record in advanced_filter_system._iter_data_source(data_source):
+                if conditions and not advanced_filter_system._matches_conditions(record, conditions):
+                    continue
+                f.write((',' if count else '') + '\n  ' + json.dumps(record, default=str))
+                count += 1
+            f.write('\n]\n')
+        return count
+    
+    async def _export_csv(self, data_source: str, filename: str) -> int:
+        """Write CSV from one read of the source (rows spooled to disk until all columns are known)"""
+        columns = {}
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            async for record in advanced_filter_system._iter_data_source(data_source):
+                columns.update(dict.fromkeys(record))
+                spool.write(json.dumps(record, default=str) + '\n')
+            if not columns:
+                return 0
+            
+            count = 0
+            spool.seek(0)
+            with open(filename, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(columns), restval='')
+                writer.writeheader()
+                for line in spool:
+                    writer.writerow(json.loads(line))
+                    count += 1
+        return count
+    
     async def filter_stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show filter statistics"""
         user = update.effective_user
@@ -490,7 +626,11 @@ class BigDataCommands:
 """
         
         for cmd, count in command_analytics['popular_commands'][:5]:
-            report_text += f"• {cmd}: {count:,} uses\n"
+            report_text += f"• {escape_markdown(cmd)}: {count:,} uses\n"
+        
+        report_text += "\n" + self._format_db_performance(
+            report['performance_metrics']['database_performance']
+        )
         
         report_text += f"""
 ⚠️ **Anomalies Detected:**
@@ -499,6 +639,74 @@ class BigDataCommands:
         
         return report_text
     
+    def _format_analytics_section(self, report: Dict, section: str) -> str:
+        """Format one detailed view of the analytics report"""
+        if section == 'users':
+            users = report['user_analytics']
+            text = f"👥 **USER ANALYTICS**\n\n• Total Users: {users['total_users']:,}\n• Active (24h): {users['active_users']:,}\n\n**Activity Levels:**\n"
+            for level, count in users['activity_levels'].items():
+                text += f"• {level.replace('_', ' ').title()}: {count:,}\n"
+            text += "\n**Top Users:**\n"
+            for entry in users['top_users']:
+                label = entry['username'] or entry['first_name'] or entry['user_id']
+                text += f"• {escape_markdown(label)}: {entry['activity_score']:,}\n"
+        elif section == 'groups':
+            groups = report['group_analytics']
+            text = f"📱 **GROUP ANALYTICS**\n\n• Total Groups: {groups['total_groups']:,}\n• Active (24h): {groups['active_groups']:,}\n\n**Top Groups:**\n"
+            for entry in groups['top_groups']:
+                text += f"• `{entry['chat_id']}`: {entry['message_count']:,} messages\n"
+        elif section == 'commands':
+            commands = report['command_analytics']
+            text = f"⚡ **COMMAND STATS**\n\n• Total: {commands['total_commands']:,}\n• Unique: {commands['unique_commands']}\n\n**Popular:**\n"
+            for cmd, count in commands['popular_commands'][:10]:
+                text += f"• {escape_markdown(cmd)}: {count:,}\n"
+        elif section == 'performance':
+            perf = report['performance_metrics']
+            text = (f"📈 **PERFORMANCE**\n\n• Avg Response: {perf['response_time']:.3f}s\n"
+                    f"• Error Rate: {perf['error_rate']:.2f}%\n• Uptime: {perf['uptime']:.1f}%\n"
+                    f"• Memory: {perf['memory_usage']['rss']:.0f}MB\n• CPU: {perf['cpu_usage']:.1f}%\n\n")
+            text += self._format_db_performance(perf['database_performance'])
+        elif section == 'trends':
+            trends = report['trending_data']
+            text = f"🔍 **TRENDING DATA**\n\n• Retention: {trends['user_retention']:.1f}%\n\n**Trending Commands (24h):**\n"
+            for entry in trends['trending_commands']:
+                text += f"• {escape_markdown(entry['command'])}: {entry['count']:,}\n"
+        elif section == 'anomalies':
+            anomalies = report['anomaly_detection']
+            text = f"⚠️ **ANOMALIES**\n\n• Total: {anomalies['total_anomalies']}\n\n"
+            for anomaly in anomalies['anomalies']:
+                subject = anomaly.get('user_id') or anomaly.get('chat_id')
+                text += f"• {escape_markdown(anomaly['type'])} `{subject}` ({escape_markdown(anomaly['severity'])})\n"
+        else:
+            text = self._format_analytics_report(report)
+        return text
+    
+    def _format_update_latency(self, latency: Dict) -> str:
+        """Format update handling latency for display"""
+        text = "⏱️ **Response Latency:**\n"
+        for window, stats in latency['windows'].items():
+            text += (f"• {window}: p50 {stats['p50_ms']:.0f}ms • p95 {stats['p95_ms']:.0f}ms • "
+                     f"p99 {stats['p99_ms']:.0f}ms ({stats['count']:,} updates)\n")
+        if latency['slowest_handlers']:
+            text += "• Slowest (5m, p95):\n"
+            for label, stats in latency['slowest_handlers']:
+                text += f"  `{label}`: {stats['p95_ms']:.0f}ms over {stats['count']:,}\n"
+        return text
+    
+    def _format_db_performance(self, db_perf: Dict) -> str:
+        """Format database latency/outcome metrics for display"""
+        text = f"""🗄️ **Database:**
+• Queries: {db_perf['total_queries']:,} ({db_perf['error_rate']:.1f}% errors)
+• Latency: p50 {db_perf['p50_ms']:.1f}ms • p95 {db_perf['p95_ms']:.1f}ms • p99 {db_perf['p99_ms']:.1f}ms
+• Pool: {db_perf['pool']['in_use']}/{db_perf['pool']['max_connections']} in use, {db_perf['connection_pool']}
+• User Cache Hit Rate: {db_perf['cache_hit_rate']:.1f}%
+"""
+        if db_perf['top_handlers']:
+            text += "• DB time by handler:\n"
+            for handler, stats in db_perf['top_handlers']:
+                text += f"  `{handler}`: {stats['total_ms']:.0f}ms over {stats['count']:,} calls (p95 {stats['p95_ms']:.1f}ms)\n"
+        return text
+    
     def _format_filter_results(self, result) -> str:
         """Format filter results for display"""
         results_text = f"""
@@ -15,16 +15,14 @@ import json
 import time
 import asyncio
 import logging
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Optional, Tuple, Union, AsyncIterator
 from collections import defaultdict, Counter
 from dataclasses import dataclass
 from enum import Enum
 
 from admin_data import super_admin_system
-from database import Database
+from database import get_database, get_async_database
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -75,8 +73,8 @@ class AdvancedFilterSystem:
     """Advanced filtering system with big data capabilities"""
     
     def __init__(self):
-        self.db = Database()
-        self.db.connect()
+        self.db = get_database()
+        self.adb = get_async_database()
         
         # Filter cache
         self.filter_cache = {}
@@ -124,19 +122,25 @@ class AdvancedFilterSystem:
                 return cached_result
         
         try:
-            # Get raw data
-            raw_data = await self._get_data_source(data_source)
-            
-            # Apply basic conditions
-            filtered_data = self._apply_conditions(raw_data, conditions)
+            # Stream records and apply basic conditions as they arrive
+            use_advanced = bool(advanced_filter and advanced_filter in self.advanced_filters)
+            matched_data = []
+            total_records = 0
+            async for record in self._iter_data_source(data_source):
+                if not self._matches_conditions(record, conditions):
+                    continue
+                # Advanced filters need every match; otherwise keep only the requested page
+                if use_advanced or offset <= total_records < offset + limit:
+                    matched_data.append(record)
+                total_records += 1
             
             # Apply advanced filter if specified
-            if advanced_filter and advanced_filter in self.advanced_filters:
-                filtered_data = await self.advanced_filters[advanced_filter](filtered_data)
-            
-            # Apply pagination
-            total_records = len(filtered_data)
-            paginated_data = filtered_data[offset:offset + limit]
+            if use_advanced:
+                filtered_data = await self.advanced_filters[advanced_filter](matched_data)
+                total_records = len(filtered_data)
+                paginated_data = filtered_data[offset:offset + limit]
+            else:
+                paginated_data = matched_data
             
             # Create result
             execution_time = time.time() - start_time
@@ -169,29 +173,26 @@ class AdvancedFilterSystem:
     
     def _apply_conditions(self, data: List[Dict], conditions: List[FilterCondition]) -> List[Dict]:
         """Apply multiple filter conditions to data"""
-        filtered_data = data.copy()
-        
-        for condition in conditions:
-            filtered_data = self._apply_single_condition(filtered_data, condition)
-        
-        return filtered_data
+        return [record for record in data if self._matches_conditions(record, conditions)]
     
     def _apply_single_condition(self, data: List[Dict], condition: FilterCondition) -> List[Dict]:
         """Apply single filter condition"""
-        filtered_data = []
-        
-        for record in data:
+        return self._apply_conditions(data, [condition])
+    
+    def _matches_conditions(self, record: Dict, conditions: List[FilterCondition]) -> bool:
+        """Check one record against every condition"""
+        for condition in conditions:
             try:
                 field_value = self._get_field_value(record, condition.field)
                 
-                if self._evaluate_condition(field_value, condition):
-                    filtered_data.append(record)
+                if not self._evaluate_condition(field_value, condition):
+                    return False
                     
             except Exception as e:
                 logger.warning(f"Error evaluating condition on record: {e}")
-                continue
+                return False
         
-        return filtered_data
+        return True
     
     def _get_field_value(self, record: Dict, field_path: str) -> Any:
         """Get field value from nested dictionary"""
@@ -253,47 +254,44 @@ class AdvancedFilterSystem:
     
     async def _get_data_source(self, data_source: str) -> List[Dict]:
         """Get data from specified source"""
+        return [record async for record in self._iter_data_source(data_source)]
+    
+    async def _iter_data_source(self, data_source: str) -> AsyncIterator[Dict]:
+        """Stream records from specified source, one page of documents at a time"""
         if data_source in self.data_processors:
-            return await self.data_processors[data_source]()
-        else:
-            return []
+            async for record in self.data_processors[data_source]():
+                yield record
     
-    async def _process_user_data(self) -> List[Dict]:
+    async def _process_user_data(self) -> AsyncIterator[Dict]:
         """Process user data for filtering"""
         users_collection = self.db.get_collection('users')
         if not users_collection:
-            return []
+            return
         
-        # Get all users with their activity
-        users = list(users_collection.find({}))
-        
-        # Enhance with activity data
-        for user in users:
+        # Stream users and enhance each with activity data
+        async for user in self.adb.find('users'):
             user_id = user.get('_id')
-            if user_id in super_admin_system.user_activity:
-                activities = super_admin_system.user_activity[user_id]
-                user['activity_count'] = len(activities)
-                user['last_activity'] = max(a['timestamp'] for a in activities) if activities else None
-                user['first_activity'] = min(a['timestamp'] for a in activities) if activities else None
-                user['avg_daily_activity'] = len(activities) / max(1, (datetime.now() - user['first_activity']).days)
+            ring = super_admin_system.user_activity.get(user_id)
+            if ring:
+                user['activity_count'] = ring.total
+                user['last_activity'] = datetime.fromtimestamp(ring.last_seen)
+                user['first_activity'] = datetime.fromtimestamp(ring.since)
+                user['avg_daily_activity'] = ring.total / max(1, (datetime.now() - user['first_activity']).days)
             else:
                 user['activity_count'] = 0
                 user['last_activity'] = None
                 user['first_activity'] = None
                 user['avg_daily_activity'] = 0
-        
-        return users
+            yield user
     
-    async def _process_group_data(self) -> List[Dict]:
+    async def _process_group_data(self) -> AsyncIterator[Dict]:
         """Process group data for filtering"""
         groups_collection = self.db.get_collection('groups')
         if not groups_collection:
-            return []
+            return
         
-        groups = list(groups_collection.find({}))
-        
-        # Enhance with statistics
-        for group in groups:
+        # Stream groups and enhance each with statistics
+        async for group in self.adb.find('groups'):
             chat_id = group.get('_id')
             if chat_id in super_admin_system.group_stats:
                 stats = super_admin_system.group_stats[chat_id]
@@ -302,53 +300,53 @@ class AdvancedFilterSystem:
                 group['message_count'] = 0
                 group['user_count'] = 0
                 group['last_activity'] = None
-        
-        return groups
+            yield group
     
-    async def _process_command_data(self) -> List[Dict]:
+    async def _process_command_data(self) -> AsyncIterator[Dict]:
         """Process command data for filtering"""
         commands_collection = self.db.get_collection('command_logs')
         if not commands_collection:
             # Use in-memory data as fallback
-            return [
-                {
+            for cmd, count in list(super_admin_system.command_stats.items()):
+                yield {
                     'command': cmd,
                     'usage_count': count,
                     'last_used': datetime.now(),
                     'avg_usage_per_day': count / 30  # Assume 30 days
                 }
-                for cmd, count in super_admin_system.command_stats.items()
-            ]
+            return
         
-        commands = list(commands_collection.find({}))
-        return commands
+        async for command in self.adb.find('command_logs'):
+            yield command
     
-    async def _process_transaction_data(self) -> List[Dict]:
+    async def _process_transaction_data(self) -> AsyncIterator[Dict]:
         """Process transaction data for filtering"""
         transactions_collection = self.db.get_collection('transactions')
         if not transactions_collection:
-            return []
+            return
         
-        return list(transactions_collection.find({}))
+        async for transaction in self.adb.find('transactions'):
+            yield transaction
     
-    async def _process_activity_data(self) -> List[Dict]:
+    async def _process_activity_data(self) -> AsyncIterator[Dict]:
         """Process activity data for filtering"""
         activities_collection = self.db.get_collection('activities')
         if not activities_collection:
             # Use in-memory data
-            activities = []
-            for user_id, user_activities in super_admin_system.user_activity.items():
-                for activity in user_activities:
-                    activities.append({
+            for user_id, ring in super_admin_system.user_activity.items():
+                for activity in super_admin_system.user_activity.entries(user_id):
+                    yield {
                         'user_id': user_id,
-                        'action': activity['action'],
-                        'timestamp': activity['timestamp'],
-                        'chat_id': activity.get('chat_id'),
-                        'content': activity.get('content')
-                    })
-            return activities
+                        'action': activity.action,
+                        'timestamp': datetime.fromtimestamp(activity.timestamp),
+                        'chat_id': activity.chat_id,
+                        'command': activity.command,
+                        'content': activity.content
+                    }
+            return
         
-        return list(activities_collection.find({}))
+        async for activity in self.adb.find('activities'):
+            yield activity
     
     # Advanced filter methods
     async def _behavioral_analysis_filter(self, data: List[Dict]) -> List[Dict]:
@@ -522,6 +520,7 @@ class AdvancedFilterSystem:
         if not values:
             return 0.0
         
+        import numpy as np  # Deferred: only anomaly detection needs it
         mean = np.mean(values)
         std = np.std(values)
         
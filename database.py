@@ -1,10 +1,209 @@
 import os
+import time
+import atexit
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import json
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
 from astrapy import DataAPIClient
 from dotenv import load_dotenv
 
+from config import (
+    DATABASE_BACKEND, DATABASE_URL, SQLITE_URL, MIGRATION_CONFIG, DATABASE_POOL, WRITE_BEHIND_CONFIG,
+    CACHE_CONFIG, CACHE_LIMITS, CURSOR_CONFIG, RESILIENCE_CONFIG
+)
+from db_resilience import CircuitBreaker, CircuitOpenError, WriteOutbox, is_transient
+from metrics import db_metrics
+
 # Load environment variables
 load_dotenv()
 
+# Max ids per `$in` query in get_users() (Data API caps $in at 100 values)
+MULTI_GET_BATCH = 100
+
+def _projection(fields):
+    """Builds a find() projection for a list of field names (None = everything)."""
+    if not fields:
+        return None
+    return {field: True for field in fields}
+
+def _project(document, fields):
+    """Trims an already-fetched document down to fields (plus _id)."""
+    if not fields:
+        return document
+    return {k: v for k, v in document.items() if k == '_id' or k in fields}
+
+class UserCache:
+    """Bounded read-through cache with LRU eviction and a per-entry TTL.
+
+    Every write bumps a generation counter. A reader takes read_token()
+    before going to the backend and passes it to put(), which is skipped if
+    the key was written meanwhile, so a slow read can't cache a stale copy.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, document)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._written = OrderedDict()  # key -> generation of its last write (bounded)
+        self._forgotten = 0  # newest generation dropped from _written
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns a copy of the cached document, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def read_token(self):
+        """Generation to pass to put() for a read that is about to start."""
+        with self._lock:
+            return self._generation
+
+    def _note_write(self, key):
+        self._generation += 1
+        self._written[key] = self._generation
+        self._written.move_to_end(key)
+        if len(self._written) > self.max_entries:
+            self._forgotten = self._written.popitem(last=False)[1]
+
+    def note_write(self, key):
+        """Marks key as written, so reads already in flight won't cache it."""
+        with self._lock:
+            self._note_write(key)
+
+    def put(self, key, document, token=None):
+        with self._lock:
+            if token is not None and (self._written.get(key, 0) > token or self._forgotten > token):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, dict(document))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def update(self, key, fields):
+        """Merges fields into a cached document (no-op if it isn't cached)."""
+        with self._lock:
+            self._note_write(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1].update(fields)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._note_write(key)
+            self._entries.pop(key, None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': (self.hits / total * 100) if total else 0.0
+        }
+
+class WriteBehindBuffer:
+    """Coalesces $set updates per document id and flushes them in batches.
+
+    Repeated updates to the same document between flushes are merged into a
+    single write. A background thread flushes every `flush_interval` seconds,
+    or sooner once `max_pending` documents are waiting.
+    """
+
+    def __init__(self, flush_func, max_pending, flush_interval):
+        self._flush_func = flush_func  # Called with {doc_id: fields}, returns failed {doc_id: fields}
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+        self.stats = {'staged': 0, 'flushed': 0, 'flushes': 0}
+
+    def stage(self, doc_id, fields):
+        """Merges fields into the pending write for doc_id."""
+        with self._lock:
+            self._pending.setdefault(doc_id, {}).update(fields)
+            self.stats['staged'] += 1
+            full = len(self._pending) >= self.max_pending
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def pending_for(self, doc_id):
+        """Returns fields staged (or being flushed) for doc_id, or None."""
+        with self._lock:
+            inflight = self._inflight.get(doc_id)
+            pending = self._pending.get(doc_id)
+            if inflight is None and pending is None:
+                return None
+            return {**(inflight or {}), **(pending or {})}
+
+    def flush(self):
+        """Writes out everything pending; failed documents are re-queued."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return
+            failed = {}
+            try:
+                failed = self._flush_func(batch) or {}
+            except Exception as e:
+                print(f"❌ Write-behind flush failed: {e}")
+                failed = batch
+            with self._lock:
+                self._inflight = {}
+                # Older failed fields go underneath anything staged since
+                for doc_id, fields in failed.items():
+                    self._pending[doc_id] = {**fields, **self._pending.get(doc_id, {})}
+                self.stats['flushed'] += len(batch) - len(failed)
+                self.stats['flushes'] += 1
+
+    def close(self):
+        """Stops the background thread and forces a final flush."""
+        self._stopped = True
+        self._wakeup.set()
+        self.flush()
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._stopped:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
 class Database:
     def __init__(self):
         self.api_endpoint = os.getenv("ASTRA_DB_API_ENDPOINT")
@@ -13,62 +212,453 @@ class Database:
         self.client = None
         self.db = None
 
-    def connect(self):
-        """Establishes connection to the Astra DB database."""
-        try:
-            # Disable SSL verification to avoid network issues
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            self.client = DataAPIClient(self.token)
-            self.db = self.client.get_database_by_api_endpoint(
-                self.api_endpoint
+        # Pool state: bounded in-flight calls, cached handles, one-time bootstrap
+        self._connect_lock = threading.Lock()
+        self._collections = {}
+        self._slots = threading.BoundedSemaphore(DATABASE_POOL["max_connections"])
+        self._acquire_timeout = DATABASE_POOL["acquire_timeout"]
+        self._in_use = 0
+
+        # Outage handling: fail fast while the backend is down, park writes on disk
+        self.breaker = CircuitBreaker(
+            RESILIENCE_CONFIG["failure_threshold"],
+            RESILIENCE_CONFIG["reset_timeout"]
+        )
+        self.outbox = WriteOutbox(RESILIENCE_CONFIG["outbox_path"])
+
+        self.user_cache = UserCache(CACHE_LIMITS["user_info"], CACHE_CONFIG["user_info"])
+        self._write_behind = None
+        if WRITE_BEHIND_CONFIG["enabled"]:
+            self._write_behind = WriteBehindBuffer(
+                self._flush_user_updates,
+                WRITE_BEHIND_CONFIG["max_pending"],
+                WRITE_BEHIND_CONFIG["flush_interval"]
             )
-            print(f"✅ Connection to Astra DB successful.")
-            self.setup_collections()
+
+    def connect(self):
+        """Establishes connection to the Astra DB database (only once per instance)."""
+        if self.db:
             return True
-        except Exception as e:
-            print(f"❌ Failed to connect to Astra DB: {e}")
-            return False
+
+        with self._connect_lock:
+            if self.db:
+                return True
+            try:
+                # Disable SSL verification to avoid network issues
+                import ssl
+                ssl_context = ssl.create_default_context()
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+
+                self.client = DataAPIClient(self.token)
+                self.db = self.client.get_database_by_api_endpoint(
+                    self.api_endpoint
+                )
+                print(f"✅ Connection to Astra DB successful.")
+                self.setup_collections()
+                return True
+            except Exception as e:
+                print(f"❌ Failed to connect to Astra DB: {e}")
+                return False
+
+    @contextmanager
+    def connection_slot(self, collection='-', operation='call'):
+        """Holds one of the pool's connection slots for the duration of a call.
+
+        Also the circuit breaker's checkpoint: while the circuit is open this
+        raises CircuitOpenError at once instead of waiting on the network.
+        The call is timed into db_metrics under (collection, operation).
+        """
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise TimeoutError("Timed out waiting for a free database connection")
+        self._in_use += 1
+        try:
+            if not self.breaker.allow():
+                raise CircuitOpenError("Database unavailable (circuit open)")
+            try:
+                with db_metrics.track(collection, operation):
+                    yield
+            except Exception as e:
+                if is_transient(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                raise
+            self.breaker.record_success()
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+
+    def pool_status(self):
+        """Connection slot usage and circuit state."""
+        return {
+            'in_use': self._in_use,
+            'max_connections': DATABASE_POOL["max_connections"],
+            'circuit': self.breaker.state,
+            'outbox_pending': self.outbox.pending()
+        }
 
     def get_collection(self, collection_name):
-        """Gets a collection from the database."""
+        """Gets a collection from the database (handles are cached)."""
         if not self.db:
             print("Not connected to database.")
             return None
-        return self.db.get_collection(collection_name)
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            collection = self.db.get_collection(collection_name)
+            self._collections[collection_name] = collection
+        return collection
+
+    def get_user(self, user_id, fields=None):
+        """Retrieves a user from the 'users' collection (served from cache when hot).
 
-    def get_user(self, user_id):
-        """Retrieves a user from the 'users' collection."""
+        With `fields` only those fields (plus _id) are fetched; partial
+        documents are never cached, but a cached full document serves them.
+        """
         try:
+            user = self.user_cache.get(user_id)
+            if user is not None:
+                return _project(user, fields)
             if not self.db:
                 print("⚠️ Database not connected")
                 return None
             users_collection = self.get_collection('users')
             if users_collection:
-                return users_collection.find_one({'_id': user_id})
+                token = self.user_cache.read_token()
+                with self.connection_slot('users', 'find_one'):
+                    user = users_collection.find_one({'_id': user_id}, projection=_projection(fields))
+                user = self._with_pending_writes(user_id, user, fields)
+                if user is not None and not fields:
+                    self.user_cache.put(user_id, user, token)
+                return user
             return None
         except Exception as e:
             print(f"❌ Error getting user {user_id}: {e}")
             return None
 
+    def get_users(self, user_ids, fields=None):
+        """Fetches many users at once; returns {user_id: document} for those found.
+
+        Cached users are served locally and the rest come back in batched
+        `$in` queries instead of one round trip per id.
+        """
+        found = {}
+        try:
+            missing = []
+            for user_id in dict.fromkeys(user_ids):
+                user = self.user_cache.get(user_id)
+                if user is not None:
+                    found[user_id] = _project(user, fields)
+                else:
+                    missing.append(user_id)
+            if not missing:
+                return found
+            if not self.db:
+                print("⚠️ Database not connected")
+                return found
+            users_collection = self.get_collection('users')
+            if not users_collection:
+                return found
+            token = self.user_cache.read_token()
+            for start in range(0, len(missing), MULTI_GET_BATCH):
+                batch = missing[start:start + MULTI_GET_BATCH]
+                with self.connection_slot('users', 'find_many'):
+                    docs = list(users_collection.find({'_id': {'$in': batch}}, projection=_projection(fields)))
+                for doc in docs:
+                    found[doc['_id']] = doc
+            for user_id in missing:
+                user = self._with_pending_writes(user_id, found.get(user_id), fields)
+                if user is None:
+                    continue
+                found[user_id] = user
+                if not fields:
+                    self.user_cache.put(user_id, user, token)
+            return found
+        except Exception as e:
+            print(f"❌ Error getting {len(user_ids)} users: {e}")
+            return found
+
     def update_user(self, user_id, data):
-        """Updates or inserts a user in the 'users' collection."""
+        """Updates or inserts a user in the 'users' collection.
+
+        With write-behind enabled the fields are only staged here and reach
+        Astra on the next flush; get_user() already sees them.
+        """
         try:
             if not self.db:
                 print("⚠️ Database not connected")
                 return None
-            users_collection = self.get_collection('users')
-            if users_collection:
-                # Use upsert=True to insert if document doesn't exist
-                return users_collection.update_one({'_id': user_id}, {'$set': data}, upsert=True)
-            return None
+            if self._write_behind:
+                self._write_behind.stage(user_id, data)
+                self.user_cache.update(user_id, data)
+                return True
+            # Use upsert=True to insert if document doesn't exist
+            result = self._durable_update('users', {'_id': user_id}, {'$set': data})
+            # After the write, so a read that saw the old document can't cache it
+            self.user_cache.update(user_id, data)
+            return result
         except Exception as e:
             print(f"❌ Error updating user {user_id}: {e}")
             return None
 
+    def iter_pages(self, collection_name, filter=None, projection=None, page_size=None):
+        """Yields lists of up to page_size documents, one round trip per page.
+
+        Only the current page is held in memory, so callers can walk a whole
+        collection without materialising it.
+        """
+        page_size = page_size or CURSOR_CONFIG["page_size"]
+        if not self.db:
+            print("⚠️ Database not connected")
+            return
+        collection = self.get_collection(collection_name)
+        if not collection:
+            return
+        if projection:
+            cursor = iter(collection.find(filter or {}, projection=projection))
+        else:
+            cursor = iter(collection.find(filter or {}))
+        while True:
+            with self.connection_slot(collection_name, 'find_page'):
+                page = list(itertools.islice(cursor, page_size))
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+
+    def iter_documents(self, collection_name, filter=None, projection=None, page_size=None):
+        """Yields documents one by one from iter_pages()."""
+        for page in self.iter_pages(collection_name, filter, projection, page_size):
+            yield from page
+
+    def backup_collections(self, path, collections, metadata=None):
+        """Streams collections into a JSON backup file; returns {collection: count}.
+
+        Writes {"<metadata keys>": ..., "<collection>": [docs...]} document by
+        document, so memory stays flat however large the collections are.
+        """
+        counts = {}
+        with open(path, 'w') as f:
+            f.write('{')
+            first_key = True
+            for key, value in (metadata or {}).items():
+                f.write(('' if first_key else ',') + f'\n  {json.dumps(key)}: {json.dumps(value, default=str)}')
+                first_key = False
+            for name, collection_name in collections.items():
+                f.write(('' if first_key else ',') + f'\n  {json.dumps(name)}: [')
+                first_key = False
+                counts[name] = 0
+                for doc in self.iter_documents(collection_name):
+                    f.write((',' if counts[name] else '') + '\n    ' + json.dumps(doc, default=str))
+                    counts[name] += 1
+                f.write('\n  ]')
+            f.write('\n}\n')
+        return counts
+
+    def _with_pending_writes(self, user_id, user, fields=None):
+        """Overlays fields that are staged but not yet flushed."""
+        if not self._write_behind:
+            return user
+        pending = self._write_behind.pending_for(user_id)
+        if pending and fields:
+            pending = {k: v for k, v in pending.items() if k in fields}
+        if not pending:
+            return user
+        return {**(user or {'_id': user_id}), **pending}
+
+    def _durable_update(self, collection_name, filter, update):
+        """Upserts one document; parks the write in the outbox if the backend is unreachable.
+
+        While older writes are still waiting in the outbox, new ones queue
+        behind them so they can never be overtaken on replay. No replay is
+        attempted while the circuit is open, so queueing stays O(1).
+        """
+        if self.outbox.pending() and (self.breaker.is_open() or not self.replay_outbox()):
+            self.outbox.append(collection_name, filter, update)
+            return True
+        try:
+            with self.connection_slot(collection_name, 'update_one'):
+                return self.get_collection(collection_name).update_one(filter, update, upsert=True)
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            self.outbox.append(collection_name, filter, update)
+            return True
+
+    def replay_outbox(self):
+        """Replays parked writes in order; True once the outbox is empty."""
+        if not self.outbox.pending():
+            return True
+        return self.outbox.replay(self._apply_outbox_entry)
+
+    def _apply_outbox_entry(self, entry):
+        with self.connection_slot(entry['collection'], 'outbox_replay'):
+            self.get_collection(entry['collection']).update_one(entry['filter'], entry['update'], upsert=True)
+        if entry['collection'] == 'users':
+            self.user_cache.note_write(entry['filter'].get('_id'))
+
+    def _flush_user_updates(self, batch):
+        """Upserts one merged $set per user.
+
+        Backends with a bulk upsert (SQLite: one transaction per batch) take
+        the whole batch in one call. The Data API has no bulk form that
+        carries a different update per document (update_many applies one
+        update to every match), so Astra gets one upsert per user. Those run
+        on the write-behind thread, never on a handler's path.
+
+        Outages are handled by the outbox, so whatever still fails here is an
+        error retrying would not fix: the update is dropped, not re-queued.
+        """
+        if self._bulk_upsert_users(batch):
+            return {}
+        for user_id, fields in batch.items():
+            try:
+                self._durable_update('users', {'_id': user_id}, {'$set': fields})
+                # Reads that fetched the pre-flush document must not cache it
+                self.user_cache.note_write(user_id)
+            except Exception as e:
+                print(f"❌ Dropping update for user {user_id} that cannot be applied: {e}")
+        return {}
+
+    def _bulk_upsert_users(self, batch):
+        """One-call flush through the collection's upsert_many(); False to fall
+        back to per-user upserts (no bulk API, outbox backlog, or a failure,
+        which the per-user path then parks or drops document by document)."""
+        users_collection = self.get_collection('users')
+        if not hasattr(users_collection, 'upsert_many') or self.outbox.pending():
+            return False
+        try:
+            with self.connection_slot('users', 'upsert_many'):
+                users_collection.upsert_many([({'_id': user_id}, {'$set': fields}) for user_id, fields in batch.items()])
+        except Exception as e:
+            print(f"⚠️ Bulk flush of {len(batch)} users failed, retrying one by one: {e}")
+            return False
+        for user_id in batch:
+            self.user_cache.note_write(user_id)
+        return True
+
+    def close(self):
+        """Flushes buffered writes; call on shutdown."""
+        if self._write_behind:
+            self._write_behind.close()
+
+    def get_user_tasks(self, user_id, chat_id):
+        """Retrieves a user's task progress documents for a chat."""
+        try:
+            if not self.db:
+                print("⚠️ Database not connected")
+                return []
+            tasks_collection = self.get_collection('user_tasks')
+            if tasks_collection:
+                with self.connection_slot('user_tasks', 'find'):
+                    return list(tasks_collection.find({'user_id': user_id, 'chat_id': chat_id}))
+            return []
+        except Exception as e:
+            print(f"❌ Error getting tasks for user {user_id}: {e}")
+            return []
+
+    def create_or_update_task(self, user_id, chat_id, task_name, progress, target):
+        """Upserts a user's progress on a single task."""
+        try:
+            if not self.db:
+                print("⚠️ Database not connected")
+                return None
+            return self._durable_update(
+                'user_tasks',
+                {'_id': f"{user_id}:{chat_id}:{task_name}"},
+                {'$set': {
+                    'user_id': user_id,
+                    'chat_id': chat_id,
+                    'task_name': task_name,
+                    'progress': progress,
+                    'target': target,
+                    'completed': progress >= target
+                }}
+            )
+        except Exception as e:
+            print(f"❌ Error updating task {task_name} for user {user_id}: {e}")
+            return None
+
+    def get_or_create_user(self, user_id):
+        """Returns the user's document, creating a bare one (0 EXP) if missing."""
+        user = self.get_user(user_id)
+        if user is None:
+            user = {'user_id': user_id, 'join_date': datetime.now().isoformat(), 'exp': 0}
+            self.update_user(user_id, user)
+        return user
+
+    def update_user_exp(self, user_id, amount):
+        """Adds `amount` EXP to a user; returns the new total."""
+        exp = self.get_or_create_user(user_id).get('exp', 0) + amount
+        self.update_user(user_id, {'exp': exp})
+        return exp
+
+    def update_user_stats(self, user_id, **increments):
+        """Adds to the user's counter fields, e.g. update_user_stats(uid, commands=1)."""
+        user = self.get_or_create_user(user_id)
+        self.update_user(user_id, {field: user.get(field, 0) + amount for field, amount in increments.items()})
+
+    def get_top_users(self, chat_id, limit, field='exp'):
+        """Top `limit` users by `field`. Users aren't tracked per chat, so
+        `chat_id` doesn't narrow the ranking. Streams the collection."""
+        try:
+            if not self.db:
+                print("⚠️ Database not connected")
+                return []
+            users = self.iter_documents('users', projection=_projection(['user_id', 'username', 'first_name', field]))
+            return heapq.nlargest(limit, users, key=lambda user: user.get(field) or 0)
+        except Exception as e:
+            print(f"❌ Error getting top users by {field}: {e}")
+            return []
+
+    def get_group_settings(self, chat_id):
+        """Returns a group's settings dict ({} for unknown groups)."""
+        try:
+            if not self.db:
+                print("⚠️ Database not connected")
+                return {}
+            groups_collection = self.get_collection('groups')
+            if groups_collection:
+                with self.connection_slot('groups', 'find_one'):
+                    group = groups_collection.find_one({'_id': chat_id}, projection=_projection(['settings']))
+                return (group or {}).get('settings') or {}
+            return {}
+        except Exception as e:
+            print(f"❌ Error getting settings for group {chat_id}: {e}")
+            return {}
+
+    def get_user_memory(self, user_id, chat_id):
+        """Returns the user's AI memory (history, model, settings) for a chat; {} if none."""
+        try:
+            if not self.db:
+                print("⚠️ Database not connected")
+                return {}
+            memory_collection = self.get_collection('user_memory')
+            if memory_collection:
+                with self.connection_slot('user_memory', 'find_one'):
+                    memory = memory_collection.find_one({'_id': f"{user_id}:{chat_id}"})
+                return memory or {}
+            return {}
+        except Exception as e:
+            print(f"❌ Error getting AI memory for user {user_id}: {e}")
+            return {}
+
+    def save_user_memory(self, user_id, chat_id, memory, summary=None):
+        """Upserts the user's AI memory for a chat."""
+        try:
+            if not self.db:
+                print("⚠️ Database not connected")
+                return None
+            fields = {key: value for key, value in memory.items() if key != '_id'}
+            fields.update(user_id=user_id, chat_id=chat_id)
+            if summary is not None:
+                fields['summary'] = summary
+            return self._durable_update('user_memory', {'_id': f"{user_id}:{chat_id}"}, {'$set': fields})
+        except Exception as e:
+            print(f"❌ Error saving AI memory for user {user_id}: {e}")
+            return None
+
     def setup_collections(self):
         """Ensures that the required collections exist in the database."""
         try:
@@ -85,6 +675,180 @@ class Database:
             print(f"⚠️ Could not verify collections due to a network error: {e}")
             print("Proceeding with assumption that 'users' collection exists.")
 
+class AsyncCursor:
+    """Async iterator over find() results, fetched in batches on the DB executor."""
+
+    def __init__(self, adb, collection_name, filter=None, projection=None, batch_size=None):
+        self._adb = adb
+        self._collection_name = collection_name
+        self._filter = filter or {}
+        self._projection = projection
+        self._batch_size = batch_size or CURSOR_CONFIG["page_size"]
+        self._pages = None
+        self._buffer = deque()
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._buffer:
+            if self._exhausted:
+                raise StopAsyncIteration
+            self._buffer = deque(await self._adb.run(self._next_batch))
+            if not self._buffer:
+                self._exhausted = True
+                raise StopAsyncIteration
+        return self._buffer.popleft()
+
+    def _next_batch(self):
+        """Pulls the next batch from the underlying sync cursor (runs in a worker thread)."""
+        if self._pages is None:
+            self._pages = self._adb.db.iter_pages(
+                self._collection_name, self._filter, self._projection, self._batch_size
+            )
+        batch = next(self._pages, [])
+        if len(batch) < self._batch_size:
+            self._exhausted = True
+        return batch
+
+    async def to_list(self):
+        """Collects all remaining documents."""
+        return [doc async for doc in self]
+
+class AsyncDatabase:
+    """Asyncio facade over the shared Database.
+
+    Blocking astrapy calls run on a bounded thread pool (one worker per
+    pool connection slot), so a slow Astra round trip only delays the
+    handler awaiting it instead of the whole event loop.
+    """
+
+    def __init__(self, db, max_workers=None):
+        self.db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or DATABASE_POOL["max_connections"],
+            thread_name_prefix="db"
+        )
+
+    async def run(self, func, *args, **kwargs):
+        """Runs any blocking database-bound callable on the DB executor."""
+        loop = asyncio.get_running_loop()
+        # Carry context variables (e.g. the current handler name for metrics) into the worker
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(ctx.run, func, *args, **kwargs))
+
+    async def get_user(self, user_id, fields=None):
+        return await self.run(self.db.get_user, user_id, fields)
+
+    async def get_users(self, user_ids, fields=None):
+        return await self.run(self.db.get_users, user_ids, fields)
+
+    async def update_user(self, user_id, data):
+        return await self.run(self.db.update_user, user_id, data)
+
+    async def get_user_tasks(self, user_id, chat_id):
+        return await self.run(self.db.get_user_tasks, user_id, chat_id)
+
+    async def create_or_update_task(self, user_id, chat_id, task_name, progress, target):
+        return await self.run(self.db.create_or_update_task, user_id, chat_id, task_name, progress, target)
+
+    async def get_or_create_user(self, user_id):
+        return await self.run(self.db.get_or_create_user, user_id)
+
+    async def update_user_exp(self, user_id, amount):
+        return await self.run(self.db.update_user_exp, user_id, amount)
+
+    async def update_user_stats(self, user_id, **increments):
+        return await self.run(self.db.update_user_stats, user_id, **increments)
+
+    async def get_top_users(self, chat_id, limit, field='exp'):
+        return await self.run(self.db.get_top_users, chat_id, limit, field)
+
+    async def get_group_settings(self, chat_id):
+        return await self.run(self.db.get_group_settings, chat_id)
+
+    async def get_user_memory(self, user_id, chat_id):
+        return await self.run(self.db.get_user_memory, user_id, chat_id)
+
+    async def save_user_memory(self, user_id, chat_id, memory, summary=None):
+        return await self.run(self.db.save_user_memory, user_id, chat_id, memory, summary)
+
+    def find(self, collection_name, filter=None, projection=None, batch_size=None):
+        """Returns an async cursor: `async for doc in adb.find('users', {...})`."""
+        return AsyncCursor(self, collection_name, filter, projection, batch_size)
+
+# Process-wide shared database service
+_shared_db = None
+_shared_adb = None
+_shared_db_lock = threading.Lock()
+
+def _create_database():
+    """Picks the storage backend from DATABASE_BACKEND ('astra' or 'sqlite')."""
+    if DATABASE_BACKEND == 'sqlite':
+        from sqlite_backend import SQLiteDatabase, sqlite_path_from_url
+        return SQLiteDatabase(sqlite_path_from_url(SQLITE_URL))
+    if DATABASE_BACKEND != 'astra':
+        raise ValueError(f"Unknown DATABASE_BACKEND '{DATABASE_BACKEND}' (expected 'astra' or 'sqlite')")
+    if DATABASE_URL.startswith('sqlite:'):
+        print(f"⚠️⚠️ DATABASE_URL={DATABASE_URL} is IGNORED: Astra DB credentials are set, so data "
+              f"stays in Astra DB. Set DATABASE_BACKEND=sqlite to use the SQLite file instead.")
+    return Database()
+
+def get_database():
+    """Returns the process-wide Database, connecting it on first use.
+
+    Every module should use this instead of creating its own Database(),
+    so the bot keeps a single client, one set of collection handles and
+    a single setup_collections() bootstrap no matter how many modules load.
+    """
+    global _shared_db
+    if _shared_db is None:
+        with _shared_db_lock:
+            if _shared_db is None:
+                db = _create_database()
+                db.connect()
+                if MIGRATION_CONFIG["auto_migrate"]:
+                    from db_migrations import run_migrations
+                    run_migrations(db)
+                if db.outbox.pending():
+                    # Writes parked during a previous outage
+                    threading.Thread(target=db.replay_outbox, name="db-outbox-replay", daemon=True).start()
+                atexit.register(db.close)
+                _shared_db = db
+    return _shared_db
+
+def get_async_database():
+    """Returns the process-wide AsyncDatabase wrapping get_database()."""
+    global _shared_adb
+    if _shared_adb is None:
+        db = get_database()
+        with _shared_db_lock:
+            if _shared_adb is None:
+                _shared_adb = AsyncDatabase(db)
+    return _shared_adb
+
+def peek_database():
+    """The shared Database if it exists yet; never connects (for metrics/status reads)."""
+    return _shared_db
+
+async def wait_for_async_database():
+    """get_async_database() for coroutines: waits out a bootstrap in progress off the event loop."""
+    if _shared_adb is not None:
+        return _shared_adb
+    return await asyncio.to_thread(get_async_database)
+
+def bootstrap_database():
+    """Connects the shared database on a background thread so startup doesn't wait for it."""
+    thread = threading.Thread(target=get_database, name="db-bootstrap", daemon=True)
+    thread.start()
+    return thread
+
+def close_database():
+    """Flushes the shared database if it was ever opened."""
+    if _shared_db is not None:
+        _shared_db.close()
+
 # Example of how to use the Database class for direct testing
 if __name__ == "__main__":
     print("[Test] Running database.py directly...")
@@ -95,4 +859,3 @@ if __name__ == "__main__":
         pass
     else:
         print("[Test] Connection failed.")
-
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+🧱 DATABASE MIGRATIONS
+Ultimate Group King Bot - Versioned Schema & Index Bootstrap
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Ordered, versioned migrations applied once and recorded in schema_migrations
+- SQLite indexes for the hot lookup paths
+- Astra DB collections created with matching indexed-field settings
+- Optional backup before migrating (BACKUP_CONFIG path)
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from config import MIGRATION_CONFIG, BACKUP_CONFIG
+
+# Each migration: version, description, SQLite statements, Astra collections.
+# Astra fixes a collection's indexing when it is created, so the Astra side
+# only creates missing collections with an "allow" list of filtered fields.
+MIGRATIONS = [
+    {
+        "version": "1.1.0",
+        "description": "Indexes for hot lookup paths",
+        "sqlite": [
+            # wallets.user_id, escrow_deals.deal_id and identities.custom_id
+            # are already indexed by their PRIMARY KEY / UNIQUE constraints
+            "CREATE INDEX IF NOT EXISTS idx_transactions_user_type_status ON transactions (user_id, type, status)",
+            "CREATE INDEX IF NOT EXISTS idx_transactions_type_status ON transactions (type, status)",
+            "CREATE INDEX IF NOT EXISTS idx_stores_owner ON stores (owner_id)",
+            "CREATE INDEX IF NOT EXISTS idx_store_items_store_status ON store_items (store_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_elections_chat_status ON elections (chat_id, status)",
+            "CREATE INDEX IF NOT EXISTS idx_candidates_election_user ON candidates (election_id, user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_votes_election_voter ON votes (election_id, voter_id)",
+            "CREATE INDEX IF NOT EXISTS idx_users_username ON users (username)",
+            "CREATE INDEX IF NOT EXISTS idx_user_tasks_user_chat ON user_tasks (user_id, chat_id)"
+        ],
+        "astra": {
+            "user_tasks": {"allow": ["user_id", "chat_id", "task_name"]}
+        }
+    }
+]
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in version.split('.'))
+
+def pending_migrations(applied: List[str]) -> List[Dict]:
+    """Migrations up to MIGRATION_CONFIG['version'] that have not run yet."""
+    target = _version_key(MIGRATION_CONFIG["version"])
+    return sorted(
+        (m for m in MIGRATIONS
+         if m["version"] not in applied and _version_key(m["version"]) <= target),
+        key=lambda m: _version_key(m["version"])
+    )
+
+# --- SQLite ---
+def _sqlite_applied(db) -> List[str]:
+    with db.connect() as conn:
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                version TEXT PRIMARY KEY,
+                description TEXT,
+                applied_at TEXT
+            )''')
+        return [row[0] for row in conn.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")]
+
+def _sqlite_backup(db, version: str):
+    """Copies the live database (WAL included) with the online backup API."""
+    if db.path == ':memory:':
+        return
+    backup_dir = BACKUP_CONFIG["backup_path"]
+    os.makedirs(backup_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(db.path))[0]
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    target_path = os.path.join(backup_dir, f"{name}_pre_{version}_{stamp}.db")
+    target = sqlite3.connect(target_path)
+    try:
+        with db.connect() as conn:
+            conn.backup(target)
+    finally:
+        target.close()
+    print(f"💾 Backup written to {target_path}")
+
+    # Keep only the newest max_backups pre-migration backups
+    backups = sorted(
+        f for f in os.listdir(backup_dir)
+        if f.startswith(f"{name}_pre_") and f.endswith('.db')
+    )
+    for old in backups[:-BACKUP_CONFIG["max_backups"]]:
+        os.remove(os.path.join(backup_dir, old))
+
+def _sqlite_apply(db, migration: Dict):
+    # One transaction per migration: either every statement lands or none
+    with db.connect() as conn:
+        conn.execute("BEGIN")
+        for statement in migration["sqlite"]:
+            conn.execute(statement)
+        conn.execute(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) VALUES (?, ?, ?)",
+            (migration["version"], migration["description"], datetime.now().isoformat())
+        )
+
+# --- Astra DB ---
+def _astra_applied(db) -> List[str]:
+    if MIGRATIONS_TABLE not in db.db.list_collection_names():
+        db.db.create_collection(MIGRATIONS_TABLE)
+    collection = db.get_collection(MIGRATIONS_TABLE)
+    return [doc['_id'] for doc in collection.find({}, projection={'_id': True})]
+
+def _astra_apply(db, migration: Dict):
+    existing = db.db.list_collection_names()
+    for name, indexing in migration["astra"].items():
+        if name in existing:
+            print(f"[DB] '{name}' already exists; Astra indexing is fixed at creation, leaving it as is.")
+            continue
+        db.db.create_collection(name, definition={"indexing": indexing})
+        print(f"[DB] '{name}' collection created with indexing {indexing}.")
+    db.get_collection(MIGRATIONS_TABLE).insert_one({
+        '_id': migration["version"],
+        'description': migration["description"],
+        'applied_at': datetime.now().isoformat()
+    })
+
+def run_migrations(db) -> List[str]:
+    """Applies pending migrations to a connected database; returns applied versions."""
+    if not db.db:
+        print("⚠️ Database not connected, skipping migrations")
+        return []
+
+    is_sqlite = hasattr(db, 'pool')
+    try:
+        pending = pending_migrations(_sqlite_applied(db) if is_sqlite else _astra_applied(db))
+    except Exception as e:
+        print(f"❌ Could not read migration state: {e}")
+        return []
+    if not pending:
+        return []
+
+    if MIGRATION_CONFIG["backup_before_migrate"]:
+        if is_sqlite:
+            try:
+                _sqlite_backup(db, pending[0]["version"])
+            except Exception as e:
+                print(f"❌ Backup failed, not migrating: {e}")
+                return []
+        else:
+            # Astra migrations only create missing collections, nothing to restore
+            print("[DB] Skipping backup: Astra migrations are additive.")
+
+    applied = []
+    for migration in pending:
+        try:
+            if is_sqlite:
+                _sqlite_apply(db, migration)
+            else:
+                _astra_apply(db, migration)
+        except Exception as e:
+            print(f"❌ Migration {migration['version']} failed: {e}")
+            break
+        applied.append(migration["version"])
+        print(f"✅ Migration {migration['version']} applied: {migration['description']}")
+    return applied
+
+if __name__ == "__main__":
+    from database import get_database
+    print(f"[Migrate] Target version {MIGRATION_CONFIG['version']}")
+    print(f"[Migrate] Applied: {run_migrations(get_database()) or 'nothing pending'}")
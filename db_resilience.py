@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+🛡️ DATABASE RESILIENCE
+Ultimate Group King Bot - Outage Handling for the Storage Backend
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Circuit breaker that fails fast while the backend is unreachable
+- Durable append-only outbox for writes made during an outage
+- In-order replay of the outbox once connectivity returns
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    # Ships with astrapy; transport errors are the retryable kind
+    from httpx import TransportError as HTTPTransportError
+except ImportError:
+    HTTPTransportError = ()
+
+def _encode(value):
+    # Keep datetimes typed across the round trip (the backend stores them natively)
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    return str(value)
+
+def _decode(obj: Dict):
+    if len(obj) == 1 and '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    return obj
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the circuit is open."""
+
+def is_transient(exc: BaseException) -> bool:
+    """True for connectivity problems (timeouts, DNS, refused connections).
+
+    Those trip the breaker and send writes to the outbox; anything else is a
+    real error that retrying later would not fix, including HTTP error
+    responses (httpx.HTTPStatusError) and local OSErrors such as
+    PermissionError or FileNotFoundError.
+    """
+    # httpx.TransportError covers ConnectError, ReadTimeout and the rest of httpx.TimeoutException
+    if isinstance(exc, (CircuitOpenError, TimeoutError, ConnectionError, HTTPTransportError)):
+        return True
+    # astrapy DataAPITimeoutException and friends
+    return any('Timeout' in cls.__name__ for cls in type(exc).__mro__)
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures.
+
+    While open every call is rejected immediately. After `reset_timeout`
+    seconds one probe call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, name: str = 'db'):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {'rejected': 0, 'opened': 0}
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend right now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def is_open(self) -> bool:
+        """Whether calls are being rejected right now (does not claim the half-open probe)."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.reset_timeout
+            return self.state == self.HALF_OPEN and self._probe_in_flight
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"✅ Circuit '{self.name}' closed, backend is reachable again.")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats['opened'] += 1
+                    print(f"⚠️ Circuit '{self.name}' open after {self._failures} failures, failing fast for {self.reset_timeout}s.")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def get_status(self) -> Dict:
+        return {'state': self.state, 'consecutive_failures': self._failures, **self.stats}
+
+class WriteOutbox:
+    """Append-only JSONL file of writes that could not reach the backend.
+
+    Each line is one upsert ({"collection", "filter", "update"}). Lines are
+    fsync'ed on append and replayed strictly in order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._count = self._count_lines()
+        if self._count:
+            print(f"📮 Outbox has {self._count} write(s) waiting to be replayed.")
+
+    def _count_lines(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return sum(1 for line in f if line.strip())
+
+    def pending(self) -> int:
+        return self._count
+
+    def append(self, collection: str, filter: Dict, update: Dict):
+        line = json.dumps({'collection': collection, 'filter': filter, 'update': update}, default=_encode)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._count += 1
+
+    def replay(self, apply: Callable[[Dict], None]) -> Optional[bool]:
+        """Applies queued writes in order; returns True once the outbox is empty.
+
+        Stops at the first transient failure so later writes never overtake
+        earlier ones. Entries failing for any other reason are dropped.
+        Returns None if another thread is already replaying.
+        """
+        if not self._replay_lock.acquire(blocking=False):
+            return None
+        try:
+            with self._lock:
+                if not self._count:
+                    return True
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = [line for line in f if line.strip()]
+
+            done = 0
+            drained = True
+            for line in entries:
+                try:
+                    apply(json.loads(line, object_hook=_decode))
+                except Exception as e:
+                    if is_transient(e):
+                        drained = False
+                        break
+                    print(f"❌ Dropping outbox entry that cannot be applied: {e}")
+                done += 1
+            if not done:
+                # Nothing applied: leave the file alone instead of rewriting it
+                return False
+
+            # Appends may have landed meanwhile; only drop what was applied
+            with self._lock:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    remaining = [line for line in f if line.strip()][done:]
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.writelines(remaining)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self._count = len(remaining)
+            if done:
+                print(f"📮 Replayed {done} outbox write(s), {self._count} left.")
+            return drained and not self._count
+        finally:
+            self._replay_lock.release()
@@ -8,7 +8,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from payment_system import PaymentSystem
-from database import Database
+from database import get_database, get_async_database
 from datetime import datetime
 
 class EconomyCommands:
@@ -17,9 +17,9 @@ class EconomyCommands:
     def __init__(self):
         self.payment_system = PaymentSystem()
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
+        self.adb = get_async_database()
     
     async def wallet_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Check wallet balance"""
@@ -27,8 +27,8 @@ class EconomyCommands:
             user = update.effective_user
             
             # Ensure wallet exists
-            self.payment_system.create_wallet(user.id)
-            wallet = self.payment_system.get_wallet(user.id)
+            await self.adb.run(self.payment_system.create_wallet, user.id)
+            wallet = await self.adb.run(self.payment_system.get_wallet, user.id)
             
             if not wallet:
                 await update.message.reply_text("❌ Error fetching wallet!")
@@ -81,8 +81,8 @@ class EconomyCommands:
                 username = username[1:]
                 
             # Ensure wallet exists
-            self.payment_system.create_wallet(user.id)
-            wallet = self.payment_system.get_wallet(user.id)
+            await self.adb.run(self.payment_system.create_wallet, user.id)
+            wallet = await self.adb.run(self.payment_system.get_wallet, user.id)
             
             if not wallet or wallet['balance'] < amount:
                 await update.message.reply_text("❌ Insufficient balance!")
@@ -109,16 +109,15 @@ class EconomyCommands:
         user = update.effective_user
         
         # Ensure wallet exists
-        self.payment_system.create_wallet(user.id)
-        wallet = self.payment_system.get_wallet(user.id)
-        wallet = payment_system.get_wallet(user.id)
+        await self.adb.run(self.payment_system.create_wallet, user.id)
+        wallet = await self.adb.run(self.payment_system.get_wallet, user.id)
         
         if not wallet:
             await update.message.reply_text("❌ Error fetching wallet!")
             return
             
         balance = wallet['balance']
-        currency = payment_system.currency_symbol
+        currency = self.payment_system.currency_symbol
         
         await update.message.reply_text(
             f"💰 **YOUR WALLET** 💰\n\n"
@@ -150,10 +149,10 @@ class EconomyCommands:
             return
             
         # Ensure wallet exists
-        payment_system.create_wallet(user.id)
+        await self.adb.run(self.payment_system.create_wallet, user.id)
         
         # Generate payment link
-        link = payment_system.generate_payment_link(user.id, amount)
+        link = await self.adb.run(self.payment_system.generate_payment_link, user.id, amount)
         
         # Create keyboard
         keyboard = [
@@ -193,7 +192,7 @@ class EconomyCommands:
             return
             
         # Process withdrawal
-        success, message = payment_system.request_withdrawal(user.id, amount, upi_id)
+        success, message = await self.adb.run(self.payment_system.request_withdrawal, user.id, amount, upi_id)
         
         if success:
             await update.message.reply_text(f"✅ {message}")
@@ -19,7 +19,7 @@ from telegram.error import (
 )
 
 from config import LOG_LEVEL, LOG_FILE
-from database import Database
+from database import get_database
 
 class ErrorHandler:
     """Comprehensive error handling and logging system"""
@@ -31,9 +31,8 @@ class ErrorHandler:
         self.critical_errors = []
         self.user_error_messages = {}
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
         
         # Setup logging
         self._setup_logging()
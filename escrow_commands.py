@@ -8,7 +8,10 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from escrow_system import escrow_system
-from database import Database
+from database import get_database
+
+# Shared database service (SQL lookups on the users table)
+db = get_database()
 
 class EscrowCommands:
     """Handler for escrow related commands"""
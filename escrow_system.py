@@ -8,7 +8,7 @@ import logging
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from database import Database
+from database import get_database
 from payment_system import payment_system
 
 # Configure logging
@@ -19,9 +19,8 @@ class EscrowSystem:
     """Manages secure escrow transactions"""
     
     def __init__(self):
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     def create_deal(self, buyer_id: int, seller_id: int, amount: float, description: str) -> Tuple[bool, str]:
         """Create a new escrow deal"""
@@ -54,7 +53,7 @@ class EscrowSystem:
     def get_deal(self, deal_id: str) -> Optional[Dict]:
         """Get deal details"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM escrow_deals WHERE deal_id = ?', (deal_id,))
                 row = cursor.fetchone()
@@ -87,7 +86,7 @@ class EscrowSystem:
             return False, f"Deal is already {deal['status']}!"
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE escrow_deals 
@@ -122,7 +121,7 @@ class EscrowSystem:
             if not payment_system.deduct_balance(user_id, deal['amount'], f"Escrow Payment: {deal_id}"):
                 return False, "Payment failed!"
                 
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE escrow_deals 
@@ -153,7 +152,7 @@ class EscrowSystem:
             if not payment_system.add_balance(deal['seller_id'], deal['amount'], f"Escrow Release: {deal_id}"):
                 return False, "Transfer failed!"
                 
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE escrow_deals 
@@ -180,7 +179,7 @@ class EscrowSystem:
             return False, "Cannot dispute this deal state!"
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     UPDATE escrow_deals 
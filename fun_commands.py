@@ -14,7 +14,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
-from database import Database
+from database import get_database
 
 class FunCommands:
     """Handles all fun and entertainment commands"""
@@ -23,9 +23,8 @@ class FunCommands:
         self.active_games = {}
         self.game_scores = {}
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
         
         # Truth questions database
         self.truth_questions = [
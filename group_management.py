@@ -18,7 +18,7 @@ from config import (
     DEFAULT_GROUP_CONFIG, LOCKABLE_ITEMS, EMOJIS, 
     COMMAND_CATEGORIES, OWNER_ID
 )
-from database import Database
+from database import get_database
 
 # Conversation states
 SETTING_WELCOME, SETTING_RULES, SETTING_GOODBYE = range(3)
@@ -29,9 +29,8 @@ class GroupManagement:
     def __init__(self):
         self.pending_settings = {}  # For multi-step conversations
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     async def is_admin(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
         """Check if user is admin"""
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+🏆 HEAVY HITTERS
+Ultimate Group King Bot - Streaming Top-K Counters
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Space-Saving algorithm: top-K of an unbounded stream in fixed memory
+- O(1) per event (stream-summary buckets), leaderboards without sorting all keys
+- Every reported count carries its maximum overestimate
+"""
+
+from typing import Dict, Hashable, List, Tuple
+
+class SpaceSaving:
+    """Tracks the `capacity` most frequent items of a stream.
+
+    Each monitored item has a count and an error bound: when the table is
+    full, a new item replaces the least counted one and inherits its count as
+    error. Any item with true frequency above total/capacity is guaranteed to
+    be monitored, so a capacity of a few times K gives a reliable top-K.
+    Items are grouped in buckets by count, which keeps updates O(1).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, Dict[Hashable, None]] = {}  # count -> items (insertion ordered)
+        self._min = 0
+
+    def _move(self, item: Hashable, old: int, new: int):
+        bucket = self._buckets[old]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[old]
+            if old == self._min:
+                self._min = new
+        self._buckets.setdefault(new, {})[item] = None
+
+    def add(self, item: Hashable):
+        self.total += 1
+        count = self._counts.get(item)
+        if count is not None:
+            self._counts[item] = count + 1
+            self._move(item, count, count + 1)
+            return
+
+        if len(self._counts) < self.capacity:
+            self._counts[item] = 1
+            self._errors[item] = 0
+            self._buckets.setdefault(1, {})[item] = None
+            self._min = 1
+            return
+
+        # Replace the oldest of the least counted items
+        floor = self._min
+        bucket = self._buckets[floor]
+        victim = next(iter(bucket))
+        del bucket[victim]
+        del self._counts[victim]
+        del self._errors[victim]
+        if not bucket:
+            del self._buckets[floor]
+            self._min = floor + 1
+        self._counts[item] = floor + 1
+        self._errors[item] = floor
+        self._buckets.setdefault(floor + 1, {})[item] = None
+
+    def top(self, k: int) -> List[Tuple[Hashable, int, int]]:
+        """[(item, count, error), ...] highest count first; count - error <= true count <= count."""
+        result = []
+        for count in sorted(self._buckets, reverse=True):
+            for item in self._buckets[count]:
+                result.append((item, count, self._errors[item]))
+                if len(result) == k:
+                    return result
+        return result
+
+    def get_state(self) -> Dict:
+        """JSON-safe copy; items are listed bucket by bucket, oldest first within a bucket."""
+        return {
+            'total': self.total,
+            'items': [[item, count, self._errors[item]]
+                      for count in sorted(self._buckets) for item in self._buckets[count]]
+        }
+
+    def load_state(self, state: Dict):
+        self.total = state['total']
+        self._counts, self._errors, self._buckets = {}, {}, {}
+        for item, count, error in state['items'][-self.capacity:]:
+            self._counts[item] = count
+            self._errors[item] = error
+            self._buckets.setdefault(count, {})[item] = None
+        self._min = min(self._buckets, default=0)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, item):
+        return item in self._counts
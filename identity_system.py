@@ -6,7 +6,7 @@ Author: Nikhil Mehra (NikkuAi09)
 
 import logging
 from typing import Dict, Optional, Tuple
-from database import Database
+from database import get_database
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,9 +16,8 @@ class IdentitySystem:
     """Manages user identities (Custom ID, Bio, Business)"""
     
     def __init__(self):
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     def set_custom_id(self, user_id: int, custom_id: str) -> Tuple[bool, str]:
         """Set a custom ID (handle) for the user"""
@@ -56,7 +55,7 @@ class IdentitySystem:
             return False, "Bio must be under 200 characters!"
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -79,7 +78,7 @@ class IdentitySystem:
             return False, "Business name must be under 50 characters!"
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
@@ -99,7 +98,7 @@ class IdentitySystem:
     def get_identity(self, user_id: int) -> Dict:
         """Get user identity details"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT custom_id, bio, business_name FROM identities WHERE user_id = ?', (user_id,))
                 row = cursor.fetchone()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+🔎 KEYWORD MATCHER
+Ultimate Group King Bot - One-Pass Intent Matching
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Many keyword/regex sets compiled once into a single regex
+- One scan rejects non-matching text (most messages) and bounds the priority search
+- Same results as trying the patterns one by one in order
+- Capture groups of the winning pattern come back as arguments
+"""
+
+import re
+from typing import Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+class IntentMatch(NamedTuple):
+    intent: str
+    args: Tuple[Optional[str], ...]
+    match: 're.Match'
+
+class KeywordMatcher:
+    """Matches text against an ordered list of (intent, patterns).
+
+    Every pattern becomes one named alternative of a combined regex. Text
+    it doesn't match (the usual case) costs a single scan. Otherwise its
+    leftmost match names a pattern that certainly matches, so only the
+    patterns listed before that one are tried on their own. The result is
+    the same as trying the patterns one by one in order: the first pattern
+    that matches anywhere wins, with its leftmost match, even where a later
+    pattern's match overlaps it.
+    """
+
+    def __init__(self, intents: Sequence[Tuple[str, Iterable[str]]], flags: int = re.IGNORECASE):
+        alternatives = []
+        self._slots: List[Tuple[str, int, int]] = []  # priority -> (intent, first arg group, arg count)
+        self._patterns: List[Pattern] = []  # priority -> the pattern compiled on its own
+        self._intents: List[Tuple[str, Pattern]] = []  # each intent's patterns as one regex
+        group = 1
+        for intent, patterns in intents:
+            patterns = list(patterns)
+            for pattern in patterns:
+                compiled = re.compile(pattern, flags)
+                alternatives.append(f"(?P<p{len(self._slots)}>{pattern})")
+                self._slots.append((intent, group + 1, compiled.groups))
+                self._patterns.append(compiled)
+                group += 1 + compiled.groups
+            self._intents.append((intent, re.compile('|'.join(f"(?:{p})" for p in patterns) or r'(?!)', flags)))
+        self.pattern = re.compile('|'.join(alternatives) or r'(?!)', flags)
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Intent of the first pattern (in listed order) found in `text`, or None."""
+        m = self.pattern.search(text)
+        if m is None:
+            return None
+        priority = int(m.lastgroup[1:])
+        # The leftmost match may belong to a lower-priority pattern; earlier
+        # patterns can still match elsewhere, even overlapping it
+        for earlier in range(priority):
+            found = self._patterns[earlier].search(text)
+            if found:
+                return IntentMatch(self._slots[earlier][0], found.groups(), found)
+        intent, first, count = self._slots[priority]
+        return IntentMatch(intent, m.groups()[first - 1:first - 1 + count], m)
+
+    def intents(self, text: str) -> List[str]:
+        """All intents found in `text`, in priority order (overlapping matches included)."""
+        if self.pattern.search(text) is None:
+            return []
+        return [intent for intent, compiled in self._intents if compiled.search(text)]
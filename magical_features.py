@@ -413,53 +413,35 @@ class MagicalFeatures:
         else:
             await update.message.reply_text(f"❌ Unknown spell: {spell_name}")
     
+    async def _play_effect(self, update: Update, frames: list, finale: str):
+        """Send effect frames in order; the send scheduler paces them per chat"""
+        for frame in frames:
+            await update.message.reply_text(frame)
+        await update.message.reply_text(finale)
+    
     async def thunder_effect(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Thunder strike effect"""
-        effects = ["⚡", "🌩️", "⛈️", "💥"]
-        for effect in effects:
-            await update.message.reply_text(effect)
-            await asyncio.sleep(0.5)
-        await update.message.reply_text("⚡ *THUNDER STRIKE COMPLETE* ⚡")
+        await self._play_effect(update, ["⚡", "🌩️", "⛈️", "💥"], "⚡ *THUNDER STRIKE COMPLETE* ⚡")
     
     async def fire_effect(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Fire storm effect"""
-        effects = ["🔥", "🌋", "💥", "🔥🔥🔥"]
-        for effect in effects:
-            await update.message.reply_text(effect)
-            await asyncio.sleep(0.5)
-        await update.message.reply_text("🔥 *FIRE STORM COMPLETE* 🔥")
+        await self._play_effect(update, ["🔥", "🌋", "💥", "🔥🔥🔥"], "🔥 *FIRE STORM COMPLETE* 🔥")
     
     async def ice_effect(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Ice freeze effect"""
-        effects = ["❄️", "🧊", "🥶", "❄️❄️❄️"]
-        for effect in effects:
-            await update.message.reply_text(effect)
-            await asyncio.sleep(0.5)
-        await update.message.reply_text("❄️ *ICE FREEZE COMPLETE* ❄️")
+        await self._play_effect(update, ["❄️", "🧊", "🥶", "❄️❄️❄️"], "❄️ *ICE FREEZE COMPLETE* ❄️")
     
     async def shadow_effect(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Shadow bind effect"""
-        effects = ["🌑", "🌒", "🌓", "🌑🌑🌑"]
-        for effect in effects:
-            await update.message.reply_text(effect)
-            await asyncio.sleep(0.5)
-        await update.message.reply_text("🌑 *SHADOW BIND COMPLETE* 🌑")
+        await self._play_effect(update, ["🌑", "🌒", "🌓", "🌑🌑🌑"], "🌑 *SHADOW BIND COMPLETE* 🌑")
     
     async def heal_effect(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Healing light effect"""
-        effects = ["💚", "💚💚", "💚💚💚", "✨"]
-        for effect in effects:
-            await update.message.reply_text(effect)
-            await asyncio.sleep(0.5)
-        await update.message.reply_text("💚 *HEALING COMPLETE* 💚")
+        await self._play_effect(update, ["💚", "💚💚", "💚💚💚", "✨"], "💚 *HEALING COMPLETE* 💚")
     
     async def teleport_effect(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Teleport effect"""
-        effects = ["🌀", "🌪️", "✨", "👻"]
-        for effect in effects:
-            await update.message.reply_text(effect)
-            await asyncio.sleep(0.5)
-        await update.message.reply_text("🌀 *TELEPORT COMPLETE* 🌀")
+        await self._play_effect(update, ["🌀", "🌪️", "✨", "👻"], "🌀 *TELEPORT COMPLETE* 🌀")
     
     async def handle_magical_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle magical feature callbacks"""
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+📏 METRICS
+Ultimate Group King Bot - Latency & Outcome Instrumentation
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Fixed-bucket latency histograms with p50/p95/p99
+- Database call timing per collection, operation and calling handler
+- Handler attribution via a context variable set once per update
+- Per-update latency by handler/route over sliding windows (1m/5m/1h)
+- Labelled outcome counters (AI requests) and event-loop lag sampling
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Upper bucket bounds in seconds (the last bucket catches everything slower)
+LATENCY_BUCKETS = [
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+]
+
+# Name of the handler processing the current update ("background" outside one)
+current_handler: ContextVar[str] = ContextVar('current_handler', default='background')
+
+class LatencyHistogram:
+    """Constant-memory latency distribution; percentiles are bucket-interpolated."""
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Latency (seconds) below which a fraction q of observations fall."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                # Linear interpolation inside the bucket, capped by the real max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def snapshot(self) -> Dict:
+        """Summary in milliseconds."""
+        return {
+            'count': self.count,
+            'avg_ms': (self.total / self.count * 1000) if self.count else 0.0,
+            'p50_ms': self.percentile(0.50) * 1000,
+            'p95_ms': self.percentile(0.95) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'max_ms': self.max * 1000
+        }
+
+class WindowedHistogram:
+    """Latency histogram over a sliding time window.
+
+    Time is cut into `slot_seconds` slots kept in a ring; each slot holds its
+    own LatencyHistogram, and a window query merges the slots it covers. Old
+    slots are overwritten in place, so memory stays fixed.
+    """
+
+    def __init__(self, max_window: int = 3600, slot_seconds: int = 10):
+        self.slot_seconds = slot_seconds
+        self._slots = [None] * (max_window // slot_seconds)  # [slot number, LatencyHistogram]
+        self.lifetime = LatencyHistogram()
+
+    def observe(self, seconds: float, now: float = None):
+        slot_number = int((now or time.time()) // self.slot_seconds)
+        index = slot_number % len(self._slots)
+        slot = self._slots[index]
+        if slot is None or slot[0] != slot_number:
+            slot = self._slots[index] = [slot_number, LatencyHistogram()]
+        slot[1].observe(seconds)
+        self.lifetime.observe(seconds)
+
+    def window(self, seconds: int, now: float = None) -> LatencyHistogram:
+        """Merged histogram of the last `seconds` (rounded to whole slots)."""
+        current = int((now or time.time()) // self.slot_seconds)
+        oldest = current - min(len(self._slots), max(1, seconds // self.slot_seconds)) + 1
+        merged = LatencyHistogram()
+        for slot in self._slots:
+            if slot is not None and oldest <= slot[0] <= current:
+                merged.merge(slot[1])
+        return merged
+
+class UpdateMetrics:
+    """Receive-to-done latency of every update, by handler label.
+
+    Labels come from the update processor: '/start', 'callback:menu_',
+    'message', ... Windows are reported as 1m, 5m and 1h.
+    """
+
+    WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+    MAX_LABELS = 200  # unknown /commands would otherwise create a series each
+
+    def __init__(self):
+        self._series: Dict[str, WindowedHistogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, label: str, seconds: float, ok: bool = True):
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                if len(self._series) >= self.MAX_LABELS:
+                    label = 'other'
+                    series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = WindowedHistogram()
+                self._errors[label] = 0
+            series.observe(seconds)
+            if not ok:
+                self._errors[label] += 1
+
+    def summary(self, window: str = '5m') -> Dict[str, Dict]:
+        """Per-label snapshot over one of WINDOWS, plus lifetime totals."""
+        seconds = self.WINDOWS[window]
+        with self._lock:
+            result = {}
+            for label, series in self._series.items():
+                histogram = series.window(seconds)
+                if histogram.count:
+                    result[label] = {
+                        **histogram.snapshot(),
+                        'per_minute': histogram.count * 60 / seconds,
+                        'lifetime_count': series.lifetime.count,
+                        'errors': self._errors[label]
+                    }
+            return result
+
+    def overall(self, window: str = '5m', prefix: str = '') -> Dict:
+        """All labels starting with `prefix` merged ('/' = commands only)."""
+        seconds = self.WINDOWS[window]
+        merged = LatencyHistogram()
+        with self._lock:
+            for label, series in self._series.items():
+                if label.startswith(prefix):
+                    merged.merge(series.window(seconds))
+        return {**merged.snapshot(), 'per_minute': merged.count * 60 / seconds}
+
+    def lifetime(self) -> Dict[str, LatencyHistogram]:
+        """Copies of the since-start histograms, by label."""
+        with self._lock:
+            return {label: _copy(series.lifetime) for label, series in self._series.items()}
+
+    def errors(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._errors)
+
+    def top(self, window: str = '5m', limit: int = 5, key: str = 'p95_ms') -> List[tuple]:
+        """Slowest labels in the window."""
+        return sorted(self.summary(window).items(), key=lambda item: item[1][key], reverse=True)[:limit]
+
+class DBMetrics:
+    """Timing and outcome counters for every database call.
+
+    Keyed by (collection, operation, handler) so slow paths can be traced
+    back to the bot handler that triggered them.
+    """
+
+    FIELDS = ('collection', 'operation', 'handler')
+
+    def __init__(self):
+        self._series = {}  # (collection, operation, handler) -> {'latency', 'ok', 'errors'}
+        self._lock = threading.Lock()
+
+    def record(self, collection: str, operation: str, seconds: float, ok: bool = True,
+               handler: Optional[str] = None):
+        key = (collection, operation, handler or current_handler.get())
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'latency': LatencyHistogram(), 'ok': 0, 'errors': 0}
+            series['latency'].observe(seconds)
+            series['ok' if ok else 'errors'] += 1
+
+    @contextmanager
+    def track(self, collection: str, operation: str):
+        """Times the wrapped call; exceptions count as errors and propagate."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(collection, operation, time.perf_counter() - start, ok=False)
+            raise
+        self.record(collection, operation, time.perf_counter() - start)
+
+    def groups(self, *fields: str) -> Dict[tuple, Dict]:
+        """Series merged by the given FIELDS; no fields gives a single () group."""
+        indexes = [self.FIELDS.index(field) for field in fields]
+        groups = {}
+        with self._lock:
+            for key, series in self._series.items():
+                name = tuple(key[i] for i in indexes)
+                group = groups.get(name)
+                if group is None:
+                    group = groups[name] = {'latency': LatencyHistogram(), 'ok': 0, 'errors': 0}
+                group['latency'].merge(series['latency'])
+                group['ok'] += series['ok']
+                group['errors'] += series['errors']
+        return groups
+
+    def summary(self, by: str = 'operation') -> Dict[str, Dict]:
+        """Aggregates series by 'collection', 'operation', 'handler' or 'all'."""
+        fields = (by,) if by in self.FIELDS else ()
+        result = {}
+        for key, group in self.groups(*fields).items():
+            name = key[0] if key else 'all'
+            calls = group['ok'] + group['errors']
+            result[name] = {
+                **group['latency'].snapshot(),
+                'errors': group['errors'],
+                'error_rate': (group['errors'] / calls * 100) if calls else 0.0,
+                'total_ms': group['latency'].total * 1000
+            }
+        return result
+
+    def overall(self) -> Dict:
+        return self.summary('all').get('all', {**LatencyHistogram().snapshot(), 'errors': 0,
+                                               'error_rate': 0.0, 'total_ms': 0.0})
+
+    def top(self, by: str = 'handler', limit: int = 5) -> List[tuple]:
+        """Groups that spent the most total time in the database."""
+        return sorted(self.summary(by).items(), key=lambda item: item[1]['total_ms'], reverse=True)[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+class OutcomeCounter:
+    """Monotonic counters keyed by a tuple of label values."""
+
+    def __init__(self, *label_names: str):
+        self.label_names = label_names
+        self._counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: int = 1):
+        with self._lock:
+            self._counts[labels] = self._counts.get(labels, 0) + amount
+
+    def items(self) -> List[tuple]:
+        """[(label values, count), ...]"""
+        with self._lock:
+            return list(self._counts.items())
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+class AIMetrics:
+    """AI request outcomes (one per question) and per-model API attempts."""
+
+    def __init__(self):
+        self.requests = OutcomeCounter('outcome')
+        self.attempts = OutcomeCounter('model', 'status')
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def record_attempt(self, model: str, status: str, seconds: float):
+        self.attempts.inc(model, status)
+        with self._lock:
+            self.latency.observe(seconds)
+
+    def latency_copy(self) -> LatencyHistogram:
+        with self._lock:
+            return _copy(self.latency)
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a periodic sleep wakes up.
+
+    A blocked loop (sync I/O in a handler, heavy CPU work) shows up here long
+    before it shows up as user-visible latency.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.histogram = LatencyHistogram()
+        self.last = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last = max(0.0, time.perf_counter() - started - self.interval)
+            self.histogram.observe(self.last)
+
+    def start(self, interval: float = None):
+        """Starts sampling on the running loop (call from a coroutine)."""
+        if interval:
+            self.interval = interval
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+def _copy(histogram: LatencyHistogram) -> LatencyHistogram:
+    copy = LatencyHistogram(histogram.buckets)
+    copy.merge(histogram)
+    return copy
+
+def describe_update(update) -> str:
+    """Short handler label for an update: '/start', 'callback:analytics', 'message', ..."""
+    message = getattr(update, 'effective_message', None)
+    text = getattr(message, 'text', None) or ''
+    if text.startswith('/'):
+        return text.split()[0].split('@')[0].lower()
+    query = getattr(update, 'callback_query', None)
+    if query is not None:
+        return f"callback:{(query.data or '').split('_')[0]}"
+    if message is not None:
+        return 'message'
+    return 'update'
+
+# Global metrics instances
+db_metrics = DBMetrics()
+update_metrics = UpdateMetrics()
+ai_metrics = AIMetrics()
+loop_lag = LoopLagMonitor()
@@ -7,7 +7,6 @@ Author: Nikhil Mehra (NikkuAi09)
 
 import asyncio
 import os
-import json
 import subprocess
 import sys
 from datetime import datetime, timedelta
@@ -16,8 +15,8 @@ from telegram import Update, Bot, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
-from config import OWNER_ID
-from database import Database
+from config import OWNER_ID, BACKUP_CONFIG
+from database import get_database
 
 class OwnerCommands:
     """Handles owner-only commands"""
@@ -28,9 +27,8 @@ class OwnerCommands:
         self.bot_restart_time = None
         self.shutdown_time = None
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
         
         # Owner verification
         self.owner_commands = {
@@ -135,16 +133,13 @@ class OwnerCommands:
             return
         
         try:
-            # Create backup
-            backup_data = await self._create_backup(backup_type)
-            
-            # Save to file
+            # Create backup (streamed to file)
             filename = f"backup_{backup_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(f"backups/{filename}", 'w') as f:
-                json.dump(backup_data, f, indent=2, default=str)
+            backup_path = os.path.join(BACKUP_CONFIG["backup_path"], filename)
+            await self._create_backup(backup_type, backup_path)
             
             # Get file size
-            file_size = os.path.getsize(f"backups/{filename}")
+            file_size = os.path.getsize(backup_path)
             
             await update.message.reply_text(
                 f"📦 **BACKUP CREATED** 📦\n\n"
@@ -610,27 +605,20 @@ class OwnerCommands:
         broadcast['status'] = 'completed'
         broadcast['completed_at'] = datetime.now()
     
-    async def _create_backup(self, backup_type: str) -> Dict[str, Any]:
-        """Create backup data"""
-        backup_data = {
+    async def _create_backup(self, backup_type: str, backup_path: str) -> Dict[str, int]:
+        """Stream backup data to backup_path; returns records per section"""
+        collections = {
+            section: collection
+            for section, collection in BACKUP_CONFIG["collections"].items()
+            if backup_type in ['full', section]
+        }
+        metadata = {
             'backup_type': backup_type,
             'timestamp': datetime.now().isoformat(),
             'version': '1.0'
         }
-        
-        if backup_type in ['full', 'users']:
-            backup_data['users'] = db.get_all_users()
-        
-        if backup_type in ['full', 'chats']:
-            backup_data['chats'] = db.get_all_chats()
-        
-        if backup_type in ['full', 'commands']:
-            backup_data['commands'] = db.get_all_command_stats()
-        
-        if backup_type in ['full', 'tasks']:
-            backup_data['tasks'] = db.get_all_task_stats()
-        
-        return backup_data
+        os.makedirs(BACKUP_CONFIG["backup_path"], exist_ok=True)
+        return await asyncio.to_thread(self.db.backup_collections, backup_path, collections, metadata)
     
     async def _restart_bot(self):
         """Restart the bot"""
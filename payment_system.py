@@ -8,7 +8,7 @@ import logging
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from database import Database
+from database import get_database
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,9 +22,8 @@ class PaymentSystem:
         self.currency_symbol = "🪙"
         self.admin_upi = "nikhilop09@ibl"  # Admin UPI for deposits
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
         
     def create_wallet(self, user_id: int) -> bool:
         """Create a wallet for a user if not exists"""
@@ -50,7 +49,7 @@ class PaymentSystem:
     def get_wallet(self, user_id: int) -> Optional[Dict]:
         """Get user wallet details"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM wallets WHERE user_id = ?', (user_id,))
                 row = cursor.fetchone()
@@ -73,7 +72,7 @@ class PaymentSystem:
             return False
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Update wallet
@@ -106,7 +105,7 @@ class PaymentSystem:
             return False
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Update wallet
@@ -141,7 +140,7 @@ class PaymentSystem:
         
         # Log pending deposit
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO transactions (
@@ -160,7 +159,7 @@ class PaymentSystem:
             return False, "Insufficient balance!"
             
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Deduct balance immediately (hold it)
@@ -186,7 +185,7 @@ class PaymentSystem:
     def get_pending_withdrawals(self) -> List[Dict]:
         """Get all pending withdrawal requests (for Admin Dashboard)"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT * FROM transactions 
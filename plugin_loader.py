@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+🧩 PLUGIN LOADER
+Ultimate Group King Bot - Lazy Feature Modules & Boot Report
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Feature modules registered as light stubs, imported on first use
+- First use imports the module in a worker thread, never on the event loop
+- Boot-phase timing report (where startup time goes)
+- First-use load times per plugin
+"""
+
+import asyncio
+import importlib
+import inspect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _DeferredMethod:
+    """Async handler callback standing in for `plugin.method` until the plugin loads.
+
+    Feature modules talk to the database at import time, so the load runs
+    in a worker thread and the event loop keeps serving other updates.
+    """
+
+    def __init__(self, plugin: 'LazyPlugin', name: str):
+        self._plugin = plugin
+        self._name = name
+        self.__name__ = name
+        self.__qualname__ = f"{plugin.name}.{name}"
+
+    async def __call__(self, *args, **kwargs):
+        instance = await self._plugin.load_async()
+        result = getattr(instance, self._name)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def __repr__(self):
+        return f"<deferred {self.__qualname__}>"
+
+class LazyPlugin:
+    """Proxy for a feature object living in `module_name.attribute`.
+
+    The module is imported (and, if `attribute` is a class, instantiated) on
+    first real use. Until then, the names listed in `handlers` return deferred
+    methods, so handlers can be registered as
+    `CommandHandler("ai", ai_handler.ask_command)` without importing
+    ai_handler; any other name raises AttributeError. Once loaded, attributes
+    are the real ones.
+    """
+
+    def __init__(self, module_name: str, attribute: str, name: str = None, handlers: Iterable[str] = ()):
+        self.module_name = module_name
+        self.attribute = attribute
+        self.name = name or module_name
+        self.handlers = frozenset(handlers)
+        self._instance = None
+        self._lock = threading.Lock()
+        boot_report.plugins[self.name] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    started = time.perf_counter()
+                    target = getattr(importlib.import_module(self.module_name), self.attribute)
+                    instance = target() if inspect.isclass(target) else target
+                    elapsed = time.perf_counter() - started
+                    boot_report.plugins[self.name] = elapsed
+                    logger.info(f"🧩 Plugin '{self.name}' loaded on first use in {elapsed * 1000:.0f}ms")
+                    self._instance = instance
+        return self._instance
+
+    async def load_async(self):
+        """load() from the event loop: the import runs in a worker thread."""
+        if self._instance is not None:
+            return self._instance
+        return await asyncio.to_thread(self.load)
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if self._instance is not None:
+            return getattr(self._instance, name)
+        if name in self.handlers:
+            return _DeferredMethod(self, name)
+        raise AttributeError(f"Plugin '{self.name}' is not loaded and '{name}' is not one of its handlers")
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyPlugin {self.module_name}.{self.attribute} ({state})>"
+
+class BootReport:
+    """Collects how long each startup phase took."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.plugins: Dict[str, float] = {}  # name -> first-use load time (None = not loaded yet)
+        self.ready_at = None
+        self._last = self.started
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last = time.perf_counter()
+            self.phases.append((name, self._last - started))
+
+    def checkpoint(self, name: str):
+        """Records the time since the previous phase/checkpoint as phase `name`."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def format(self) -> str:
+        lines = ["⏱️ Boot report:"]
+        for name, elapsed in self.phases:
+            lines.append(f"  • {name}: {elapsed * 1000:.0f}ms")
+        if self.ready_at:
+            lines.append(f"  ⇒ accepting updates after {(self.ready_at - self.started) * 1000:.0f}ms")
+        loaded = {name: t for name, t in self.plugins.items() if t is not None}
+        lines.append(f"  • plugins loaded: {len(loaded)}/{len(self.plugins)}")
+        for name, elapsed in sorted(loaded.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"    - {name}: {elapsed * 1000:.0f}ms")
+        return "\n".join(lines)
+
+# Global boot report (started when this module is first imported)
+boot_report = BootReport()
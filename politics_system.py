@@ -8,7 +8,7 @@ import logging
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from database import Database
+from database import get_database
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,9 +18,8 @@ class PoliticsSystem:
     """Manages elections and voting"""
     
     def __init__(self):
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     def check_expired_elections(self) -> List[str]:
         """Check and end expired elections (older than 5 days)"""
@@ -52,7 +51,7 @@ class PoliticsSystem:
         self.check_expired_elections()
         
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Check if active election exists
@@ -81,7 +80,7 @@ class PoliticsSystem:
     def nominate_candidate(self, chat_id: int, user_id: int, manifesto: str = "") -> Tuple[bool, str]:
         """Nominate a user for the active election"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Get active election
@@ -119,7 +118,7 @@ class PoliticsSystem:
     def vote(self, chat_id: int, voter_id: int, candidate_id: str) -> Tuple[bool, str]:
         """Vote for a candidate"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Get active election
@@ -172,7 +171,7 @@ class PoliticsSystem:
     def get_election_results(self, chat_id: int) -> Tuple[bool, str, List[Dict]]:
         """Get results of active or last election"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Get latest election
@@ -215,7 +214,7 @@ class PoliticsSystem:
     def end_election(self, chat_id: int) -> Tuple[bool, str]:
         """End the active election"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('''
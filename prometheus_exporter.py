@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+📡 PROMETHEUS EXPORTER
+Ultimate Group King Bot - Metrics in Prometheus Text Format
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Reads the counters the bot already keeps, no database queries per scrape
+- Histograms exported as cumulative buckets straight from LatencyHistogram
+- Updates, handler latency, DB calls, caches, send queue, AI outcomes, memory, loop lag
+- Rendered text reused for METRICS_CONFIG["cache_seconds"], so scraping is ~free
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from config import METRICS_CONFIG
+from database import peek_database
+from metrics import LatencyHistogram, db_metrics, update_metrics, ai_metrics, loop_lag
+from send_scheduler import send_scheduler
+from rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value != float('inf') else '+Inf'
+    return str(int(value))
+
+class MetricsWriter:
+    """Builds one exposition: HELP/TYPE headers followed by samples."""
+
+    def __init__(self, prefix: str = METRICS_CONFIG["prefix"]):
+        self.prefix = prefix
+        self.lines: List[str] = []
+
+    def _family(self, name: str, kind: str, help_text: str, prefixed: bool = True) -> str:
+        full = f"{self.prefix}_{name}" if prefixed else name
+        self.lines.append(f"# HELP {full} {help_text}")
+        self.lines.append(f"# TYPE {full} {kind}")
+        return full
+
+    def metric(self, name: str, kind: str, help_text: str,
+               samples: Iterable[Tuple[Dict, float]], prefixed: bool = True):
+        """A counter or gauge: samples are (labels, value)."""
+        full = self._family(name, kind, help_text, prefixed)
+        for labels, value in samples:
+            self.lines.append(f"{full}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, series: Iterable[Tuple[Dict, LatencyHistogram]]):
+        """LatencyHistogram counts become cumulative `le` buckets plus _sum/_count."""
+        full = self._family(name, 'histogram', help_text)
+        for labels, histogram in series:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + [float('inf')], histogram.counts):
+                cumulative += count
+                self.lines.append(f"{full}_bucket{_labels({**labels, 'le': _number(float(bound))})} {cumulative}")
+            self.lines.append(f"{full}_sum{_labels(labels)} {_number(float(histogram.total))}")
+            self.lines.append(f"{full}_count{_labels(labels)} {histogram.count}")
+
+    def text(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+def _collect_updates(w: MetricsWriter):
+    histograms = update_metrics.lifetime()
+    errors = update_metrics.errors()
+    w.metric('updates_total', 'counter', 'Updates processed, by handler.',
+             (({'handler': label}, histogram.count) for label, histogram in histograms.items()))
+    w.metric('update_errors_total', 'counter', 'Updates whose handler raised, by handler.',
+             (({'handler': label}, count) for label, count in errors.items()))
+    w.histogram('update_duration_seconds', 'Receive-to-done update latency, by handler.',
+                (({'handler': label}, histogram) for label, histogram in histograms.items()))
+
+def _collect_database(w: MetricsWriter):
+    groups = db_metrics.groups('collection', 'operation')
+    w.histogram('db_call_duration_seconds', 'Database call latency.',
+                (({'collection': c, 'operation': o}, group['latency']) for (c, o), group in groups.items()))
+    w.metric('db_call_errors_total', 'counter', 'Database calls that raised.',
+             (({'collection': c, 'operation': o}, group['errors']) for (c, o), group in groups.items()))
+
+    db = peek_database()
+    if db is None:
+        return
+    cache = db.user_cache.stats()
+    lookups = cache['hits'] + cache['misses']
+    labels = {'cache': 'users'}
+    w.metric('cache_hits_total', 'counter', 'Cache lookups served from memory.', [(labels, cache['hits'])])
+    w.metric('cache_misses_total', 'counter', 'Cache lookups that went to the database.', [(labels, cache['misses'])])
+    w.metric('cache_evictions_total', 'counter', 'Entries evicted to stay within the size limit.', [(labels, cache['evictions'])])
+    w.metric('cache_entries', 'gauge', 'Entries currently cached.', [(labels, cache['size'])])
+    w.metric('cache_hit_ratio', 'gauge', 'Hits / lookups since start.',
+             [(labels, cache['hits'] / lookups if lookups else 0.0)])
+
+    pool = db.pool_status()
+    w.metric('db_connections_in_use', 'gauge', 'Database calls in flight.', [({}, pool['in_use'])])
+    w.metric('db_connections_max', 'gauge', 'Configured connection slots.', [({}, pool['max_connections'])])
+    w.metric('db_outbox_pending', 'gauge', 'Writes waiting in the outbox for the backend to recover.',
+             [({}, pool['outbox_pending'])])
+    w.metric('db_circuit_state', 'gauge', 'Circuit breaker state (1 for the current state).',
+             [({'state': state}, 1 if pool['circuit'] == state else 0) for state in ('closed', 'open', 'half_open')])
+
+def _collect_sends(w: MetricsWriter):
+    status = send_scheduler.get_status()
+    w.metric('send_queue_depth', 'gauge', 'Outgoing requests waiting for a send slot.', [({}, status['queued'])])
+    w.metric('send_paused_chats', 'gauge', 'Chats paused by a RetryAfter.', [({}, status['paused_chats'])])
+    w.metric('send_requests_total', 'counter', 'Outgoing Bot API requests.', [({}, status['requests'])])
+    w.metric('send_delayed_total', 'counter', 'Requests that had to wait for a slot.', [({}, status['delayed'])])
+    w.metric('send_retry_after_total', 'counter', 'RetryAfter responses from Telegram.', [({}, status['retry_after'])])
+    w.metric('send_gave_up_total', 'counter', 'Requests that failed after all retries.', [({}, status['gave_up'])])
+
+    limits = rate_limiter.get_status()
+    w.metric('rate_limit_checks_total', 'counter', 'Incoming updates checked against user budgets.',
+             [({}, limits['checked'])])
+    w.metric('rate_limited_total', 'counter', 'Incoming updates dropped for exceeding a budget.',
+             [({}, limits['limited'])])
+
+def _collect_ai(w: MetricsWriter):
+    w.metric('ai_requests_total', 'counter', 'AI questions, by outcome.',
+             (({'outcome': outcome}, count) for (outcome,), count in ai_metrics.requests.items()))
+    w.metric('ai_attempts_total', 'counter', 'AI API calls, by model and result.',
+             (({'model': model, 'status': status}, count) for (model, status), count in ai_metrics.attempts.items()))
+    w.histogram('ai_attempt_duration_seconds', 'AI API call latency.', [({}, ai_metrics.latency_copy())])
+
+def _collect_process(w: MetricsWriter):
+    try:
+        import psutil
+    except ImportError:
+        return
+    process = psutil.Process()
+    memory = process.memory_info()
+    cpu = process.cpu_times()
+    w.metric('process_resident_memory_bytes', 'gauge', 'Resident memory size in bytes.',
+             [({}, memory.rss)], prefixed=False)
+    w.metric('process_virtual_memory_bytes', 'gauge', 'Virtual memory size in bytes.',
+             [({}, memory.vms)], prefixed=False)
+    w.metric('process_cpu_seconds_total', 'counter', 'User and system CPU time in seconds.',
+             [({}, float(cpu.user + cpu.system))], prefixed=False)
+    w.metric('process_start_time_seconds', 'gauge', 'Start time since the epoch in seconds.',
+             [({}, float(process.create_time()))], prefixed=False)
+
+def _collect_loop(w: MetricsWriter):
+    w.metric('event_loop_lag_last_seconds', 'gauge', 'Lag of the latest event-loop sample.',
+             [({}, float(loop_lag.last))])
+    w.histogram('event_loop_lag_seconds', 'How late periodic event-loop wakeups run.',
+                [({}, loop_lag.histogram)])
+
+COLLECTORS = [_collect_updates, _collect_database, _collect_sends, _collect_ai, _collect_process, _collect_loop]
+
+class PrometheusExporter:
+    """Renders all collectors, reusing the result for `cache_seconds`."""
+
+    def __init__(self, cache_seconds: float = METRICS_CONFIG["cache_seconds"]):
+        self.cache_seconds = cache_seconds
+        self._text = ''
+        self._rendered_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'scrapes': 0, 'renders': 0, 'errors': 0}
+
+    def render(self) -> str:
+        with self._lock:
+            self.stats['scrapes'] += 1
+            now = time.monotonic()
+            if self._text and now - self._rendered_at < self.cache_seconds:
+                return self._text
+            writer = MetricsWriter()
+            for collect in COLLECTORS:
+                try:
+                    collect(writer)
+                except Exception as e:
+                    # One broken source must not take the whole scrape down
+                    self.stats['errors'] += 1
+                    logger.error(f"❌ Metrics collector {collect.__name__} failed: {e}")
+            self._text = writer.text()
+            self._rendered_at = now
+            self.stats['renders'] += 1
+            return self._text
+
+# Global exporter instance
+prometheus_exporter = PrometheusExporter()
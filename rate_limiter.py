@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+🚧 RATE LIMITER
+Ultimate Group King Bot - Per-User Request Budgets
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Enforces config.RATE_LIMITS before any handler runs
+- GCRA buckets: one float per (user, bucket), O(1) per check
+- Idle users are evicted, so memory tracks recently active users only
+- One "slow down" notice per limited streak, the rest are dropped silently
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from config import RATE_LIMITS, RATE_LIMITED_COMMANDS, OWNER_ID
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'minute': 60, 'hour': 3600, 'day': 86400}
+EVICT_INTERVAL = 60  # seconds between idle sweeps
+
+class GCRABucket:
+    """Generic cell rate algorithm: `limit` events per `period`, bursts up to `limit`.
+
+    Only the theoretical arrival time (TAT) is kept per key; a key whose TAT is
+    in the past holds a full budget and can be forgotten.
+    """
+
+    __slots__ = ('name', 'interval', 'tolerance', '_tat')
+
+    def __init__(self, name: str, limit: int, period: float):
+        self.name = name
+        self.interval = period / limit
+        self.tolerance = period - self.interval
+        self._tat: Dict[int, float] = {}
+
+    def check(self, key: int, now: float) -> Tuple[float, float]:
+        """(new TAT if allowed, seconds to wait); wait > 0 means denied."""
+        tat = max(self._tat.get(key, now), now)
+        wait = tat - self.tolerance - now
+        return tat + self.interval, wait
+
+    def commit(self, key: int, tat: float):
+        self._tat[key] = tat
+
+    def evict(self, now: float) -> int:
+        idle = [key for key, tat in self._tat.items() if tat <= now]
+        for key in idle:
+            del self._tat[key]
+        return len(idle)
+
+    def __len__(self):
+        return len(self._tat)
+
+class UserRateLimiter:
+    """All RATE_LIMITS buckets plus the update -> bucket classification."""
+
+    def __init__(self, limits: Dict = RATE_LIMITS, commands: Dict = RATE_LIMITED_COMMANDS):
+        self.buckets: Dict[str, GCRABucket] = {}
+        for name, limit in limits.items():
+            unit = name.rsplit('_per_', 1)[1]
+            self.buckets[name] = GCRABucket(name, limit, PERIODS[unit])
+        # command -> extra buckets it is charged to (besides messages/commands)
+        self._command_buckets: Dict[str, List[GCRABucket]] = {}
+        for name, command_names in commands.items():
+            for command in command_names:
+                self._command_buckets.setdefault(command, []).append(self.buckets[name])
+        self._warned_until: Dict[int, float] = {}
+        self._last_evict = time.monotonic()
+        self.stats = {'checked': 0, 'limited': 0, 'evicted': 0}
+
+    def _classify(self, update: Update) -> List[GCRABucket]:
+        message = update.message or update.edited_message
+        if message is None:
+            return []
+        charged = [self.buckets['messages_per_minute']]
+        text = message.text or message.caption or ''
+        if text.startswith('/'):
+            charged.append(self.buckets['commands_per_minute'])
+            command = text.split(None, 1)[0][1:].split('@')[0].lower()
+            charged.extend(self._command_buckets.get(command, ()))
+        return charged
+
+    def check(self, update: Update) -> Optional[Tuple[str, float]]:
+        """Charges the update to its buckets; returns (bucket, retry_after) if over budget.
+
+        Nothing is charged when any bucket refuses, so a limited command does
+        not also eat into the other budgets.
+        """
+        user = update.effective_user
+        if user is None or user.id == OWNER_ID:
+            return None
+        charged = self._classify(update)
+        if not charged:
+            return None
+
+        now = time.monotonic()
+        if now - self._last_evict > EVICT_INTERVAL:
+            self.evict(now)
+        self.stats['checked'] += 1
+
+        decisions = []
+        for bucket in charged:
+            tat, wait = bucket.check(user.id, now)
+            if wait > 0:
+                self.stats['limited'] += 1
+                return bucket.name, wait
+            decisions.append((bucket, tat))
+        for bucket, tat in decisions:
+            bucket.commit(user.id, tat)
+        return None
+
+    def should_warn(self, user_id: int, retry_after: float) -> bool:
+        """True once per limited streak."""
+        now = time.monotonic()
+        if self._warned_until.get(user_id, 0.0) > now:
+            return False
+        self._warned_until[user_id] = now + retry_after
+        return True
+
+    def evict(self, now: float = None):
+        now = now or time.monotonic()
+        self._last_evict = now
+        for bucket in self.buckets.values():
+            self.stats['evicted'] += bucket.evict(now)
+        for user_id in [uid for uid, until in self._warned_until.items() if until <= now]:
+            del self._warned_until[user_id]
+
+    def get_status(self) -> Dict:
+        return {
+            'tracked': {name: len(bucket) for name, bucket in self.buckets.items()},
+            **self.stats
+        }
+
+async def rate_limit_middleware(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """TypeHandler callback; stops the update before any handler group if over budget."""
+    denied = rate_limiter.check(update)
+    if denied is None:
+        return
+    bucket, retry_after = denied
+    user_id = update.effective_user.id
+    logger.info(f"🚧 User {user_id} over {bucket}, dropping update")
+    if rate_limiter.should_warn(user_id, retry_after):
+        await update.effective_message.reply_text(
+            f"⏳ Slow down! Limit reached ({bucket.replace('_', ' ')}). Try again in {int(retry_after) + 1}s."
+        )
+    raise ApplicationHandlerStop
+
+# Global limiter instance
+rate_limiter = UserRateLimiter()
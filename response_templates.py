@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+🧾 RESPONSE TEMPLATES
+Ultimate Group King Bot - Prerendered Messages & Keyboards
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Static texts normalised and validated for Telegram Markdown once, at load time
+- {placeholders} filled by plain string joins, user values escaped automatically
+- Keyboards built once and shared (InlineKeyboardMarkup is immutable)
+- Long messages split at MAX_LIMITS["message_length"]
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+
+from config import MAX_LIMITS
+
+MARKDOWN_SPECIAL = re.compile(r'([_*`\[])')
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+def escape_markdown(value) -> str:
+    """Escapes a dynamic value for use outside an entity (legacy Markdown)."""
+    return MARKDOWN_SPECIAL.sub(r'\\\1', str(value))
+
+def compile_markdown(text: str) -> List[Tuple[str, Optional[str]]]:
+    """Turns template text into legacy-Markdown parts.
+
+    `**bold**` becomes `*bold*`; `_` and `[` outside an entity are escaped
+    (templates use neither italics nor links); an unclosed `*` or backtick
+    raises ValueError so broken templates fail at startup, not per message.
+    Returns [(literal, None) | (field, entity char or '')] parts.
+    """
+    text = text.replace('**', '*')
+    parts: List[Tuple[str, Optional[str]]] = []
+    literal = []
+    entity = ''
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        placeholder = PLACEHOLDER.match(text, i) if ch == '{' else None
+        if placeholder:
+            parts.append((''.join(literal), None))
+            literal = []
+            parts.append((placeholder.group(1), entity))
+            i = placeholder.end()
+            continue
+        if entity:
+            if ch == entity:
+                entity = ''
+            literal.append(ch)
+        elif ch in '*`':
+            entity = ch
+            literal.append(ch)
+        elif ch in '_[':
+            literal.append('\\' + ch)
+        else:
+            literal.append(ch)
+        i += 1
+    if entity:
+        raise ValueError(f"Unclosed Markdown entity '{entity}' in template: {text[:40]!r}")
+    parts.append((''.join(literal), None))
+    return [part for part in parts if part[1] is not None or part[0]]
+
+def split_message(text: str, limit: int = MAX_LIMITS["message_length"]) -> List[str]:
+    """Splits at paragraph, then line boundaries so entities stay intact."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n\n', 0, limit)
+        if cut <= 0:
+            cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut].rstrip('\n'))
+        text = text[cut:].lstrip('\n')
+    if text:
+        chunks.append(text)
+    return chunks
+
+def build_keyboard(rows: Sequence[Sequence[Tuple[str, str]]]) -> InlineKeyboardMarkup:
+    """[[(label, callback_data), ...], ...] -> InlineKeyboardMarkup"""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(label, callback_data=data) for label, data in row]
+        for row in rows
+    ])
+
+class ResponseTemplate:
+    """A Markdown message (optionally with a keyboard) compiled once.
+
+    Fields are substituted by joining precompiled parts; values are escaped,
+    or stripped of the closing character when the placeholder sits inside
+    bold/code (Telegram does not allow escapes inside entities).
+    """
+
+    def __init__(self, text: str, keyboard: InlineKeyboardMarkup = None,
+                 parse_mode: str = ParseMode.MARKDOWN):
+        self.parts = compile_markdown(text)
+        self.fields = {part[0] for part in self.parts if part[1] is not None}
+        self.keyboard = keyboard
+        self.parse_mode = parse_mode
+        # Static templates are rendered and split right away
+        self._static = None if self.fields else split_message(self._join({}))
+
+    def _join(self, values: Dict) -> str:
+        out = []
+        for text, entity in self.parts:
+            if entity is None:
+                out.append(text)
+            elif entity:
+                out.append(str(values[text]).replace(entity, ''))
+            else:
+                out.append(escape_markdown(values[text]))
+        return ''.join(out)
+
+    def render(self, **values) -> List[str]:
+        """Message chunks, each within MAX_LIMITS["message_length"]."""
+        if self._static is not None:
+            return self._static
+        return split_message(self._join(values))
+
+    async def reply(self, message, keyboard: InlineKeyboardMarkup = None, **values):
+        """Replies with every chunk; the keyboard goes on the last one."""
+        chunks = self.render(**values)
+        for i, chunk in enumerate(chunks):
+            last = i == len(chunks) - 1
+            await message.reply_text(
+                chunk,
+                parse_mode=self.parse_mode,
+                reply_markup=(keyboard or self.keyboard) if last else None
+            )
+
+    async def edit(self, query, keyboard: InlineKeyboardMarkup = None, **values):
+        """Edits the callback's message with the first chunk, replies with the rest."""
+        chunks = self.render(**values)
+        markup = keyboard or self.keyboard
+        await query.edit_message_text(
+            chunks[0],
+            parse_mode=self.parse_mode,
+            reply_markup=markup if len(chunks) == 1 else None
+        )
+        for i, chunk in enumerate(chunks[1:], start=2):
+            await query.message.reply_text(
+                chunk,
+                parse_mode=self.parse_mode,
+                reply_markup=markup if i == len(chunks) else None
+            )
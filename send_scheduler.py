@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+📤 SEND SCHEDULER
+Ultimate Group King Bot - Outbound Telegram Rate Limiting
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Every Bot API request passes through one scheduler (Application rate limiter)
+- Global and per-chat token buckets matching Telegram's flood limits
+- RetryAfter honoured: the chat (or the whole bot) pauses, then the call is retried
+- Callers simply await their send/edit/delete; it returns once actually done
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from config import SEND_LIMITS
+
+logger = logging.getLogger(__name__)
+
+# Bot API methods that count against the flood limits (reads like getChatMember don't)
+LIMITED_PREFIXES = ('send', 'edit', 'delete', 'copy', 'forward')
+
+class TokenBucket:
+    """Reservation-style token bucket.
+
+    reserve() always takes a token and returns how long the caller must wait
+    for it; the balance may go negative, which queues callers in arrival order
+    without any polling.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def idle(self, now: float) -> bool:
+        """Full again, i.e. dropping it loses no state."""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+class SendScheduler(BaseRateLimiter[Dict]):
+    """Application-wide rate limiter for outgoing requests.
+
+    Register with `Application.builder().rate_limiter(SendScheduler())`.
+    Private chats get ~1 message/second, groups ~20/minute, and the bot as
+    a whole ~30/second. On RetryAfter the affected chat (or the whole bot for
+    chat-less calls) waits the requested time and the call is retried up to
+    `max_retries` times before the error reaches the handler.
+    """
+
+    def __init__(self, limits: Dict = SEND_LIMITS):
+        self.limits = limits
+        self._global = TokenBucket(limits["global_per_second"], limits["global_burst"])
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._paused_until: Dict[Any, float] = {}  # chat_id (None = all chats) -> monotonic time
+        self._waiting = 0
+        self.stats = {'requests': 0, 'delayed': 0, 'retry_after': 0, 'gave_up': 0}
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.limits["max_tracked_chats"]:
+                self._evict_idle()
+            # Negative ids (and @channel usernames) are groups/channels
+            if isinstance(chat_id, str) or chat_id < 0:
+                bucket = TokenBucket(self.limits["group_per_minute"] / 60, self.limits["group_burst"])
+            else:
+                bucket = TokenBucket(self.limits["private_per_second"], self.limits["private_burst"])
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.idle(now)]:
+            del self._chats[chat_id]
+        for chat_id in [chat_id for chat_id, until in self._paused_until.items() if until <= now]:
+            del self._paused_until[chat_id]
+
+    def _delay(self, chat_id, limited: bool) -> float:
+        now = time.monotonic()
+        delay = max(self._paused_until.get(None, 0.0), self._paused_until.get(chat_id, 0.0)) - now
+        if limited:
+            delay = max(delay, self._global.reserve(now))
+            if chat_id is not None:
+                delay = max(delay, self._chat_bucket(chat_id).reserve(now))
+        return delay
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Dict],
+    ):
+        chat_id = data.get('chat_id')
+        limited = endpoint.startswith(LIMITED_PREFIXES) and not (rate_limit_args or {}).get('unlimited')
+        self.stats['requests'] += 1
+
+        for attempt in range(self.limits["max_retries"] + 1):
+            delay = self._delay(chat_id, limited)
+            if delay > 0:
+                self.stats['delayed'] += 1
+                self._waiting += 1
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    self._waiting -= 1
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.stats['retry_after'] += 1
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                self._paused_until[chat_id] = time.monotonic() + retry_after
+                if attempt == self.limits["max_retries"]:
+                    self.stats['gave_up'] += 1
+                    raise
+                logger.warning(f"⏳ Flood limit on {endpoint} (chat {chat_id}), retrying in {retry_after}s")
+
+    def get_status(self) -> Dict:
+        return {
+            'queued': self._waiting,
+            'tracked_chats': len(self._chats),
+            'paused_chats': sum(1 for until in self._paused_until.values() if until > time.monotonic()),
+            **self.stats
+        }
+
+# Global scheduler instance
+send_scheduler = SendScheduler()
@@ -16,8 +16,20 @@ from fun_commands import fun_commands as entertainment_commands
 from group_management import group_management
 from magical_features import magical
 from working_commands import commands
+from keyword_matcher import KeywordMatcher
 
 class SmartDetection:
+    # Commands handled elsewhere; smart detection only looks at unknown ones
+    KNOWN_COMMANDS = frozenset([
+        '/start', '/help', '/games', '/play', '/roulette', '/slots', '/coin', '/dice',
+        '/joke', '/truth', '/dare', '/fact', '/ai', '/ping', '/time', '/calc', '/about', '/stats',
+        '/ask', '/chat', '/image', '/detect', '/scan', '/wallet', '/transfer', '/balance', '/deposit', '/withdraw',
+        '/createcmd', '/deletecmd', '/listcmds', '/runcmd', '/tagall', '/call', '/ban', '/kick', '/banrequest',
+        '/magic', '/thunder', '/fire', '/ice', '/shadow', '/heal', '/teleport', '/poison', '/earthquake', '/tsunami', '/tornado',
+        '/effects', '/announce', '/superadmin', '/broadcast', '/maintenance', '/emergency', '/userstats', '/settings',
+        '/poll', '/quiz', '/contest', '/giveaway', '/voting', '/leaderboard', '/event'
+    ])
+    
     def __init__(self):
         self.detection_patterns = {
             'admin': ['ban', 'kick', 'mute', 'promote', 'demote'],
@@ -26,6 +38,65 @@ class SmartDetection:
             'emergency': ['emergency', 'urgent', 'important']
         }
         
+        # All keyword/regex sets are compiled once; each matcher scans a text in one pass
+        self.detection_matcher = KeywordMatcher([
+            (keyword, [re.escape(keyword)])
+            for keywords in self.detection_patterns.values() for keyword in keywords
+        ])
+        
+        self.admin_matcher = KeywordMatcher([
+            ('ban', [r'ban\s+(@\w+|\d+)', r'nikal\s+(@\w+|\d+)', r'bahar\s+kar\s+(@\w+|\d+)', r'kick\s+(@\w+|\d+)']),
+            ('mute', [r'mute\s+(@\w+|\d+)\s*(\d+[mhdw])?', r'chup\s+(@\w+|\d+)\s*(\d+[mhdw])?',
+                      r'silent\s+(@\w+|\d+)\s*(\d+[mhdw])?']),
+            ('unmute', [r'unmute\s+(@\w+|\d+)', r'bol\s+(@\w+|\d+)', r'awaz\s+(@\w+|\d+)']),
+            ('warn', [r'warn\s+(@\w+|\d+)\s*(.+)?', r'warning\s+(@\w+|\d+)\s*(.+)?', r'dekh\s+(@\w+|\d+)\s*(.+)?']),
+            ('promote', [r'promote\s+(@\w+|\d+)', r'admin\s+(@\w+|\d+)', r'banade\s+(@\w+|\d+)']),
+            ('demote', [r'demote\s+(@\w+|\d+)', r'admin\s+hatade\s+(@\w+|\d+)', r'promote\s+hatade\s+(@\w+|\d+)']),
+            ('pin', [r'pin\s+(?:this|is|ko)', r'thek\s+kar', r'pin\s+kar']),
+            ('delete', [r'delete\s+(?:this|is|ko)', r'hatade\s+(?:this|is|ko)', r'ye\s+hatade'])
+        ])
+        
+        self.utility_matcher = KeywordMatcher([
+            ('weather', [r'weather\s+(.+)', r'mausam\s+(.+)', r'climate\s+(.+)', r'temperature\s+(.+)']),
+            ('calc', [r'calc\s+(.+)', r'calculate\s+(.+)', r'math\s+(.+)', r'solve\s+(.+)']),
+            ('search', [r'search\s+(.+)', r'google\s+(.+)', r'find\s+(.+)', r'dhoond\s+(.+)']),
+            ('time', [r'time\s+(?:now|abhi|hi)', r'what\s+time', r'kitna\s+time', r'current\s+time']),
+            ('date', [r'date\s+(?:today|aj)', r'what\s+date', r'kitni\s+date', r'current\s+date'])
+        ])
+        
+        self.info_matcher = KeywordMatcher([
+            ('help', [r'help', r'madad', r'kaise\s+kare', r'support', r'commands']),
+            ('rules', [r'rules', r'niyam', r'guidelines', r'kya\s+karna\s+hai', r'kya\s+nahi\s+karna\s+hai']),
+            ('stats', [r'stats', r'statistics', r'info', r'jankari', r'details']),
+            ('ping', [r'ping', r'pong', r'speed', r'latency', r'kitni\s+tez'])
+        ])
+        
+        self.fun_matcher = KeywordMatcher([
+            ('game', [r'game', r'khel', r'play', r'maza']),
+            ('truth', [r'truth', r'sach', r'truth\s+bata']),
+            ('dare', [r'dare', r'himat', r'dare\s+kar']),
+            ('roll', [r'roll', r'dice', r'baazi', r'roll\s+karo']),
+            ('coin', [r'coin', r'flip', r'paisa', r'sikka', r'head\s+tail']),
+            ('joke', [r'joke', r'hasi', r'joke\s+bata', r'hansao'])
+        ])
+        
+        self.command_starters = re.compile(
+            r'(?:ban|kick|mute|unmute|warn|promote|demote|weather|calc|search|time|date|help|rules'
+            r'|game|truth|dare|roll|coin|joke|ping)'
+        )
+        
+        # Keyword -> probability score for get_command_probability
+        self.probability_scores = {'admin': 0.8, 'utility': 0.7, 'fun': 0.6}
+        self.probability_matcher = KeywordMatcher([
+            (f"{category}_{keyword}", [re.escape(keyword)])
+            for category, keywords in [
+                ('admin', ['ban', 'kick', 'mute', 'warn', 'promote', 'delete']),
+                ('utility', ['weather', 'calc', 'search', 'time', 'date']),
+                ('fun', ['game', 'truth', 'dare', 'roll', 'coin', 'joke'])
+            ]
+            for keyword in keywords
+        ])
+        
     async def detect_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Smart command detection with execution"""
         if not update.message or not update.message.text:
@@ -38,29 +109,12 @@ class SmartDetection:
             return  # Ignore normal messages
         
         # Check if it's a known command - if yes, ignore
-        known_commands = [
-            '/start', '/help', '/games', '/play', '/roulette', '/slots', '/coin', '/dice',
-            '/joke', '/truth', '/dare', '/fact', '/ai', '/ping', '/time', '/calc', '/about', '/stats',
-            '/ask', '/chat', '/image', '/detect', '/scan', '/wallet', '/transfer', '/balance', '/deposit', '/withdraw',
-            '/createcmd', '/deletecmd', '/listcmds', '/runcmd', '/tagall', '/call', '/ban', '/kick', '/banrequest',
-            '/magic', '/thunder', '/fire', '/ice', '/shadow', '/heal', '/teleport', '/poison', '/earthquake', '/tsunami', '/tornado',
-            '/effects', '/announce', '/superadmin', '/broadcast', '/maintenance', '/emergency', '/userstats', '/settings',
-            '/poll', '/quiz', '/contest', '/giveaway', '/voting', '/leaderboard', '/event'
-        ]
-        
-        # Extract command name (first word after /)
         words = message_text.split()
-        if words:
-            cmd_name = words[0]
-            if cmd_name in known_commands:
-                return  # Ignore known commands
+        if words and words[0] in self.KNOWN_COMMANDS:
+            return  # Ignore known commands
         
         # Now check for patterns in unknown commands
-        detected_commands = []
-        for category, keywords in self.detection_patterns.items():
-            for keyword in keywords:
-                if keyword in message_text:
-                    detected_commands.append(f"/{keyword}")
+        detected_commands = [f"/{keyword}" for keyword in self.detection_matcher.intents(message_text)]
         
         if detected_commands:
             # 🎯 EXECUTE THE DETECTED COMMANDS
@@ -115,267 +169,73 @@ class SmartDetection:
         if not is_admin:
             return False
         
-        # Ban detection
-        ban_patterns = [
-            r'ban\s+(@\w+|\d+)',
-            r'nikal\s+(@\w+|\d+)',
-            r'bahar\s+kar\s+(@\w+|\d+)',
-            r'kick\s+(@\w+|\d+)'
-        ]
-        
-        for pattern in ban_patterns:
-            match = re.search(pattern, text)
-            if match:
-                target = match.group(1)
-                context.args = [target]
-                await admin_commands.ban_command(update, context)
-                return True
-        
-        # Mute detection
-        mute_patterns = [
-            r'mute\s+(@\w+|\d+)\s*(\d+[mhdw])?',
-            r'chup\s+(@\w+|\d+)\s*(\d+[mhdw])?',
-            r'silent\s+(@\w+|\d+)\s*(\d+[mhdw])?'
-        ]
-        
-        for pattern in mute_patterns:
-            match = re.search(pattern, text)
-            if match:
-                target = match.group(1)
-                duration = match.group(2) if match.group(2) else "1h"
-                context.args = [target, duration]
-                await admin_commands.mute_command(update, context)
-                return True
-        
-        # Unmute detection
-        unmute_patterns = [
-            r'unmute\s+(@\w+|\d+)',
-            r'bol\s+(@\w+|\d+)',
-            r'awaz\s+(@\w+|\d+)'
-        ]
-        
-        for pattern in unmute_patterns:
-            match = re.search(pattern, text)
-            if match:
-                target = match.group(1)
-                context.args = [target]
-                await admin_commands.unmute_command(update, context)
-                return True
-        
-        # Warn detection
-        warn_patterns = [
-            r'warn\s+(@\w+|\d+)\s*(.+)?',
-            r'warning\s+(@\w+|\d+)\s*(.+)?',
-            r'dekh\s+(@\w+|\d+)\s*(.+)?'
-        ]
-        
-        for pattern in warn_patterns:
-            match = re.search(pattern, text)
-            if match:
-                target = match.group(1)
-                reason = match.group(2) if match.group(2) else "No reason"
-                context.args = [target, reason]
-                await admin_commands.warn_command(update, context)
-                return True
-        
-        # Promote detection
-        promote_patterns = [
-            r'promote\s+(@\w+|\d+)',
-            r'admin\s+(@\w+|\d+)',
-            r'banade\s+(@\w+|\d+)'
-        ]
-        
-        for pattern in promote_patterns:
-            match = re.search(pattern, text)
-            if match:
-                target = match.group(1)
-                context.args = [target]
-                await admin_commands.promote_command(update, context)
-                return True
-        
-        # Demote detection
-        demote_patterns = [
-            r'demote\s+(@\w+|\d+)',
-            r'admin\s+hatade\s+(@\w+|\d+)',
-            r'promote\s+hatade\s+(@\w+|\d+)'
-        ]
-        
-        for pattern in demote_patterns:
-            match = re.search(pattern, text)
-            if match:
-                target = match.group(1)
-                context.args = [target]
-                await admin_commands.demote_command(update, context)
-                return True
-        
-        # Pin detection (requires reply)
-        pin_patterns = [
-            r'pin\s+(this|is|ko)',
-            r'thek\s+kar',
-            r'pin\s+kar'
-        ]
-        
-        for pattern in pin_patterns:
-            if re.search(pattern, text) and update.message.reply_to_message:
-                await admin_commands.pin_command(update, context)
-                return True
-        
-        # Delete detection (requires reply)
-        delete_patterns = [
-            r'delete\s+(this|is|ko)',
-            r'hatade\s+(this|is|ko)',
-            r'ye\s+hatade'
-        ]
-        
-        for pattern in delete_patterns:
-            if re.search(pattern, text) and update.message.reply_to_message:
-                await admin_commands.delete_command(update, context)
-                return True
+        match = self.admin_matcher.match(text)
+        if not match:
+            return False
         
-        return False
+        target = match.args[0] if match.args else None
+        if match.intent == 'ban':
+            context.args = [target]
+            await admin_commands.ban_command(update, context)
+        elif match.intent == 'mute':
+            context.args = [target, match.args[1] or "1h"]
+            await admin_commands.mute_command(update, context)
+        elif match.intent == 'unmute':
+            context.args = [target]
+            await admin_commands.unmute_command(update, context)
+        elif match.intent == 'warn':
+            context.args = [target, match.args[1] or "No reason"]
+            await admin_commands.warn_command(update, context)
+        elif match.intent == 'promote':
+            context.args = [target]
+            await admin_commands.promote_command(update, context)
+        elif match.intent == 'demote':
+            context.args = [target]
+            await admin_commands.demote_command(update, context)
+        elif not update.message.reply_to_message:
+            # Pin/delete act on the replied message
+            return False
+        elif match.intent == 'pin':
+            await admin_commands.pin_command(update, context)
+        else:
+            await admin_commands.delete_command(update, context)
+        return True
     
     async def _detect_utility_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, 
                                     text: str, bot=None) -> bool:
         """Detect utility commands"""
         
-        # Weather detection
-        weather_patterns = [
-            r'weather\s+(.+)',
-            r'mausam\s+(.+)',
-            r'climate\s+(.+)',
-            r'temperature\s+(.+)'
-        ]
-        
-        for pattern in weather_patterns:
-            match = re.search(pattern, text)
-            if match:
-                city = match.group(1)
-                context.args = [city]
-                await utility_commands.weather_command(update, context)
-                return True
-        
-        # Calc detection
-        calc_patterns = [
-            r'calc\s+(.+)',
-            r'calculate\s+(.+)',
-            r'math\s+(.+)',
-            r'solve\s+(.+)'
-        ]
-        
-        for pattern in calc_patterns:
-            match = re.search(pattern, text)
-            if match:
-                expression = match.group(1)
-                context.args = expression.split()
-                await utility_commands.calc_command(update, context)
-                return True
-        
-        # Search detection
-        search_patterns = [
-            r'search\s+(.+)',
-            r'google\s+(.+)',
-            r'find\s+(.+)',
-            r'dhoond\s+(.+)'
-        ]
-        
-        for pattern in search_patterns:
-            match = re.search(pattern, text)
-            if match:
-                query = match.group(1)
-                context.args = query.split()
-                await utility_commands.search_command(update, context)
-                return True
-        
-        # Time detection
-        time_patterns = [
-            r'time\s+(now|abhi|hi)',
-            r'what\s+time',
-            r'kitna\s+time',
-            r'current\s+time'
-        ]
-        
-        for pattern in time_patterns:
-            if re.search(pattern, text):
-                await utility_commands.time_command(update, context)
-                return True
-        
-        # Date detection
-        date_patterns = [
-            r'date\s+(today|aj)',
-            r'what\s+date',
-            r'kitni\s+date',
-            r'current\s+date'
-        ]
-        
-        for pattern in date_patterns:
-            if re.search(pattern, text):
-                await utility_commands.date_command(update, context)
-                return True
+        match = self.utility_matcher.match(text)
+        if not match:
+            return False
         
-        return False
+        if match.intent == 'weather':
+            context.args = [match.args[0]]
+            await utility_commands.weather_command(update, context)
+        elif match.intent == 'calc':
+            context.args = match.args[0].split()
+            await utility_commands.calc_command(update, context)
+        elif match.intent == 'search':
+            context.args = match.args[0].split()
+            await utility_commands.search_command(update, context)
+        elif match.intent == 'time':
+            await utility_commands.time_command(update, context)
+        else:
+            await utility_commands.date_command(update, context)
+        return True
     
     async def _detect_info_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, 
                                  text: str, bot=None) -> bool:
         """Detect information commands"""
         
-        # Help detection
-        help_patterns = [
-            r'help',
-            r'madad',
-            r'kaise\s+kare',
-            r'support',
-            r'commands'
-        ]
-        
-        for pattern in help_patterns:
-            if re.search(pattern, text):
-                if bot and hasattr(bot, 'help_command'):
-                    await bot.help_command(update, context)
-                    return True
-        
-        # Rules detection
-        rules_patterns = [
-            r'rules',
-            r'niyam',
-            r'guidelines',
-            r'kya\s+karna\s+hai',
-            r'kya\s+nahi\s+karna\s+hai'
-        ]
-        
-        for pattern in rules_patterns:
-            if re.search(pattern, text):
+        # help/stats/ping need the bot's own handlers; fall through to the next intent if missing
+        for intent in self.info_matcher.intents(text):
+            if intent == 'rules':
                 await group_management.rules_command(update, context)
                 return True
-        
-        # Stats detection
-        stats_patterns = [
-            r'stats',
-            r'statistics',
-            r'info',
-            r'jankari',
-            r'details'
-        ]
-        
-        for pattern in stats_patterns:
-            if re.search(pattern, text):
-                if bot and hasattr(bot, 'stats_command'):
-                    await bot.stats_command(update, context)
-                    return True
-        
-        # Ping detection
-        ping_patterns = [
-            r'ping',
-            r'pong',
-            r'speed',
-            r'latency',
-            r'kitni\s+tez'
-        ]
-        
-        for pattern in ping_patterns:
-            if re.search(pattern, text):
-                if bot and hasattr(bot, 'ping_command'):
-                    await bot.ping_command(update, context)
-                    return True
+            if bot and hasattr(bot, f"{intent}_command"):
+                await getattr(bot, f"{intent}_command")(update, context)
+                return True
         
         return False
     
@@ -383,84 +243,20 @@ class SmartDetection:
                                  text: str) -> bool:
         """Detect fun commands"""
         
-        # Game detection
-        game_patterns = [
-            r'game',
-            r'khel',
-            r'play',
-            r'maza'
-        ]
-        
-        for pattern in game_patterns:
-            if re.search(pattern, text):
-                await entertainment_commands.casino_command(update, context)
-                return True
-        
-        # Truth detection
-        truth_patterns = [
-            r'truth',
-            r'sach',
-            r'truth\s+bata'
-        ]
-        
-        for pattern in truth_patterns:
-            if re.search(pattern, text):
-                await entertainment_commands.truth_command(update, context)
-                return True
-        
-        # Dare detection
-        dare_patterns = [
-            r'dare',
-            r'himat',
-            r'dare\s+kar'
-        ]
-        
-        for pattern in dare_patterns:
-            if re.search(pattern, text):
-                await entertainment_commands.dare_command(update, context)
-                return True
-        
-        # Roll detection
-        roll_patterns = [
-            r'roll',
-            r'dice',
-            r'baazi',
-            r'roll\s+karo'
-        ]
-        
-        for pattern in roll_patterns:
-            if re.search(pattern, text):
-                await entertainment_commands.dice_command(update, context)
-                return True
-        
-        # Coin detection
-        coin_patterns = [
-            r'coin',
-            r'flip',
-            r'paisa',
-            r'sikka',
-            r'head\s+tail'
-        ]
-        
-        for pattern in coin_patterns:
-            if re.search(pattern, text):
-                await entertainment_commands.coin_command(update, context)
-                return True
-        
-        # Joke detection
-        joke_patterns = [
-            r'joke',
-            r'hasi',
-            r'joke\s+bata',
-            r'hansao'
-        ]
-        
-        for pattern in joke_patterns:
-            if re.search(pattern, text):
-                await entertainment_commands.joke_command(update, context)
-                return True
+        match = self.fun_matcher.match(text)
+        if not match:
+            return False
         
-        return False
+        handlers = {
+            'game': entertainment_commands.casino_command,
+            'truth': entertainment_commands.truth_command,
+            'dare': entertainment_commands.dare_command,
+            'roll': entertainment_commands.dice_command,
+            'coin': entertainment_commands.coin_command,
+            'joke': entertainment_commands.joke_command
+        }
+        await handlers[match.intent](update, context)
+        return True
     
     async def _detect_pattern_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE, 
                                     text: str, bot=None) -> bool:
@@ -517,15 +313,8 @@ class SmartDetection:
         text = text.lower().strip()
         
         # Check if it starts with command-like words
-        command_starters = [
-            'ban', 'kick', 'mute', 'unmute', 'warn', 'promote', 'demote',
-            'weather', 'calc', 'search', 'time', 'date', 'help', 'rules',
-            'game', 'truth', 'dare', 'roll', 'coin', 'joke', 'ping'
-        ]
-        
-        for starter in command_starters:
-            if text.startswith(starter):
-                return True
+        if self.command_starters.match(text):
+            return True
         
         # Check patterns
         for pattern in self.patterns.values():
@@ -539,23 +328,8 @@ class SmartDetection:
         text = text.lower().strip()
         scores = {}
         
-        # Check admin commands
-        admin_keywords = ['ban', 'kick', 'mute', 'warn', 'promote', 'delete']
-        for keyword in admin_keywords:
-            if keyword in text:
-                scores[f"admin_{keyword}"] = 0.8
-        
-        # Check utility commands
-        utility_keywords = ['weather', 'calc', 'search', 'time', 'date']
-        for keyword in utility_keywords:
-            if keyword in text:
-                scores[f"utility_{keyword}"] = 0.7
-        
-        # Check fun commands
-        fun_keywords = ['game', 'truth', 'dare', 'roll', 'coin', 'joke']
-        for keyword in fun_keywords:
-            if keyword in text:
-                scores[f"fun_{keyword}"] = 0.6
+        for intent in self.probability_matcher.intents(text):
+            scores[intent] = self.probability_scores[intent.split('_', 1)[0]]
         
         return scores
 
@@ -12,7 +12,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
-from database import Database
+from database import get_database
 
 class SocialSystem:
     """Handles social interactions like marriage, friendship, and fun actions"""
@@ -22,9 +22,8 @@ class SocialSystem:
         self.marriages = {}  # Store active marriages (In real app, use DB)
         self.friends = {}    # Store friendships
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
         
     async def marry_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Propose to someone"""
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+🗄️ SQLITE BACKEND
+Ultimate Group King Bot - Embedded Local Storage
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- SQLite in WAL mode, selected with DATABASE_BACKEND=sqlite (file from DATABASE_URL)
+- Relational schema for the economy, escrow, store, politics and identity tables
+- Document tables (JSON) for users, tasks and other collection-style data
+- Pooled connections with per-connection prepared statement cache
+"""
+
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from config import DATABASE_POOL, SQLITE_CONFIG, CURSOR_CONFIG
+from database import Database
+from metrics import db_metrics
+
+# Relational tables: column order matters, callers read rows positionally
+SCHEMA = {
+    'wallets': '''
+        CREATE TABLE IF NOT EXISTS wallets (
+            user_id INTEGER PRIMARY KEY,
+            balance REAL NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT
+        )''',
+    'transactions': '''
+        CREATE TABLE IF NOT EXISTS transactions (
+            transaction_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''',
+    'escrow_deals': '''
+        CREATE TABLE IF NOT EXISTS escrow_deals (
+            deal_id TEXT PRIMARY KEY,
+            buyer_id INTEGER NOT NULL,
+            seller_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            status TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT
+        )''',
+    'stores': '''
+        CREATE TABLE IF NOT EXISTS stores (
+            store_id TEXT PRIMARY KEY,
+            owner_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''',
+    'store_items': '''
+        CREATE TABLE IF NOT EXISTS store_items (
+            item_id TEXT PRIMARY KEY,
+            store_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            description TEXT,
+            content TEXT,
+            status TEXT NOT NULL DEFAULT 'ACTIVE',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''',
+    'elections': '''
+        CREATE TABLE IF NOT EXISTS elections (
+            election_id TEXT PRIMARY KEY,
+            chat_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            status TEXT NOT NULL,
+            end_time TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''',
+    'candidates': '''
+        CREATE TABLE IF NOT EXISTS candidates (
+            candidate_id TEXT PRIMARY KEY,
+            election_id TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            manifesto TEXT,
+            votes INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''',
+    'votes': '''
+        CREATE TABLE IF NOT EXISTS votes (
+            vote_id TEXT PRIMARY KEY,
+            election_id TEXT NOT NULL,
+            voter_id INTEGER NOT NULL,
+            candidate_id TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''',
+    'identities': '''
+        CREATE TABLE IF NOT EXISTS identities (
+            user_id INTEGER PRIMARY KEY,
+            custom_id TEXT UNIQUE,
+            bio TEXT,
+            business_name TEXT,
+            updated_at TEXT
+        )'''
+}
+
+# Document tables: JSON body plus columns mirrored from the document so SQL
+# callers can join/filter on them (e.g. users.username, users.first_name)
+DOCUMENT_TABLES = {
+    'users': ['user_id', 'username', 'first_name'],
+    'user_tasks': ['user_id', 'chat_id', 'task_name']
+}
+
+FILTER_OPERATORS = {
+    '$eq': '=',
+    '$ne': '!=',
+    '$lt': '<',
+    '$lte': '<=',
+    '$gt': '>',
+    '$gte': '>='
+}
+
+def sqlite_path_from_url(url: str) -> str:
+    """Converts sqlite:///relative.db or sqlite:////abs/path.db to a file path."""
+    path = url.split('://', 1)[1] if '://' in url else url
+    if path.startswith('/'):
+        path = path[1:]
+    return path or ':memory:'
+
+def _check_field(field: str) -> str:
+    """Field names end up inside SQL, so only allow plain identifiers."""
+    if not field.replace('_', '').replace('.', '').isalnum():
+        raise ValueError(f"Invalid field name: {field}")
+    return field
+
+class SQLiteConnectionPool:
+    """Fixed-size pool of SQLite connections shared across threads."""
+
+    def __init__(self, path: str, max_connections: int):
+        self.path = path
+        self.max_connections = max_connections
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._uri = False
+        if path == ':memory:':
+            # Shared-cache memory DB so every pooled connection sees the same data
+            self.path = f"file:ultimate_bot_{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._uri = True
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            uri=self._uri,
+            timeout=SQLITE_CONFIG["busy_timeout"] / 1000,
+            check_same_thread=False,
+            cached_statements=SQLITE_CONFIG["cached_statements"]
+        )
+        conn.execute(f"PRAGMA journal_mode={SQLITE_CONFIG['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous={SQLITE_CONFIG['synchronous']}")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_CONFIG['busy_timeout']}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def acquire(self, timeout: float) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_connections:
+                self._created += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._created -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Timed out waiting for a free SQLite connection")
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class PooledConnection:
+    """`with db.connect() as conn:` handle; borrows a pooled connection on enter.
+
+    Commits on a clean exit and rolls back on an exception, then returns the
+    connection to the pool.
+    """
+
+    def __init__(self, database: 'SQLiteDatabase', record: bool = True):
+        self._database = database
+        self._record = record
+        self._conn = None
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn = self._database.pool.acquire(self._database._acquire_timeout)
+        self._started = time.perf_counter()
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self._database.pool.release(self._conn)
+            self._conn = None
+            if self._record:
+                db_metrics.record('sql', 'transaction', time.perf_counter() - self._started, ok=exc_type is None)
+        return False
+
+class SQLiteCollection:
+    """Minimal document-collection API (find_one/find/insert_one/update_one) over a table."""
+
+    def __init__(self, database: 'SQLiteDatabase', name: str):
+        self.database = database
+        self.name = _check_field(name)
+        self.is_document = name not in SCHEMA
+        self.mirrored = DOCUMENT_TABLES.get(name, [])
+        self.columns = self._load_columns()
+
+    def _load_columns(self) -> List[str]:
+        with self.database._connection() as conn:
+            if self.is_document:
+                conn.execute(_document_table_sql(self.name, self.mirrored))
+            rows = conn.execute(f"PRAGMA table_info({self.name})").fetchall()
+        return [row[1] for row in rows]
+
+    # --- SQL helpers ---
+    def _column(self, field: str) -> str:
+        field = _check_field(field)
+        if not self.is_document:
+            if field not in self.columns:
+                raise ValueError(f"Unknown column {field} on {self.name}")
+            return field
+        if field == '_id' or field in self.mirrored:
+            return f'"{field}"'
+        return f"json_extract(doc, '$.{field}')"
+
+    def _where(self, filter: Optional[Dict]):
+        clauses, params = [], []
+        for field, condition in (filter or {}).items():
+            column = self._column(field)
+            if isinstance(condition, dict):
+                for op, value in condition.items():
+                    if op in ('$in', '$nin'):
+                        values = list(value)
+                        if not values:
+                            clauses.append('0' if op == '$in' else '1')
+                            continue
+                        placeholders = ', '.join('?' for _ in values)
+                        keyword = 'IN' if op == '$in' else 'NOT IN'
+                        clauses.append(f"{column} {keyword} ({placeholders})")
+                        params.extend(values)
+                    elif op in FILTER_OPERATORS:
+                        clauses.append(f"{column} {FILTER_OPERATORS[op]} ?")
+                        params.append(value)
+                    else:
+                        raise ValueError(f"Unsupported filter operator {op}")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(condition)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _to_document(self, row) -> Dict:
+        if self.is_document:
+            document = json.loads(row[-1])
+            document['_id'] = row[0]
+            return document
+        return dict(zip(self.columns, row))
+
+    def _select(self) -> str:
+        if self.is_document:
+            return f'SELECT "_id", doc FROM {self.name}'
+        return f"SELECT {', '.join(self.columns)} FROM {self.name}"
+
+    @staticmethod
+    def _project(document: Dict, projection) -> Dict:
+        if not projection:
+            return document
+        fields = [f for f, keep in projection.items() if keep] if isinstance(projection, dict) else list(projection)
+        projected = {f: document[f] for f in fields if f in document}
+        if '_id' in document:
+            projected.setdefault('_id', document['_id'])
+        return projected
+
+    def _write_document(self, conn, document: Dict, insert: bool):
+        doc_id = document.get('_id')
+        body = {k: v for k, v in document.items() if k != '_id'}
+        mirrored = [body.get(column) for column in self.mirrored]
+        if 'user_id' in self.mirrored and body.get('user_id') is None and self.name == 'users':
+            mirrored[self.mirrored.index('user_id')] = doc_id
+        columns = ['"_id"'] + [f'"{c}"' for c in self.mirrored] + ['doc']
+        values = [doc_id] + mirrored + [json.dumps(body, default=str)]
+        if insert:
+            sql = f"INSERT INTO {self.name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+            conn.execute(sql, values)
+        else:
+            assignments = ', '.join(f"{c} = ?" for c in columns[1:])
+            conn.execute(f'UPDATE {self.name} SET {assignments} WHERE "_id" = ?', values[1:] + [doc_id])
+
+    # --- Collection API ---
+    def find_one(self, filter: Optional[Dict] = None, projection=None) -> Optional[Dict]:
+        where, params = self._where(filter)
+        with self.database._connection() as conn:
+            row = conn.execute(f"{self._select()}{where} LIMIT 1", params).fetchone()
+        return self._project(self._to_document(row), projection) if row else None
+
+    def find(self, filter: Optional[Dict] = None, projection=None, limit: int = None, skip: int = None):
+        """Lazily yields matching documents, reading one page of rows per query.
+
+        Pages are keyed on rowid, so a pooled connection is only borrowed
+        while a page is fetched, not for the lifetime of the cursor.
+        """
+        where, params = self._where(filter)
+        where = f"{where} AND rowid > ?" if where else " WHERE rowid > ?"
+        sql = f"{self._select().replace('SELECT ', 'SELECT rowid, ', 1)}{where} ORDER BY rowid LIMIT ?"
+        page_size = CURSOR_CONFIG["page_size"]
+        remaining = limit if limit is not None else -1
+        to_skip = skip or 0
+        last_rowid = 0
+        while remaining != 0:
+            with self.database._connection() as conn:
+                rows = conn.execute(sql, params + [last_rowid, page_size]).fetchall()
+            for row in rows:
+                if to_skip:
+                    to_skip -= 1
+                    continue
+                yield self._project(self._to_document(row[1:]), projection)
+                remaining -= 1
+                if remaining == 0:
+                    return
+            if len(rows) < page_size:
+                return
+            last_rowid = rows[-1][0]
+
+    def insert_one(self, document: Dict):
+        document = dict(document)
+        with self.database._connection() as conn:
+            if self.is_document:
+                document.setdefault('_id', uuid.uuid4().hex)
+                self._write_document(conn, document, insert=True)
+                return SimpleNamespace(inserted_id=document['_id'])
+            fields = [f for f in document if f in self.columns]
+            conn.execute(
+                f"INSERT INTO {self.name} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})",
+                [document[f] for f in fields]
+            )
+            return SimpleNamespace(inserted_id=document.get(self.columns[0]))
+
+    def update_one(self, filter: Dict, update: Dict, upsert: bool = False):
+        with self.database._connection() as conn:
+            return self._update(conn, filter, update, upsert)
+
+    def upsert_many(self, updates: List[Tuple[Dict, Dict]]):
+        """Applies (filter, update) upserts in one transaction: one commit for the batch."""
+        with self.database._connection() as conn:
+            for filter, update in updates:
+                self._update(conn, filter, update, upsert=True)
+
+    def _update(self, conn, filter: Dict, update: Dict, upsert: bool):
+        changes = dict(update.get('$set', {}))
+        increments = update.get('$inc', {})
+        where, params = self._where(filter)
+        if self.is_document:
+            row = conn.execute(f"{self._select()}{where} LIMIT 1", params).fetchone()
+            if row:
+                document = self._to_document(row)
+                for field, amount in increments.items():
+                    document[field] = document.get(field, 0) + amount
+                document.update(changes)
+                self._write_document(conn, document, insert=False)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+            if not upsert:
+                return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+            document = {k: v for k, v in filter.items() if not isinstance(v, dict)}
+            document.update(increments)
+            document.update(changes)
+            document.setdefault('_id', uuid.uuid4().hex)
+            self._write_document(conn, document, insert=True)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=document['_id'])
+
+        assignments = [f"{self._column(f)} = ?" for f in changes]
+        values = list(changes.values())
+        for field, amount in increments.items():
+            column = self._column(field)
+            assignments.append(f"{column} = COALESCE({column}, 0) + ?")
+            values.append(amount)
+        cursor = conn.execute(
+            f"UPDATE {self.name} SET {', '.join(assignments)} "
+            f"WHERE rowid = (SELECT rowid FROM {self.name}{where} LIMIT 1)",
+            values + params
+        )
+        if cursor.rowcount or not upsert:
+            return SimpleNamespace(matched_count=cursor.rowcount, modified_count=cursor.rowcount, upserted_id=None)
+        document = {k: v for k, v in filter.items() if not isinstance(v, dict)}
+        document.update(increments)
+        document.update(changes)
+        fields = [f for f in document if f in self.columns]
+        conn.execute(
+            f"INSERT INTO {self.name} ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})",
+            [document[f] for f in fields]
+        )
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=document.get(self.columns[0]))
+
+    def count_documents(self, filter: Optional[Dict] = None, upper_bound: int = None) -> int:
+        where, params = self._where(filter)
+        with self.database._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.name}{where}", params).fetchone()[0]
+
+def _document_table_sql(name: str, mirrored: List[str]) -> str:
+    columns = ''.join(f',\n            "{c}"' for c in mirrored)
+    return f'''
+        CREATE TABLE IF NOT EXISTS {name} (
+            "_id" PRIMARY KEY{columns},
+            doc TEXT NOT NULL
+        )'''
+
+class SQLiteDatabase(Database):
+    """Local storage backend with the same interface as the Astra Database.
+
+    Besides the collection-style API used by get_user()/update_user(), the
+    SQL callers get a pooled connection from `with db.connect() as conn:`.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.pool = SQLiteConnectionPool(path, DATABASE_POOL["max_connections"])
+
+    def connect(self):
+        """Bootstraps the schema once and returns a pooled connection handle.
+
+        The handle only borrows a connection when used in a `with` block, so
+        the plain `db.connect()` bootstrap call does not hold one open.
+        """
+        if not self.db:
+            with self._connect_lock:
+                if not self.db:
+                    try:
+                        self.setup_collections()
+                        self.db = self.pool
+                        print(f"✅ SQLite storage ready at {self.path}.")
+                    except Exception as e:
+                        print(f"❌ Failed to open SQLite storage: {e}")
+                        raise
+        return PooledConnection(self)
+
+    def _connection(self) -> PooledConnection:
+        """Pooled connection for the collection shim (timed by connection_slot instead)."""
+        return PooledConnection(self, record=False)
+
+    @contextmanager
+    def connection_slot(self, collection='-', operation='call'):
+        # The connection pool already bounds concurrency; just time the call
+        with db_metrics.track(collection, operation):
+            yield
+
+    def pool_status(self):
+        idle = self.pool._idle.qsize()
+        return {
+            'in_use': self.pool._created - idle,
+            'max_connections': self.pool.max_connections,
+            'circuit': self.breaker.state,
+            'outbox_pending': self.outbox.pending()
+        }
+
+    def get_collection(self, collection_name):
+        """Gets a collection-style view of a table (handles are cached)."""
+        if not self.db:
+            print("Not connected to database.")
+            return None
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            collection = SQLiteCollection(self, collection_name)
+            self._collections[collection_name] = collection
+        return collection
+
+    def setup_collections(self):
+        """Creates the relational and document tables."""
+        conn = self.pool.acquire(self._acquire_timeout)
+        try:
+            for ddl in SCHEMA.values():
+                conn.execute(ddl)
+            for name, mirrored in DOCUMENT_TABLES.items():
+                conn.execute(_document_table_sql(name, mirrored))
+            conn.commit()
+        finally:
+            self.pool.release(conn)
+        print(f"[DB] SQLite schema ready ({len(SCHEMA) + len(DOCUMENT_TABLES)} tables).")
+
+    def close(self):
+        super().close()
+        self.pool.close()
@@ -8,7 +8,10 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from store_system import store_system
-from database import Database
+from database import get_database
+
+# Shared database service (SQL lookups on the users table)
+db = get_database()
 
 class StoreCommands:
     """Handler for store related commands"""
@@ -6,8 +6,9 @@ Author: Nikhil Mehra (NikkuAi09)
 
 import logging
 import uuid
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from database import Database
+from database import get_database
 from payment_system import payment_system
 
 # Configure logging
@@ -18,9 +19,8 @@ class StoreSystem:
     """Manages user stores and items"""
     
     def __init__(self):
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     def create_store(self, user_id: int, name: str, description: str) -> Tuple[bool, str]:
         """Create a new store for user"""
@@ -51,7 +51,7 @@ class StoreSystem:
     def add_item(self, user_id: int, name: str, price: float, description: str, content: str = None) -> Tuple[bool, str]:
         """Add item to user's store"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Get store ID
@@ -78,7 +78,7 @@ class StoreSystem:
     def get_store(self, user_id: int) -> Optional[Dict]:
         """Get user's store details"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM stores WHERE owner_id = ?', (user_id,))
                 row = cursor.fetchone()
@@ -99,7 +99,7 @@ class StoreSystem:
     def get_store_items(self, store_id: str) -> List[Dict]:
         """Get all active items in a store"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM store_items WHERE store_id = ? AND status = "ACTIVE"', (store_id,))
                 rows = cursor.fetchall()
@@ -122,7 +122,7 @@ class StoreSystem:
     def buy_item(self, buyer_id: int, item_id: str) -> Tuple[bool, str, Optional[str]]:
         """Buy an item from a store"""
         try:
-            with db.connect() as conn:
+            with self.db.connect() as conn:
                 cursor = conn.cursor()
                 
                 # Get item details
@@ -13,7 +13,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from config import TASK_LIST, EXP_THRESHOLDS, EXP_PER_MESSAGE, EXP_PER_COMMAND
-from database import Database
+from database import get_database, get_async_database
 
 class TaskSystem:
     """Manages the task system and EXP rewards"""
@@ -27,9 +27,9 @@ class TaskSystem:
             'streak': 2.0    # Streak bonus
         }
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service (async facade keeps task updates off the event loop)
+        self.db = get_database()
+        self.adb = get_async_database()
     
     async def process_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Process message for task updates"""
@@ -92,13 +92,13 @@ class TaskSystem:
         task = TASK_LIST[task_name]
         
         # Get current progress
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         # Update progress
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         # Check if completed
         if new_progress >= task['target']:
@@ -109,12 +109,12 @@ class TaskSystem:
         task_name = "media_master"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -124,12 +124,12 @@ class TaskSystem:
         task_name = "sticker_lover"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -139,12 +139,12 @@ class TaskSystem:
         task_name = "gif_master"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -154,12 +154,12 @@ class TaskSystem:
         task_name = "voice_chat"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -169,12 +169,12 @@ class TaskSystem:
         task_name = "file_sender"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -193,12 +193,12 @@ class TaskSystem:
         task_name = "emoji_king"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + len(emojis)
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -217,12 +217,12 @@ class TaskSystem:
         task_name = "mention_master"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + mention_count
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -240,12 +240,12 @@ class TaskSystem:
         task_name = "hashtag_king"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + len(hashtags)
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -264,12 +264,12 @@ class TaskSystem:
         task_name = "link_sharer"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + url_count
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -283,12 +283,12 @@ class TaskSystem:
             task_name = "night_owl"
             task = TASK_LIST[task_name]
             
-            user_tasks = db.get_user_tasks(user_id, chat_id)
+            user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
             current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
             current_progress = current_task['progress'] if current_task else 0
             
             new_progress = current_progress + 1
-            db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+            await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
             
             if new_progress >= task['target']:
                 await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -298,12 +298,12 @@ class TaskSystem:
             task_name = "early_bird"
             task = TASK_LIST[task_name]
             
-            user_tasks = db.get_user_tasks(user_id, chat_id)
+            user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
             current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
             current_progress = current_task['progress'] if current_task else 0
             
             new_progress = current_progress + 1
-            db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+            await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
             
             if new_progress >= task['target']:
                 await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -313,7 +313,7 @@ class TaskSystem:
         today = datetime.now().date()
         
         # Get last activity date
-        user = db.get_or_create_user(user_id)
+        user = await self.adb.get_or_create_user(user_id)
         last_active_str = user.get('last_active', '')
         
         if last_active_str:
@@ -347,12 +347,12 @@ class TaskSystem:
         task_name = "command_king"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -362,12 +362,12 @@ class TaskSystem:
         task_name = "ai_chat"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -377,12 +377,12 @@ class TaskSystem:
         task_name = "roast_master"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -392,12 +392,12 @@ class TaskSystem:
         task_name = "truth_teller"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -407,12 +407,12 @@ class TaskSystem:
         task_name = "dare_devil"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
@@ -422,19 +422,19 @@ class TaskSystem:
         task_name = "game_champion"
         task = TASK_LIST[task_name]
         
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         current_task = next((t for t in user_tasks if t['task_name'] == task_name), None)
         current_progress = current_task['progress'] if current_task else 0
         
         new_progress = current_progress + 1
-        db.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
+        await self.adb.create_or_update_task(user_id, chat_id, task_name, new_progress, task['target'])
         
         if new_progress >= task['target']:
             await self._award_exp(user_id, chat_id, task['exp_reward'], task_name)
     
     async def _check_task_completion(self, user_id: int, chat_id: int):
         """Check for completed tasks and award EXP"""
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         
         for task in user_tasks:
             if not task['completed'] and task['progress'] >= task['target']:
@@ -449,7 +449,7 @@ class TaskSystem:
         final_exp = await self._apply_exp_multipliers(user_id, chat_id, exp_amount)
         
         # Update user EXP
-        db.update_user_exp(user_id, final_exp)
+        await self.adb.update_user_exp(user_id, final_exp)
         
         # Check for admin promotion
         await self._check_admin_promotion(user_id, chat_id)
@@ -477,11 +477,11 @@ class TaskSystem:
     
     async def _check_admin_promotion(self, user_id: int, chat_id: int):
         """Check if user should be promoted to admin"""
-        user = db.get_or_create_user(user_id)
+        user = await self.adb.get_or_create_user(user_id)
         current_exp = user.get('exp', 0)
         
         # Get group settings
-        settings = db.get_group_settings(chat_id)
+        settings = await self.adb.get_group_settings(chat_id)
         
         if not settings.get('task_system_active', False):
             return
@@ -505,7 +505,7 @@ class TaskSystem:
     async def _promote_to_temp_admin(self, user_id: int, chat_id: int, duration_minutes: int, threshold: int):
         """Promote user to temporary admin"""
         # Update user record
-        user = db.get_or_create_user(user_id)
+        user = await self.adb.get_or_create_user(user_id)
         user['is_temp_admin'] = True
         user['admin_start_time'] = datetime.now().isoformat()
         user['admin_duration_minutes'] = duration_minutes
@@ -520,7 +520,7 @@ class TaskSystem:
     
     async def get_user_task_summary(self, user_id: int, chat_id: int) -> Dict[str, Any]:
         """Get user's task summary"""
-        user_tasks = db.get_user_tasks(user_id, chat_id)
+        user_tasks = await self.adb.get_user_tasks(user_id, chat_id)
         completed_tasks = [t for t in user_tasks if t['completed']]
         in_progress_tasks = [t for t in user_tasks if not t['completed']]
         
@@ -534,7 +534,7 @@ class TaskSystem:
     
     async def get_leaderboard(self, chat_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get EXP leaderboard"""
-        top_users = db.get_top_users(chat_id, limit, 'exp')
+        top_users = await self.adb.get_top_users(chat_id, limit, 'exp')
         
         leaderboard = []
         for i, user in enumerate(top_users, 1):
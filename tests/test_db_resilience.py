@@ -0,0 +1,34 @@
+"""Which failures count as transient (trip the breaker, go to the outbox)."""
+
+import httpx
+import pytest
+
+from db_resilience import CircuitOpenError, is_transient
+
+REQUEST = httpx.Request('POST', 'https://example.invalid')
+
+
+@pytest.mark.parametrize('exc', [
+    CircuitOpenError('open'),
+    TimeoutError(),
+    ConnectionRefusedError(),
+    ConnectionResetError(),
+    httpx.ConnectError('refused', request=REQUEST),
+    httpx.ReadTimeout('slow', request=REQUEST),
+    httpx.RemoteProtocolError('dropped', request=REQUEST),
+    type('DataAPITimeoutException', (Exception,), {})(),
+])
+def test_transient(exc):
+    assert is_transient(exc)
+
+
+@pytest.mark.parametrize('exc', [
+    httpx.HTTPStatusError('bad request', request=REQUEST, response=httpx.Response(400, request=REQUEST)),
+    PermissionError(),
+    FileNotFoundError(),
+    OSError(),
+    ValueError(),
+    KeyError('users'),
+])
+def test_not_transient(exc):
+    assert not is_transient(exc)
@@ -0,0 +1,108 @@
+"""KeywordMatcher must give the same answers as the ordered re.search loops
+smart_detection used before the patterns were combined."""
+
+import ast
+import os
+import re
+
+import pytest
+
+import bot_launcher
+from keyword_matcher import KeywordMatcher
+
+
+def smart_detection_tables():
+    """The literal pattern tables handed to KeywordMatcher in smart_detection
+    (read from the source, so the DB-backed command modules aren't imported)."""
+    path = os.path.join(os.path.dirname(bot_launcher.__file__), 'smart_detection.py')
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    tables = {}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)
+                and getattr(node.value.func, 'id', None) == 'KeywordMatcher'):
+            try:
+                tables[node.targets[0].attr] = ast.literal_eval(node.value.args[0])
+            except ValueError:
+                pass  # built by a comprehension
+    return tables
+
+
+TABLES = smart_detection_tables()
+MATCHERS = {name: KeywordMatcher(table) for name, table in TABLES.items()}
+
+
+def ordered_search(table, text):
+    """The baseline: try every pattern in order, first match wins."""
+    for intent, patterns in table:
+        for pattern in patterns:
+            m = re.search(pattern, text.lower())
+            if m:
+                return intent, m.groups()
+    return None
+
+
+def ordered_intents(table, text):
+    return [intent for intent, patterns in table
+            if any(re.search(pattern, text.lower()) for pattern in patterns)]
+
+
+PHRASES = [
+    "warn @a mute @b 1h",
+    "mute @b 1h then ban @a",
+    "please kick 12345",
+    "unmute @spammer",
+    "admin hatade @bob",
+    "promote hatade @bob",
+    "dekh @x spam mat kar ban @y",
+    "pin this and delete this",
+    "weather delhi",
+    "search weather mumbai",
+    "what time is it, calc 2+2",
+    "kitni date hai aaj, current time",
+    "help with rules and stats please",
+    "ping speed info",
+    "truth bata ya dare kar",
+    "roll karo, coin flip",
+    "joke bata game khelo",
+    "nothing to see here",
+    "",
+]
+
+
+@pytest.mark.parametrize('name', ['admin_matcher', 'utility_matcher', 'fun_matcher'])
+@pytest.mark.parametrize('text', PHRASES)
+def test_match_follows_pattern_order(name, text):
+    hit = MATCHERS[name].match(text)
+    assert ((hit.intent, hit.args) if hit else None) == ordered_search(TABLES[name], text)
+
+
+@pytest.mark.parametrize('name', ['admin_matcher', 'utility_matcher', 'info_matcher', 'fun_matcher'])
+@pytest.mark.parametrize('text', PHRASES)
+def test_intents_include_overlapping_matches(name, text):
+    assert MATCHERS[name].intents(text) == ordered_intents(TABLES[name], text)
+
+
+def test_pinned_results():
+    admin = MATCHERS['admin_matcher']
+    # "warn @a mute @b 1h" has the earlier-listed mute pattern inside the warn match
+    assert admin.match("warn @a mute @b 1h")[:2] == ('mute', ('@b', '1h'))
+    assert admin.match("dekh @x spam mat kar ban @y")[:2] == ('ban', ('@y',))
+    assert admin.match("admin hatade @bob")[:2] == ('demote', ('@bob',))
+    assert MATCHERS['utility_matcher'].match("search weather mumbai")[:2] == ('weather', ('mumbai',))
+    assert MATCHERS['info_matcher'].intents("ping speed info") == ['stats', 'ping']
+    assert MATCHERS['fun_matcher'].match("joke bata game khelo").intent == 'game'
+    assert admin.match("nothing to see here") is None
+
+
+@pytest.mark.parametrize('text, intent', [
+    ("hiii", "greeting"),
+    ("Hello there", "greeting"),
+    ("helpful", "help"),
+    ("any games?", "game"),
+    ("said", "ai"),
+    ("ok", None),
+])
+def test_hints_match_substrings(text, intent):
+    hit = bot_launcher.HINT_MATCHER.match(text)
+    assert (hit and hit.intent) == intent
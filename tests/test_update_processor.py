@@ -0,0 +1,71 @@
+"""Tests for ChatOrderedUpdateProcessor (update_processor.py)."""
+
+import asyncio
+from types import SimpleNamespace
+
+from update_processor import ChatOrderedUpdateProcessor
+
+def make_update(chat_id):
+    return SimpleNamespace(effective_chat=SimpleNamespace(id=chat_id), effective_user=None)
+
+def test_flooded_chat_does_not_block_other_chats():
+    async def scenario():
+        processor = ChatOrderedUpdateProcessor(2)
+        release = asyncio.Event()
+        done = []
+
+        async def handle(name, wait=False):
+            if wait:
+                await release.wait()
+            done.append(name)
+
+        flood = [
+            asyncio.create_task(processor.process_update(make_update(1), handle(f"a{i}", wait=True)))
+            for i in range(10)
+        ]
+        other = asyncio.create_task(processor.process_update(make_update(2), handle("b")))
+        try:
+            await asyncio.wait_for(other, timeout=1)
+        finally:
+            release.set()
+            await asyncio.gather(*flood)
+        return done
+
+    done = asyncio.run(scenario())
+    assert done[0] == "b"
+    assert done[1:] == [f"a{i}" for i in range(10)]
+
+def test_updates_in_one_chat_keep_arrival_order():
+    async def scenario():
+        processor = ChatOrderedUpdateProcessor(4)
+        done = []
+
+        async def handle(i):
+            # Earlier updates take longer, so any overlap would reorder them
+            await asyncio.sleep((5 - i) * 0.01)
+            done.append(i)
+
+        await asyncio.gather(*(processor.process_update(make_update(7), handle(i)) for i in range(5)))
+        return done, processor.get_status()
+
+    done, status = asyncio.run(scenario())
+    assert done == list(range(5))
+    assert status['busy_chats'] == 0
+
+def test_limit_applies_across_chats():
+    async def scenario():
+        processor = ChatOrderedUpdateProcessor(2)
+        peak = 0
+
+        async def handle():
+            nonlocal peak
+            peak = max(peak, processor.current_concurrent_updates)
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(processor.process_update(make_update(chat_id), handle()) for chat_id in range(6)))
+        return peak, processor
+
+    peak, processor = asyncio.run(scenario())
+    assert peak == 2
+    assert processor.max_concurrent_updates == 2
+    assert processor.current_concurrent_updates == 0
@@ -0,0 +1,59 @@
+"""Tests for the read-through user cache in database.py."""
+
+import database
+from database import Database, UserCache
+
+class FakeUsers:
+    """In-memory 'users' collection; on_find runs while a find_one is in flight."""
+
+    def __init__(self):
+        self.docs = {}
+        self.on_find = None
+
+    def find_one(self, filter, projection=None):
+        doc = self.docs.get(filter['_id'])
+        snapshot = dict(doc) if doc else None
+        if self.on_find:
+            hook, self.on_find = self.on_find, None
+            hook()
+        return snapshot
+
+    def update_one(self, filter, update, upsert=False):
+        self.docs.setdefault(filter['_id'], {'_id': filter['_id']}).update(update['$set'])
+
+def make_db(monkeypatch, tmp_path):
+    monkeypatch.setitem(database.RESILIENCE_CONFIG, 'outbox_path', str(tmp_path / 'outbox.jsonl'))
+    monkeypatch.setitem(database.WRITE_BEHIND_CONFIG, 'enabled', False)
+    db = Database()
+    users = FakeUsers()
+    db.db = object()
+    db._collections['users'] = users
+    return db, users
+
+def test_update_during_read_is_not_overwritten_by_stale_cache(monkeypatch, tmp_path):
+    db, users = make_db(monkeypatch, tmp_path)
+    users.docs[1] = {'_id': 1, 'points': 10}
+
+    # The update lands while get_user's find_one is still in flight
+    users.on_find = lambda: db.update_user(1, {'points': 20})
+    assert db.get_user(1)['points'] == 10
+
+    assert db.get_user(1)['points'] == 20
+
+def test_put_skipped_only_for_keys_written_after_token():
+    cache = UserCache(max_entries=2, ttl=60)
+    token = cache.read_token()
+    cache.invalidate('a')
+    cache.put('a', {'v': 1}, token)
+    cache.put('b', {'v': 2}, token)
+    assert cache.get('a') is None
+    assert cache.get('b') == {'v': 2}
+
+def test_put_skipped_when_write_history_was_trimmed():
+    cache = UserCache(max_entries=2, ttl=60)
+    token = cache.read_token()
+    for key in ('a', 'b', 'c'):
+        cache.note_write(key)
+    # 'a' fell out of the bounded write history, so its freshness is unknown
+    cache.put('a', {'v': 1}, token)
+    assert cache.get('a') is None
@@ -0,0 +1,32 @@
+"""Write-behind flushes of buffered user updates."""
+
+from sqlite_backend import SQLiteDatabase
+
+
+def test_sqlite_flush_is_one_bulk_upsert(tmp_path, monkeypatch):
+    db = SQLiteDatabase(str(tmp_path / 'bot.db'))
+    db.connect()
+    users = db.get_collection('users')
+    calls = []
+    bulk = users.upsert_many
+    monkeypatch.setattr(users, 'upsert_many', lambda updates: calls.append(len(updates)) or bulk(updates))
+    monkeypatch.setattr(users, 'update_one', lambda *args, **kwargs: calls.append('update_one'))
+
+    assert db._flush_user_updates({1: {'exp': 10}, 2: {'exp': 20}, 3: {'exp': 30, 'level': 2}}) == {}
+    assert calls == [3]
+    assert {u['_id']: u['exp'] for u in db.iter_documents('users')} == {1: 10, 2: 20, 3: 30}
+    db.close()
+
+
+def test_failed_bulk_flush_falls_back_to_per_user_upserts(tmp_path, monkeypatch):
+    db = SQLiteDatabase(str(tmp_path / 'bot.db'))
+    db.connect()
+    users = db.get_collection('users')
+
+    def fail(updates):
+        raise ValueError("bad batch")
+
+    monkeypatch.setattr(users, 'upsert_many', fail)
+    assert db._flush_user_updates({1: {'exp': 10}, 2: {'exp': 20}}) == {}
+    assert {u['_id']: u['exp'] for u in db.iter_documents('users')} == {1: 10, 2: 20}
+    db.close()
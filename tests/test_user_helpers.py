@@ -0,0 +1,49 @@
+"""EXP, stats and AI memory helpers used by task_system and ai_handler."""
+
+import asyncio
+
+from database import AsyncDatabase
+from sqlite_backend import SQLiteDatabase
+
+
+def make_db(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'bot.db'))
+    db.connect()
+    return db
+
+
+def test_exp_and_stats_accumulate(tmp_path):
+    db = make_db(tmp_path)
+    assert db.get_or_create_user(5)['exp'] == 0
+    assert db.update_user_exp(5, 30) == 30
+    assert db.update_user_exp(5, 12) == 42
+    db.update_user_stats(5, commands=1)
+    db.update_user_stats(5, commands=1)
+    user = db.get_user(5)
+    assert (user['exp'], user['commands']) == (42, 2)
+    db.close()
+
+
+def test_top_users_by_exp(tmp_path):
+    db = make_db(tmp_path)
+    for user_id, exp in [(1, 10), (2, 50), (3, 30)]:
+        db.update_user_exp(user_id, exp)
+    db.close()  # flushes buffered user writes
+    db = make_db(tmp_path)
+    assert [u['user_id'] for u in db.get_top_users(None, 2)] == [2, 3]
+    db.close()
+
+
+def test_user_memory_round_trip_through_async_facade(tmp_path):
+    adb = AsyncDatabase(make_db(tmp_path), max_workers=1)
+
+    async def scenario():
+        assert await adb.get_user_memory(5, 9) == {}
+        memory = {'history': [{'role': 'user', 'content': 'hi'}], 'model': 'm'}
+        await adb.save_user_memory(5, 9, memory, 'summary')
+        return await adb.get_user_memory(5, 9)
+
+    memory = asyncio.run(scenario())
+    assert (memory['history'], memory['model'], memory['summary']) == ([{'role': 'user', 'content': 'hi'}], 'm', 'summary')
+    assert asyncio.run(adb.get_group_settings(1)) == {}
+    adb.db.close()
@@ -18,7 +18,7 @@ from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
 from config import OPENWEATHER_API_KEY
-from database import Database
+from database import get_database
 
 class UtilityCommands:
     """Handles all utility commands"""
@@ -28,9 +28,8 @@ class UtilityCommands:
         self.search_cache = {}
         self.cache_timeout = 300  # 5 minutes
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
     
     async def calc_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Calculate mathematical expressions"""
@@ -6,19 +6,20 @@ Author: Nikhil Mehra (NikkuAi09)
 """
 
 import os
-import json
 import asyncio
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, session
 from flask_socketio import SocketIO, emit
 from typing import Dict, List, Any, Optional
 import threading
 import time
 
 from config import WEB_HOST, WEB_PORT, FLASK_SECRET_KEY
-from config import WEB_HOST, WEB_PORT, FLASK_SECRET_KEY
-from database import Database
+from config import BACKUP_CONFIG, METRICS_CONFIG
+from database import get_database
+from metrics import db_metrics, update_metrics
 from payment_system import payment_system
+from prometheus_exporter import prometheus_exporter, CONTENT_TYPE
 
 class WebDashboard:
     """Web dashboard for bot monitoring and control"""
@@ -28,9 +29,8 @@ class WebDashboard:
         self.app.secret_key = FLASK_SECRET_KEY or 'dev-secret-key'
         self.socketio = SocketIO(self.app, cors_allowed_origins="*")
         
-        # Initialize Astra DB
-        self.db = Database()
-        self.db.connect()
+        # Shared Astra DB service
+        self.db = get_database()
         
         self.bot_stats = {
             'start_time': datetime.now(),
@@ -80,6 +80,11 @@ class WebDashboard:
             session.clear()
             return redirect(url_for('login'))
         
+        @self.app.route(METRICS_CONFIG["path"])
+        def metrics():
+            """Prometheus scrape endpoint (no login, served from cached counters)"""
+            return Response(prometheus_exporter.render(), content_type=CONTENT_TYPE)
+        
         @self.app.route('/api/stats')
         def api_stats():
             """Get bot statistics"""
@@ -109,7 +114,10 @@ class WebDashboard:
             if chat_id:
                 users = db.get_top_users(chat_id, limit, 'exp')
             else:
-                users = db.get_all_users(limit)
+                # First page only: bounded by the connection pool and timed like other DB calls
+                users = next(self.db.iter_pages(
+                    'users', projection={'username': True, 'first_name': True, 'last_active': True}, page_size=limit
+                ), [])
             
             return jsonify({'users': users})
         
@@ -176,7 +184,7 @@ class WebDashboard:
             # In real system, this would trigger bank transfer
             # Here we just mark as completed in DB
             try:
-                with db.connect() as conn:
+                with self.db.connect() as conn:
                     cursor = conn.cursor()
                     cursor.execute("UPDATE transactions SET status = 'COMPLETED' WHERE transaction_id = ?", (tx_id,))
                     conn.commit()
@@ -343,6 +351,7 @@ class WebDashboard:
             'memory_usage': self._get_memory_usage(),
             'cpu_usage': self._get_cpu_usage(),
             'database_stats': self._get_database_stats(),
+            'update_latency': self._get_update_latency(),
             'last_update': now.isoformat()
         }
         
@@ -373,39 +382,44 @@ class WebDashboard:
     
     def _get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
-        try:
-            stats = db.get_database_stats()
-            return {
-                'tables': len(stats),
-                'total_records': sum(stats.values()) if stats else 0,
-                'details': stats
+        return {
+            'overall': db_metrics.overall(),
+            'by_collection': db_metrics.summary('collection'),
+            'by_operation': db_metrics.summary('operation'),
+            'by_handler': db_metrics.summary('handler'),
+            'pool': self.db.pool_status(),
+            'user_cache': self.db.user_cache.stats()
+        }
+    
+    def _get_update_latency(self) -> Dict[str, Any]:
+        """Get update handling latency by window and handler"""
+        return {
+            window: {
+                'overall': update_metrics.overall(window),
+                'by_handler': update_metrics.summary(window)
             }
-        except:
-            return {'tables': 0, 'total_records': 0, 'details': {}}
+            for window in update_metrics.WINDOWS
+        }
     
     def _create_backup(self) -> Dict[str, Any]:
         """Create backup of bot data"""
         try:
-            backup_data = {
-                'timestamp': datetime.now().isoformat(),
-                'stats': self.bot_stats,
-                'users': db.get_all_users(),
-                'chats': db.get_all_chats(),
-                'commands': db.get_all_command_stats(),
-                'tasks': db.get_all_task_stats()
-            }
-            
-            # Save backup to file
+            # Stream collections straight to the backup file
             backup_filename = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(f"backups/{backup_filename}", 'w') as f:
-                json.dump(backup_data, f, indent=2, default=str)
+            backup_path = os.path.join(BACKUP_CONFIG["backup_path"], backup_filename)
+            os.makedirs(BACKUP_CONFIG["backup_path"], exist_ok=True)
+            self.db.backup_collections(
+                backup_path,
+                BACKUP_CONFIG["collections"],
+                {'timestamp': datetime.now().isoformat(), 'stats': self.bot_stats}
+            )
             
             self._add_log('INFO', f'Backup created: {backup_filename}')
             
             return {
                 'success': True,
                 'filename': backup_filename,
-                'size': len(json.dumps(backup_data))
+                'size': os.path.getsize(backup_path)
             }
             
         except Exception as e:
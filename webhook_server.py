@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+🌐 WEBHOOK SERVER
+Ultimate Group King Bot - Webhook Ingress
+Author: Nikhil Mehra (NikkuAi09)
+Features:
+- Lightweight aiohttp server receiving Telegram updates
+- Secret token validation (X-Telegram-Bot-Api-Secret-Token)
+- Health endpoint for load balancers / uptime checks
+- Works against a local fake Telegram server via WEBHOOK_CONFIG["api_base_url"]
+"""
+
+import asyncio
+import hmac
+import logging
+import secrets
+import signal
+import ssl
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from config import WEBHOOK_CONFIG
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+class WebhookServer:
+    """Feeds webhook POSTs into application.update_queue.
+
+    The Application lifecycle (initialize/start/stop/shutdown) is driven here
+    instead of by run_polling(), so post_init/post_stop/post_shutdown are called too.
+    """
+
+    def __init__(self, application: Application, config: Dict = WEBHOOK_CONFIG):
+        self.application = application
+        self.config = config
+        # Telegram echoes this back on every request; generate one if none is configured
+        self.secret_token = config.get("secret_token") or secrets.token_urlsafe(32)
+        self.started_at = None
+        self.stats = {'received': 0, 'rejected': 0, 'invalid': 0}
+        self._stop_event = None
+
+        self.web_app = web.Application()
+        self.web_app.router.add_post(config["path"], self.handle_update)
+        self.web_app.router.add_get(config["health_path"], self.handle_health)
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Validates the secret token and queues the update."""
+        token = request.headers.get(SECRET_HEADER, '')
+        if not hmac.compare_digest(token, self.secret_token):
+            self.stats['rejected'] += 1
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+            update = Update.de_json(data, self.application.bot)
+        except Exception as e:
+            self.stats['invalid'] += 1
+            logger.warning(f"⚠️ Ignoring malformed webhook payload: {e}")
+            return web.Response(status=400)
+        await self.application.update_queue.put(update)
+        self.stats['received'] += 1
+        return web.Response(status=200)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Liveness/readiness: 200 while the application is running."""
+        running = self.application.running
+        return web.json_response({
+            'status': 'ok' if running else 'starting',
+            'uptime': time.monotonic() - self.started_at if self.started_at else 0,
+            'update_queue': self.application.update_queue.qsize(),
+            **self.stats
+        }, status=200 if running else 503)
+
+    def _ssl_context(self) -> Optional[ssl.SSLContext]:
+        if not (self.config.get("cert") and self.config.get("key")):
+            return None
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(self.config["cert"], self.config["key"])
+        return context
+
+    async def run(self):
+        """Starts the bot and the HTTP server; returns after SIGINT/SIGTERM."""
+        self._stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # e.g. Windows or not on the main thread
+
+        application = self.application
+        await application.initialize()
+        if application.post_init:
+            await application.post_init(application)
+
+        runner = web.AppRunner(self.web_app)
+        await runner.setup()
+        site = web.TCPSite(runner, self.config["listen"], self.config["port"], ssl_context=self._ssl_context())
+        try:
+            await site.start()
+            webhook_url = f"{self.config['url'].rstrip('/')}{self.config['path']}"
+            certificate = open(self.config["cert"], 'rb') if self.config.get("cert") else None
+            try:
+                await application.bot.set_webhook(
+                    url=webhook_url,
+                    certificate=certificate,
+                    secret_token=self.secret_token,
+                    allowed_updates=Update.ALL_TYPES,
+                    drop_pending_updates=True
+                )
+            finally:
+                if certificate:
+                    certificate.close()
+            await application.start()
+            self.started_at = time.monotonic()
+            logger.info(f"🌐 Webhook listening on {self.config['listen']}:{self.config['port']}{self.config['path']}")
+            await self._stop_event.wait()
+        finally:
+            logger.info("🛑 Stopping webhook server...")
+            await runner.cleanup()
+            if application.running:
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+            await application.shutdown()
+            if application.post_shutdown:
+                await application.post_shutdown(application)
+
+    def stop(self):
+        if self._stop_event:
+            self._stop_event.set()
+
+def run_webhook(application: Application):
+    """Blocking entry point, the webhook counterpart of application.run_polling()."""
+    if not WEBHOOK_CONFIG.get("url"):
+        raise ValueError("WEBHOOK_CONFIG['url'] must be set to use webhook mode")
+    asyncio.run(WebhookServer(application).run())